@@ -0,0 +1,249 @@
+import sys
+import os
+import glob
+import json
+import argparse
+import time
+import cv2
+import numpy as np
+
+# Setup paths
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import FRAME_WIDTH, FRAME_HEIGHT, WINDOW_NAME, FACE_BACKEND
+from bench.fixtures import make_landmarks, make_results, make_frame, jitter
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+CLIPS_DIR = os.path.join(BENCH_DIR, "clips")
+BASELINE_PATH = os.path.join(BENCH_DIR, "baselines.json")
+
+# เกณฑ์ถือว่าช้าลง: เกิน baseline มากกว่า TOLERANCE (สัดส่วน) และเกิน MIN_SLACK_MS
+# (กันสัญญาณรบกวนของ stage ที่ใช้เวลาระดับไมโครวินาที)
+# p95 แกว่งตามภาระเครื่องมากกว่า p50 จึงให้เผื่อมากกว่า
+TOLERANCE = {"p50": 0.25, "p95": 0.5}
+MIN_SLACK_MS = 0.1
+
+def time_stage(fn, iterations, warmup=5, setup=None):
+    """
+    จับเวลา fn() ทีละรอบ (ms) ส่วน setup() รันก่อนแต่ละรอบแต่ไม่นับเวลา
+    """
+    for _ in range(warmup):
+        if setup: setup()
+        fn()
+    samples = np.empty(iterations, dtype=np.float64)
+    for i in range(iterations):
+        if setup: setup()
+        t0 = time.perf_counter()
+        fn()
+        samples[i] = (time.perf_counter() - t0) * 1000.0
+    return samples
+
+def summarize(samples):
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    return {"p50": float(p50), "p95": float(p95), "p99": float(p99)}
+
+def load_clip_frames(paths, limit):
+    """อ่านเฟรมจากคลิปตัวอย่าง (ถ้ามี) ใช้วัด capture/flip และ FaceMesh บนหน้าจริง"""
+    frames = []
+    for path in paths:
+        cap = cv2.VideoCapture(path)
+        while len(frames) < limit:
+            success, frame = cap.read()
+            if not success: break
+            frames.append(cv2.resize(frame, (FRAME_WIDTH, FRAME_HEIGHT)))
+        cap.release()
+    return frames
+
+def run_benchmarks(iterations, clips, with_imshow, backend):
+    from pipeline.mp_face import create_detector
+    from detectors.eye import calculate_ear, get_iris_position
+    from detectors.mouth import calculate_mar
+    from detectors.attention import calculate_head_pose, HeadPoseEstimator
+    from detectors.features import compute_features
+    from logic.liveness import ActivityDetector
+    from detectors.smoothing import OneEuroBank
+    from logic.fatigue import FatigueMetrics
+    from ui.draw_utils import draw_face_mesh
+    from ui.overlay import HUD
+
+    W, H = FRAME_WIDTH, FRAME_HEIGHT
+    rng = np.random.default_rng(0)
+    stats = {}
+
+    def record(name, samples):
+        stats[name] = summarize(samples)
+
+    # --- Frame source: คลิปตัวอย่าง หรือภาพสังเคราะห์ ---
+    base_frame = make_frame(W, H)
+    frames = load_clip_frames(clips, iterations) if clips else []
+    frame = base_frame.copy()
+
+    # 1. Capture / Flip (ลง buffer ที่จองไว้ เหมือน Camera)
+    mirrored = np.empty_like(base_frame)
+    if clips:
+        caps = [cv2.VideoCapture(p) for p in clips]
+        state = {"i": 0}
+        def capture_flip():
+            cap = caps[state["i"] % len(caps)]
+            success, raw = cap.read()
+            if not success:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                success, raw = cap.read()
+                state["i"] += 1
+            cv2.flip(raw, 1, dst=mirrored if mirrored.shape == raw.shape else None)
+        record("capture_flip", time_stage(capture_flip, iterations))
+        for cap in caps: cap.release()
+    else:
+        record("capture_flip", time_stage(lambda: cv2.flip(base_frame, 1, dst=mirrored), iterations))
+
+    # 2. BGR -> RGB (ลง buffer เดิมทุกเฟรม เหมือน detector)
+    rgb = np.empty_like(base_frame)
+    record("cvt_color", time_stage(lambda: cv2.cvtColor(base_frame, cv2.COLOR_BGR2RGB, dst=rgb), iterations))
+
+    # 3. FaceMesh (ต้องมีคลิปที่มีหน้าจริง ภาพสังเคราะห์ไม่มีหน้า จะวัดได้แค่กรณีหาหน้าไม่เจอซึ่งเร็วกว่ามาก)
+    detector = create_detector(backend, live=False)
+    if frames:
+        state = {"i": 0}
+        def process():
+            detector.process(frames[state["i"] % len(frames)])
+            state["i"] += 1
+        record("facemesh_process", time_stage(process, iterations))
+    else:
+        print("Skip facemesh_process: no clips (put sample footage in bench/clips/)")
+
+    # --- Synthetic landmark fixtures ---
+    base_points = make_landmarks(W, H)
+    # ลำดับเฟรมต่อเนื่อง (ขยับทีละนิดแบบเฟรมติดกันจริง)
+    fixtures = [base_points]
+    for _ in range(63):
+        fixtures.append(jitter(fixtures[-1], rng, sigma=0.3))
+    state = {"i": 0}
+    def next_points():
+        state["i"] += 1
+        return fixtures[state["i"] % len(fixtures)]
+
+    results = make_results(base_points, W, H)
+    record("get_points", time_stage(lambda: detector.get_points(results, W, H), iterations))
+
+    # 4. Detectors
+    record("calculate_ear", time_stage(lambda: calculate_ear(next_points()), iterations))
+    record("calculate_mar", time_stage(lambda: calculate_mar(next_points()), iterations))
+    record("calculate_head_pose", time_stage(lambda: calculate_head_pose(next_points(), W, H), iterations))
+    pose = HeadPoseEstimator()
+    record("head_pose_warm", time_stage(lambda: pose.estimate(next_points(), W, H), iterations))
+    record("get_iris_position", time_stage(lambda: get_iris_position(next_points()), iterations))
+    record("compute_features", time_stage(lambda: compute_features(next_points(), W, H, pose), iterations))
+
+    # 5. Liveness (history เต็ม)
+    liveness = ActivityDetector()
+    for pts in fixtures * 2:
+        liveness.update(pts)
+    record("liveness_update", time_stage(lambda: liveness.update(next_points()), iterations))
+    record("check_static", time_stage(lambda: liveness.check_static(0), iterations))
+
+    # 5.1 One-Euro filter ของจุดทั้งหมด + 4 ค่า (logic/session.py)
+    filters = OneEuroBank(fixtures[0].size + 4, 1.0, 0.05)
+    signal = np.zeros(filters.size)
+    clock = iter(range(10 ** 9))
+    def smooth():
+        signal[:-4] = next_points().reshape(-1)
+        filters.update(signal, next(clock) / 30.0)
+    record("smooth_filters", time_stage(smooth, iterations))
+
+    # 5.2 PERCLOS / blink ทุกหน้าต่าง (หน้าต่าง 5 นาทีเต็มแล้ว)
+    fatigue = FatigueMetrics()
+    frame_no = iter(range(10 ** 9))
+    def fatigue_update():
+        i = next(frame_no)
+        fatigue.update(i % 90 < 4, i / 30.0)
+    for _ in range(30 * 300):
+        fatigue_update()
+    record("fatigue_update", time_stage(fatigue_update, iterations))
+
+    # 6. Drawing (เริ่มจากภาพเดิมทุกรอบ ไม่นับเวลาคัดลอก)
+    reset = lambda: np.copyto(frame, base_frame)
+    record("draw_face_mesh", time_stage(lambda: draw_face_mesh(frame, next_points()), iterations, setup=reset))
+    record("draw_face_mesh_low", time_stage(lambda: draw_face_mesh(frame, next_points(), "low"),
+                                            iterations, setup=reset))
+
+    hud = HUD(W, H)
+    hud_stages = {
+        "hud_info_panel": lambda: hud.draw_info_panel(frame, 42, 7, 3725.0, "TIRED", (0, 255, 255)),
+        "hud_bar": lambda: hud.draw_bar(frame, "Sleep", 0.4, 1.0, 0, (0, 255, 0)),
+        "hud_debug": lambda: hud.draw_debug(frame, 0.31, 0.12, 3.0, -2.0, 30.0, 24.5, 0),
+        "hud_calibration": lambda: hud.draw_calibration(frame, 0.5),
+        "hud_rest_screen": lambda: hud.draw_rest_screen(frame, 125.0),
+        "hud_warning": lambda: hud.draw_warning(frame, "WAKE UP!", "Drowsiness Detected"),
+    }
+    for name, fn in hud_stages.items():
+        record(name, time_stage(fn, iterations, setup=reset))
+
+    # 7. imshow (ต้องมีหน้าจอ)
+    if with_imshow:
+        try:
+            def show():
+                cv2.imshow(WINDOW_NAME, frame)
+                cv2.waitKey(1)
+            record("imshow", time_stage(show, iterations))
+            cv2.destroyAllWindows()
+        except cv2.error as e:
+            print(f"Skip imshow: {e}")
+
+    return stats
+
+def compare(stats, baselines):
+    """return: รายชื่อ stage ที่ช้ากว่า baseline เกินเกณฑ์"""
+    regressions = []
+    for name, s in stats.items():
+        base = baselines.get(name)
+        if base is None: continue
+        for key, tol in TOLERANCE.items():
+            limit = max(base[key] * (1 + tol), base[key] + MIN_SLACK_MS)
+            if s[key] > limit:
+                regressions.append((name, key, s[key], limit))
+    return regressions
+
+def print_report(stats, baselines):
+    print(f"{'STAGE':<22}{'p50':>9}{'p95':>9}{'p99':>9}{'base p95':>10}")
+    for name, s in stats.items():
+        base = baselines.get(name)
+        base_str = f"{base['p95']:>10.3f}" if base else f"{'-':>10}"
+        print(f"{name:<22}{s['p50']:>9.3f}{s['p95']:>9.3f}{s['p99']:>9.3f}{base_str}")
+    print("(ms)")
+
+def main():
+    parser = argparse.ArgumentParser(description="SafeGaze per-stage benchmark")
+    parser.add_argument("clips", nargs="*", help="คลิปตัวอย่าง (ค่าเริ่มต้น: ทุกไฟล์ใน bench/clips/)")
+    parser.add_argument("-n", "--iterations", type=int, default=200)
+    parser.add_argument("--backend", default=FACE_BACKEND, choices=["solutions", "tasks"],
+                        help="backend ตรวจจับหน้า (เทียบ A/B ได้)")
+    parser.add_argument("--imshow", action="store_true", help="วัดเวลา cv2.imshow ด้วย (ต้องมีหน้าจอ)")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="บันทึกผลครั้งนี้เป็น baseline ใหม่")
+    args = parser.parse_args()
+
+    clips = args.clips or sorted(glob.glob(os.path.join(CLIPS_DIR, "*.*")))
+    stats = run_benchmarks(args.iterations, clips, args.imshow, args.backend)
+
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baselines = json.load(f)
+
+    print_report(stats, baselines)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(stats, f, indent=2)
+        print(f"Saved baseline -> {args.baseline}")
+        return
+
+    regressions = compare(stats, baselines)
+    for name, key, value, limit in regressions:
+        print(f"[REGRESSION] {name}: {key} {value:.3f} ms > {limit:.3f} ms")
+    if regressions:
+        sys.exit(1)
+    print("No regressions.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# bench/fixtures.py
+import numpy as np
+from detectors.eye import LEFT_EYE, RIGHT_EYE, RIGHT_IRIS_CENTER
+from pipeline.mp_face import NUM_LANDMARKS
+
+# ตำแหน่ง (สัดส่วนของขนาดหน้า, จากจุดกึ่งกลางหน้า) ของจุดสำคัญที่ detector ใช้
+# ตาเปิดปกติ (EAR ~0.3), ปากปิด (MAR ~0.1), หน้าตรง
+_KEY_POINTS = {
+    1: (0.0, 0.05),        # ปลายจมูก
+    152: (0.0, 0.55),      # คาง
+    13: (0.0, 0.28),       # ริมฝีปากบน
+    14: (0.0, 0.31),       # ริมฝีปากล่าง
+    78: (-0.15, 0.30),     # มุมปากซ้าย
+    308: (0.15, 0.30),     # มุมปากขวา
+    61: (-0.17, 0.30),
+    291: (0.17, 0.30),
+}
+
+def _eye(indices, cx, cy, w=0.16, h=0.048):
+    # ลำดับจุดตา: มุม, บน 1, บน 2, มุม, ล่าง 2, ล่าง 1
+    pts = [(-w / 2, 0), (-w / 6, -h / 2), (w / 6, -h / 2), (w / 2, 0), (w / 6, h / 2), (-w / 6, h / 2)]
+    return {idx: (cx + dx, cy + dy) for idx, (dx, dy) in zip(indices, pts)}
+
+def make_landmarks(width=1280, height=720, face_size=320, seed=0):
+    """
+    สร้างจุดหน้าสังเคราะห์ (NUM_LANDMARKS, 3) พิกัด pixel สำหรับวัดความเร็วโดยไม่ต้องมีกล้อง
+    จุดทั่วไปกระจายในวงรีของหน้า ส่วนจุดที่ detector ใช้วางไว้ตำแหน่งสมจริง
+    """
+    rng = np.random.default_rng(seed)
+    cx, cy = width / 2, height / 2
+
+    # จุดทั่วไปในวงรี
+    angle = rng.uniform(0, 2 * np.pi, NUM_LANDMARKS)
+    radius = np.sqrt(rng.uniform(0, 1, NUM_LANDMARKS))
+    pts = np.zeros((NUM_LANDMARKS, 3), dtype=np.float32)
+    pts[:, 0] = cx + np.cos(angle) * radius * face_size * 0.4
+    pts[:, 1] = cy + np.sin(angle) * radius * face_size * 0.55
+    pts[:, 2] = rng.normal(0, face_size * 0.03, NUM_LANDMARKS)
+
+    key = dict(_KEY_POINTS)
+    key.update(_eye(RIGHT_EYE, -0.2, -0.1))
+    key.update(_eye(LEFT_EYE, 0.2, -0.1))
+    for idx, (dx, dy) in key.items():
+        pts[idx, 0] = cx + dx * face_size
+        pts[idx, 1] = cy + dy * face_size
+
+    if NUM_LANDMARKS > RIGHT_IRIS_CENTER:
+        pts[RIGHT_IRIS_CENTER, :2] = (cx - 0.2 * face_size, cy - 0.1 * face_size)
+    return pts
+
+def jitter(points, rng, sigma=0.8):
+    """ขยับจุดเล็กน้อยแบบสุ่ม (จำลองการเคลื่อนไหวระหว่างเฟรม)"""
+    return points + rng.normal(0, sigma, points.shape).astype(np.float32)
+
+def make_results(points, width, height):
+    """
+    สร้างผลลัพธ์หน้าตาเหมือน mp.solutions.face_mesh (multi_face_landmarks)
+    และ Tasks FaceLandmarker (face_landmarks) จาก array พิกัด pixel
+    ใช้กับฟังก์ชันที่ยังรับ results อยู่
+    """
+    from types import SimpleNamespace
+    from mediapipe.framework.formats import landmark_pb2
+
+    face = landmark_pb2.NormalizedLandmarkList()
+    for x, y, z in points.tolist():
+        face.landmark.add(x=x / width, y=y / height, z=z / width)
+    return SimpleNamespace(multi_face_landmarks=[face], face_landmarks=[list(face.landmark)],
+                           face_blendshapes=[], facial_transformation_matrixes=[])
+
+def make_frame(width=1280, height=720, seed=0):
+    """ภาพ BGR สังเคราะห์ (noise + gradient) ขนาดเท่ากล้อง"""
+    rng = np.random.default_rng(seed)
+    grad = np.linspace(40, 200, width, dtype=np.float32)[None, :, None]
+    noise = rng.normal(0, 12, (height, width, 3)).astype(np.float32)
+    return np.clip(grad + noise, 0, 255).astype(np.uint8)
@@ -1,55 +1,161 @@
 import cv2
 import numpy as np
 
-def calculate_head_pose(landmarks, width, height):
-    """
-    คำนวณมุมหน้า (Pitch, Yaw, Roll)
-    return: (pitch, yaw, roll) ในหน่วยองศา
-    """
-    # 1. จุดบนหน้า 2D (จาก MediaPipe)
-    face_2d = []
-    points_idx = [1, 152, 33, 263, 61, 291]
-    
-    for idx in points_idx:
-        lm = landmarks[idx]
-        face_2d.append([lm.x * width, lm.y * height])
-    
-    face_2d = np.array(face_2d, dtype=np.float64)
-
-    # 2. จุดบนหน้า 3D มาตรฐาน
-    face_3d = np.array([
-        [0.0, 0.0, 0.0],          # Nose tip
-        [0.0, -330.0, -65.0],     # Chin
-        [-225.0, 170.0, -135.0],  # Left eye left corner
-        [225.0, 170.0, -135.0],   # Right eye right corner
-        [-150.0, -150.0, -125.0], # Left Mouth corner
-        [150.0, -150.0, -125.0]   # Right mouth corner
-    ], dtype=np.float64)
+# จุดบนหน้าที่ใช้หามุม (จมูก, คาง, หางตาซ้าย/ขวา, มุมปากซ้าย/ขวา)
+POSE_IDX = np.array([1, 152, 33, 263, 61, 291])
 
-    # 3. ตั้งค่ากล้อง
+# จุดบนหน้า 3D มาตรฐาน (ค่าคงที่ สร้างครั้งเดียว)
+FACE_3D = np.array([
+    [0.0, 0.0, 0.0],          # Nose tip
+    [0.0, -330.0, -65.0],     # Chin
+    [-225.0, 170.0, -135.0],  # Left eye left corner
+    [225.0, 170.0, -135.0],   # Right eye right corner
+    [-150.0, -150.0, -125.0], # Left Mouth corner
+    [150.0, -150.0, -125.0]   # Right mouth corner
+], dtype=np.float64)
+
+DIST_MATRIX = np.zeros((4, 1), dtype=np.float64)
+
+# โมเดลหน้า (FACE_3D และ canonical face ของ MediaPipe) แกน y ขึ้น หน้าหันไปทาง +z
+# ส่วนกล้อง OpenCV แกน y ลง มองไปทาง +z: หน้าตรงจึงได้ rotation = หมุน 180° รอบแกน x (pitch ~±180)
+# ก้ม/เงยนิดเดียวก็กระโดดข้าม ±180 (ค่าเฉลี่ยตอน Calibrate / Smoothing พัง)
+# คูณด้วย FACE_FLIP (หมุน 180° รอบแกน x) ให้หน้าตรง = ไม่หมุน -> pitch/yaw/roll ~0
+FACE_FLIP = np.diag([1.0, -1.0, -1.0])
+
+def camera_matrix(width, height):
+    """ตั้งค่ากล้อง (focal length = ความกว้างภาพ, จุดกึ่งกลาง = กลางภาพ)"""
     focal_length = 1 * width
-    cam_matrix = np.array([
+    return np.array([
         [focal_length, 0, width / 2],
         [0, focal_length, height / 2],
         [0, 0, 1]
-    ])
-    dist_matrix = np.zeros((4, 1), dtype=np.float64)
-
-    # 4. Solve PnP
-    success, rot_vec, trans_vec = cv2.solvePnP(face_3d, face_2d, cam_matrix, dist_matrix)
-
-    if not success:
-        return 0, 0, 0
-
-    # 5. แปลงเป็น Euler Angles
-    rmat, jac = cv2.Rodrigues(rot_vec)
-    
-    # --- แก้ไขตรงนี้ (รับค่าแค่ 6 ตัว) ---
-    angles, mtxR, mtxQ, Qx, Qy, Qz = cv2.RQDecomp3x3(rmat)
-
-    # ค่าที่ได้เป็นองศาอยู่แล้ว ไม่ต้องคูณ 360
-    pitch = angles[0] 
-    yaw = angles[1] 
-    roll = angles[2]
-    
-    return pitch, yaw, roll
\ No newline at end of file
+    ], dtype=np.float64)
+
+def rotation_to_euler(rmat):
+    """
+    แปลง Rotation Matrix เป็น (pitch, yaw, roll) องศา
+    ให้ผลเท่ากับ cv2.RQDecomp3x3 แต่ไม่ต้องแยกเมทริกซ์ทั้งชุด
+    รับได้ทั้ง (3, 3) และแบบ batch (N, 3, 3)
+    """
+    r21, r22, r20 = rmat[..., 2, 1], rmat[..., 2, 2], rmat[..., 2, 0]
+    pitch = np.degrees(np.arctan2(r21, r22))
+    yaw = np.degrees(np.arctan2(-r20, np.hypot(r21, r22)))
+    roll = np.degrees(np.arctan2(rmat[..., 1, 0], rmat[..., 0, 0]))
+    return pitch, yaw, roll
+
+def rodrigues_batch(rvecs):
+    """cv2.Rodrigues แบบ vectorized: (N, 3) -> (N, 3, 3)"""
+    theta = np.linalg.norm(rvecs, axis=1)
+    safe = np.where(theta > 1e-12, theta, 1.0)
+    k = rvecs / safe[:, None]
+    K = np.zeros((len(rvecs), 3, 3))
+    K[:, 0, 1], K[:, 0, 2] = -k[:, 2], k[:, 1]
+    K[:, 1, 0], K[:, 1, 2] = k[:, 2], -k[:, 0]
+    K[:, 2, 0], K[:, 2, 1] = -k[:, 1], k[:, 0]
+    s = np.sin(theta)[:, None, None]
+    c = (1 - np.cos(theta))[:, None, None]
+    return np.eye(3) + s * K + c * (K @ K)
+
+class HeadPoseEstimator:
+    """
+    หามุมหน้าแบบมี state
+    - ค่าคงที่ของกล้องคำนวณครั้งเดียวต่อความละเอียด
+    - ใช้ผลของเฟรมก่อนหน้าเป็นจุดเริ่ม solvePnP (useExtrinsicGuess)
+      เฟรมติดกันในรถแทบไม่ต่างกัน จึงลู่เข้าเร็วกว่าเริ่มจากศูนย์
+    """
+    def __init__(self, warm_start=True):
+        self.warm_start = warm_start
+        self._size = None
+        self._cam_matrix = None
+        self.rot_vec = None
+        self.trans_vec = None
+
+    def reset(self):
+        """ล้างผลเฟรมก่อนหน้า (เรียกเมื่อหน้าหายไป)"""
+        self.rot_vec = None
+        self.trans_vec = None
+
+    def _camera(self, width, height):
+        if self._size != (width, height):
+            self._size = (width, height)
+            self._cam_matrix = camera_matrix(width, height)
+            self.reset()
+        return self._cam_matrix
+
+    def solve(self, points, width, height):
+        """
+        Solve PnP อย่างเดียว (ไม่แปลงมุม)
+        return: (success, rot_vec, trans_vec)
+        """
+        cam_matrix = self._camera(width, height)
+        face_2d = points[POSE_IDX, :2].astype(np.float64)
+
+        if self.warm_start and self.rot_vec is not None:
+            success, rot_vec, trans_vec = cv2.solvePnP(
+                FACE_3D, face_2d, cam_matrix, DIST_MATRIX,
+                self.rot_vec, self.trans_vec, True, cv2.SOLVEPNP_ITERATIVE)
+            # ถ้าผลหลุด (หน้าไปอยู่หลังกล้อง) ให้เริ่มใหม่จากศูนย์
+            if not success or trans_vec[2, 0] <= 0:
+                self.reset()
+                return self.solve(points, width, height)
+        else:
+            success, rot_vec, trans_vec = cv2.solvePnP(FACE_3D, face_2d, cam_matrix, DIST_MATRIX)
+
+        if not success:
+            self.reset()
+            return False, None, None
+
+        if self.warm_start:
+            self.rot_vec, self.trans_vec = rot_vec, trans_vec
+        return True, rot_vec, trans_vec
+
+    def estimate(self, points, width, height):
+        """
+        points: array (N, 3) พิกัด pixel
+        return: (pitch, yaw, roll) ในหน่วยองศา
+        """
+        success, rot_vec, _ = self.solve(points, width, height)
+        if not success:
+            return 0, 0, 0
+
+        rmat, _ = cv2.Rodrigues(rot_vec)
+        pitch, yaw, roll = rotation_to_euler(rmat @ FACE_FLIP)
+        return float(pitch), float(yaw), float(roll)
+
+    def estimate_batch(self, points_batch, width, height, valid=None):
+        """
+        หามุมทั้งชุด (ใช้ย้อนหลัง) เรียงตามลำดับเฟรมเพื่อใช้ warm start ต่อเนื่อง
+        points_batch: (F, N, 3) พิกัด pixel
+        valid: (F,) bool เฟรมที่มีหน้า (เฟรมอื่นได้ NaN และ reset)
+        return: array (F, 3) ของ (pitch, yaw, roll)
+        """
+        n = len(points_batch)
+        if valid is None:
+            valid = np.ones(n, dtype=bool)
+        rvecs = np.full((n, 3), np.nan)
+
+        for i in range(n):
+            if not valid[i]:
+                self.reset()
+                continue
+            success, rot_vec, _ = self.solve(points_batch[i], width, height)
+            if success:
+                rvecs[i] = rot_vec[:, 0]
+
+        # แปลงมุมทั้งชุดด้วย NumPy ในครั้งเดียว
+        ok = ~np.isnan(rvecs[:, 0])
+        angles = np.full((n, 3), np.nan)
+        if ok.any():
+            angles[ok] = np.stack(rotation_to_euler(rodrigues_batch(rvecs[ok]) @ FACE_FLIP), axis=1)
+        return angles
+
+# ตัวคำนวณแบบไม่จำเฟรมก่อนหน้า (สำหรับเรียกแบบฟังก์ชันเดิม)
+_stateless = HeadPoseEstimator(warm_start=False)
+
+def calculate_head_pose(points, width, height):
+    """
+    คำนวณมุมหน้า (Pitch, Yaw, Roll)
+    points: array (N, 3) พิกัด pixel จาก FaceMeshDetector.get_points()
+    return: (pitch, yaw, roll) ในหน่วยองศา
+    """
+    return _stateless.estimate(points, width, height)
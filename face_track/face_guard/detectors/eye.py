@@ -3,71 +3,68 @@ import numpy as np
 # จุดอ้างอิงของตา (MediaPipe Indices)
 LEFT_EYE = [362, 385, 387, 263, 373, 380]
 RIGHT_EYE = [33, 160, 158, 133, 153, 144]
+EYES = np.array([LEFT_EYE, RIGHT_EYE])  # (2, 6) ใช้ดึงทั้งสองตาในครั้งเดียว
 
 # จุดตาดำ (Iris)
 # 468 คือจุดกึ่งกลางตาดำข้างขวา (มุมมองคนขับ)
 RIGHT_IRIS_CENTER = 468 
 RIGHT_EYE_IN = 33   # หัวตาขวา
 RIGHT_EYE_OUT = 133 # หางตาขวา
+IRIS_X_IDX = np.array([RIGHT_EYE_IN, RIGHT_EYE_OUT, RIGHT_IRIS_CENTER])
 
-def calculate_ear(landmarks, width, height):
+def ear_from_distances(vert_a, vert_b, horiz):
+    """
+    สูตร EAR = (A + B) / (2C) เฉลี่ยสองตา (รับ array ระยะของแต่ละตา)
+    """
+    if np.any(horiz == 0): return 0.0
+    return float(np.mean((vert_a + vert_b) / (2.0 * horiz)))
+
+def calculate_ear(points):
     """
     คำนวณค่า Eye Aspect Ratio (EAR)
+    points: array (N, 3) พิกัด pixel จาก FaceMeshDetector.get_points()
     """
-    def get_coords(indices):
-        coords = []
-        for idx in indices:
-            lm = landmarks[idx]
-            coords.append([lm.x * width, lm.y * height])
-        return np.array(coords)
+    try:
+        eyes = points[EYES, :2]  # (2, 6, 2)
+        A = np.linalg.norm(eyes[:, 1] - eyes[:, 5], axis=1)
+        B = np.linalg.norm(eyes[:, 2] - eyes[:, 4], axis=1)
+        C = np.linalg.norm(eyes[:, 0] - eyes[:, 3], axis=1)
+        return ear_from_distances(A, B, C)
+    except:
+        return 0.0
 
-    def eye_aspect_ratio(eye_points):
-        A = np.linalg.norm(eye_points[1] - eye_points[5])
-        B = np.linalg.norm(eye_points[2] - eye_points[4])
-        C = np.linalg.norm(eye_points[0] - eye_points[3])
-        ear = (A + B) / (2.0 * C)
-        return ear
+def iris_from_x(p_in, p_out, p_iris):
+    """
+    จัดกลุ่มทิศการมองจากพิกัดแนวนอน (x) ของหัวตา หางตา และตาดำ
+    """
+    # ระยะทั้งหมดของดวงตา (จากหัวตาไปหางตา)
+    eye_width = p_out - p_in
+    if eye_width == 0: return "CENTER"
 
-    try:
-        left_points = get_coords(LEFT_EYE)
-        right_points = get_coords(RIGHT_EYE)
+    # ระยะจากหัวตาถึงตาดำ
+    dist_to_iris = p_iris - p_in
 
-        left_ear = eye_aspect_ratio(left_points)
-        right_ear = eye_aspect_ratio(right_points)
+    # คำนวณอัตราส่วน (0.0 - 1.0)
+    # 0.5 คือตรงกลาง
+    # น้อยกว่า 0.4 คือมองขวา (หันไปทางขวาของตัวเอง)
+    # มากกว่า 0.6 คือมองซ้าย (หันไปทางซ้ายของตัวเอง)
+    ratio = dist_to_iris / eye_width
 
-        return (left_ear + right_ear) / 2.0
-    except:
-        return 0.0
+    if ratio < 0.42:
+        return "RIGHT"
+    elif ratio > 0.58:
+        return "LEFT"
+    else:
+        return "CENTER"
 
-def get_iris_position(landmarks, width, height):
+def get_iris_position(points):
     """
     ตรวจสอบว่าตาดำมองไปทางไหน (CENTER, LEFT, RIGHT)
     โดยเช็คจากตาขวา (Right Eye) เป็นหลัก
     """
     try:
-        # ดึงพิกัดแนวนอน (x)
-        p_in = landmarks[RIGHT_EYE_IN].x * width
-        p_out = landmarks[RIGHT_EYE_OUT].x * width
-        p_iris = landmarks[RIGHT_IRIS_CENTER].x * width
-        
-        # ระยะทั้งหมดของดวงตา (จากหัวตาไปหางตา)
-        eye_width = p_out - p_in
-        if eye_width == 0: return "CENTER"
-        
-        # ระยะจากหัวตาถึงตาดำ
-        dist_to_iris = p_iris - p_in
-        
-        # คำนวณอัตราส่วน (0.0 - 1.0)
-        # 0.5 คือตรงกลาง
-        # น้อยกว่า 0.4 คือมองขวา (หันไปทางขวาของตัวเอง)
-        # มากกว่า 0.6 คือมองซ้าย (หันไปทางซ้ายของตัวเอง)
-        ratio = dist_to_iris / eye_width
-        
-        if ratio < 0.42:
-            return "RIGHT"
-        elif ratio > 0.58:
-            return "LEFT"
-        else:
-            return "CENTER"
+        # ดึงพิกัดแนวนอน (x) ทั้งสามจุดในครั้งเดียว
+        p_in, p_out, p_iris = points[IRIS_X_IDX, 0].tolist()
+        return iris_from_x(p_in, p_out, p_iris)
     except:
-        return "CENTER"
\ No newline at end of file
+        return "CENTER"
@@ -0,0 +1,52 @@
+# detectors/features.py
+import numpy as np
+from detectors.eye import LEFT_EYE, RIGHT_EYE, IRIS_X_IDX, ear_from_distances, iris_from_x
+from detectors.mouth import MOUTH_PAIRS
+from detectors.attention import calculate_head_pose, rotation_to_euler
+
+# คู่จุดทั้งหมดที่ต้องวัดระยะ รวมไว้ใน array เดียว
+# แถว 0-5: ตา (แนวตั้ง A, แนวตั้ง B, แนวนอน C) ของตาซ้ายและตาขวา
+# แถว 6-7: ปาก (แนวตั้ง, แนวนอน)
+_EYE_PAIRS = [(eye[1], eye[5]) for eye in (LEFT_EYE, RIGHT_EYE)] + \
+             [(eye[2], eye[4]) for eye in (LEFT_EYE, RIGHT_EYE)] + \
+             [(eye[0], eye[3]) for eye in (LEFT_EYE, RIGHT_EYE)]
+DIST_PAIRS = np.array(_EYE_PAIRS + MOUTH_PAIRS.tolist())
+
+def compute_features(points, width, height, pose=None, direct=None):
+    """
+    คำนวณค่าทั้งหมดของเฟรมจาก array (N, 3) พิกัด pixel ในรอบเดียว
+    pose: HeadPoseEstimator (warm start จากเฟรมก่อน) ถ้าไม่ส่งมาจะคำนวณแบบเริ่มใหม่ทุกครั้ง
+    direct: ค่าที่ backend ให้มาโดยตรง (detector.get_direct_features) ค่าไหนมีแล้วจะข้ามการคำนวณ
+    return: dict {ear, mar, pitch, yaw, roll, iris}
+    """
+    direct = direct or {}
+
+    if "ear" in direct and "mar" in direct:
+        ear, mar = direct["ear"], direct["mar"]
+    else:
+        # ระยะทุกคู่ (ตา + ปาก) ด้วย NumPy ครั้งเดียว
+        xy = points[DIST_PAIRS, :2]  # (8, 2, 2)
+        d = np.linalg.norm(xy[:, 0] - xy[:, 1], axis=1)
+
+        ear = ear_from_distances(d[0:2], d[2:4], d[4:6])
+        mar = 0.0 if d[7] == 0 else float(d[6] / d[7])
+
+    if "rotation" in direct:
+        pitch, yaw, roll = (float(a) for a in rotation_to_euler(direct["rotation"]))
+    elif pose is not None:
+        pitch, yaw, roll = pose.estimate(points, width, height)
+    else:
+        pitch, yaw, roll = calculate_head_pose(points, width, height)
+
+    iris = "CENTER"
+    if len(points) > IRIS_X_IDX.max():
+        iris = iris_from_x(*points[IRIS_X_IDX, 0].tolist())
+
+    return {
+        "ear": ear,
+        "mar": mar,
+        "pitch": pitch,
+        "yaw": yaw,
+        "roll": roll,
+        "iris": iris,
+    }
@@ -0,0 +1,129 @@
+# detectors/quality.py
+import cv2
+import numpy as np
+from src.config import (QUALITY_SAMPLE_SIZE, QUALITY_ROI_SIZE, QUALITY_DARK, QUALITY_BRIGHT, QUALITY_MIN_CONTRAST,
+                        QUALITY_BLUR_RATIO, QUALITY_MIN_FACE, QUALITY_MIN_INSIDE, QUALITY_MAX_REUSE)
+from logic.clock import SYSTEM_CLOCK
+
+# ผลการตัดสินของแต่ละเฟรม
+RUN = "RUN"                # ภาพดี -> รัน FaceMesh
+REUSE = "REUSE"            # เบลอชั่วคราว -> ใช้จุดของเฟรมดีล่าสุดแทน (ไม่รัน FaceMesh)
+UNRELIABLE = "UNRELIABLE"  # ภาพใช้ไม่ได้ -> ไม่รัน และหยุดนับ timer (ไม่ให้ EAR มั่วๆ เริ่มนับหลับ)
+
+class QualityGate:
+    """
+    ประเมินคุณภาพภาพก่อนส่งเข้า FaceMesh จากภาพย่อขนาดเล็กมาก (ใช้เวลาระดับ 0.1 ms)
+    - ความสว่าง/ความต่างแสง (มืดตอนกลางคืน, ย้อนแสง) จากภาพย่อทั้งเฟรม หรือบริเวณหน้าถ้ารู้ตำแหน่ง
+    - ความคม (Laplacian variance) ของบริเวณหน้าล่าสุด เทียบกับค่าเฉลี่ยของเฟรมที่ดี (กล้องแต่ละตัวคมไม่เท่ากัน)
+    - ขนาด/ตำแหน่งหน้าจากจุดที่ได้ (check_face) หน้าเล็กเกิน หรือหลุดขอบภาพ -> เชื่อไม่ได้
+    """
+    def __init__(self, sample_size=QUALITY_SAMPLE_SIZE, roi_size=QUALITY_ROI_SIZE, dark=QUALITY_DARK,
+                 bright=QUALITY_BRIGHT, min_contrast=QUALITY_MIN_CONTRAST, blur_ratio=QUALITY_BLUR_RATIO,
+                 min_face=QUALITY_MIN_FACE, min_inside=QUALITY_MIN_INSIDE, max_reuse=QUALITY_MAX_REUSE,
+                 clock=None):
+        self.clock = clock or SYSTEM_CLOCK
+        self.sample_size = sample_size
+        self.roi_size = roi_size
+        self.dark = dark
+        self.bright = bright
+        self.min_contrast = min_contrast
+        self.blur_ratio = blur_ratio
+        self.min_face = min_face
+        self.min_inside = min_inside
+        self.max_reuse = max_reuse
+
+        # ค่าของเฟรมล่าสุด (ไว้โชว์ Debug)
+        self.brightness = 0.0
+        self.contrast = 0.0
+        self.sharpness = 0.0
+        self.decision = RUN
+        self.counts = {RUN: 0, REUSE: 0, UNRELIABLE: 0}
+
+        self._sharp_avg = None  # ค่าเฉลี่ยความคม (EMA) ของเฟรมที่ดี
+        self._last_good = None  # เวลาของเฟรมล่าสุดที่ได้จุดที่เชื่อได้
+        self._roi = np.empty((roi_size, roi_size, 3), dtype=np.uint8)
+
+    def _face_box(self, points, width, height):
+        """กรอบหน้า (x0, y0, x1, y1) ที่อยู่ในภาพ หรือ None ถ้าหลุดขอบทั้งหมด"""
+        x_min, y_min = points[:, :2].min(axis=0)
+        x_max, y_max = points[:, :2].max(axis=0)
+        x0, y0 = max(int(x_min), 0), max(int(y_min), 0)
+        x1, y1 = min(int(x_max) + 1, width), min(int(y_max) + 1, height)
+        if x1 - x0 < 8 or y1 - y0 < 8:
+            return None
+        return x0, y0, x1, y1
+
+    def check_frame(self, frame, points=None, now=None):
+        """
+        ตัดสินก่อนรัน inference
+        points: จุดของหน้าล่าสุด (ใช้วัดเฉพาะบริเวณหน้า) หรือ None
+        return: RUN / REUSE / UNRELIABLE
+        """
+        if now is None: now = self.clock.now()
+        height, width = frame.shape[:2]
+        box = self._face_box(points, width, height) if points is not None else None
+
+        if box is None:
+            # ยังไม่รู้ตำแหน่งหน้า: ดูแค่แสงจากภาพย่อทั้งเฟรม (nearest = สุ่มจุด ไม่ต้องเฉลี่ยทั้งภาพ)
+            sample_w = self.sample_size
+            sample_h = max(1, sample_w * height // width)
+            small = cv2.resize(frame, (sample_w, sample_h), interpolation=cv2.INTER_NEAREST)
+            gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+            sharpness = None
+        else:
+            x0, y0, x1, y1 = box
+            # INTER_LINEAR: เร็วกว่า INTER_AREA มาก (ความคมใช้เทียบกับค่าปกติของกล้องเดียวกันอยู่แล้ว)
+            cv2.resize(frame[y0:y1, x0:x1], (self.roi_size, self.roi_size), dst=self._roi,
+                       interpolation=cv2.INTER_LINEAR)
+            gray = cv2.cvtColor(self._roi, cv2.COLOR_BGR2GRAY)
+            _, lap_std = cv2.meanStdDev(cv2.Laplacian(gray, cv2.CV_16S))
+            sharpness = float(lap_std[0, 0]) ** 2
+
+        mean, std = cv2.meanStdDev(gray)
+        self.brightness = float(mean[0, 0])
+        self.contrast = float(std[0, 0])
+
+        if self.brightness < self.dark or self.brightness > self.bright or self.contrast < self.min_contrast:
+            decision = UNRELIABLE
+        elif sharpness is not None and self._sharp_avg is not None and \
+                sharpness < self._sharp_avg * self.blur_ratio:
+            # เบลอจากการขยับ: ใช้ค่าเดิมได้ถ้าเพิ่งมีเฟรมดีไม่นาน
+            recent = self._last_good is not None and now - self._last_good <= self.max_reuse
+            decision = REUSE if recent else UNRELIABLE
+            # ค่อยๆ ลดค่าปกติลง ถ้ากล้องเบลอถาวร (เช่น โฟกัสเปลี่ยน) จะกลับมารันได้ในไม่กี่วินาที
+            self._sharp_avg = 0.98 * self._sharp_avg + 0.02 * sharpness
+        else:
+            decision = RUN
+            if sharpness is not None:
+                self._sharp_avg = sharpness if self._sharp_avg is None else \
+                    0.9 * self._sharp_avg + 0.1 * sharpness
+
+        if sharpness is not None:
+            self.sharpness = sharpness
+        self.decision = decision
+        self.counts[decision] += 1
+        return decision
+
+    def check_face(self, points, width, height, now=None):
+        """
+        ตรวจหลังรัน inference: หน้าใหญ่พอ และอยู่ในภาพเกือบทั้งหมด
+        return: True ถ้าจุดที่ได้เชื่อได้ (None = ไม่เจอหน้า ถือว่าเชื่อได้ เพราะ session จัดการเอง)
+        """
+        if points is None:
+            return True
+        if now is None: now = self.clock.now()
+
+        x_min, y_min = points[:, :2].min(axis=0)
+        x_max, y_max = points[:, :2].max(axis=0)
+        face_w, face_h = x_max - x_min, y_max - y_min
+        box = self._face_box(points, width, height)
+        inside = 0.0
+        if box is not None and face_w > 0 and face_h > 0:
+            inside = (box[2] - box[0]) * (box[3] - box[1]) / (face_w * face_h)
+
+        reliable = face_w >= self.min_face and inside >= self.min_inside
+        if reliable:
+            self._last_good = now
+        else:
+            self.decision = UNRELIABLE
+        return reliable
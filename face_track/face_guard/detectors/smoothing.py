@@ -1,15 +1,71 @@
-class SmoothValue:
-    def __init__(self, alpha=0.5):
+# detectors/smoothing.py
+import math
+import numpy as np
+
+class OneEuroBank:
+    """
+    One-Euro filter หลายช่องพร้อมกันใน array เดียว (จุดบนหน้าทั้งหมด + EAR/MAR/Yaw/Pitch อัปเดตครั้งเดียว)
+    ความถี่ตัด (cutoff) ปรับตามความเร็วของแต่ละช่อง: cutoff = min_cutoff + beta * |ความเร็ว|
+    - นิ่ง -> cutoff ต่ำ กรองสั่นได้มาก
+    - ขยับเร็ว (หลับตา, หันหน้า) -> cutoff สูง แทบไม่หน่วง (EMA แบบ alpha คงที่หน่วงเท่ากันตลอด)
+
+    size: จำนวนช่อง, min_cutoff / beta / d_cutoff: ค่าเดียว หรือ array ยาว size (ตั้งแยกช่องได้)
+    """
+    def __init__(self, size, min_cutoff=1.0, beta=0.0, d_cutoff=1.0):
+        self.size = size
+        self.min_cutoff = np.broadcast_to(np.asarray(min_cutoff, dtype=np.float64), (size,)).copy()
+        self.beta = np.broadcast_to(np.asarray(beta, dtype=np.float64), (size,)).copy()
+        self.d_cutoff = np.broadcast_to(np.asarray(d_cutoff, dtype=np.float64), (size,)).copy()
+
+        # state + array ชั่วคราว จองครั้งเดียว (update ไม่สร้าง array ใหม่)
+        self.value = np.zeros(size, dtype=np.float64)
+        self.speed = np.zeros(size, dtype=np.float64)
+        self._delta = np.empty(size, dtype=np.float64)
+        self._alpha = np.empty(size, dtype=np.float64)
+        self._denom = np.empty(size, dtype=np.float64)
+        self._last_t = None
+
+    @classmethod
+    def from_groups(cls, groups):
+        """groups: [(จำนวนช่อง, (min_cutoff, beta, d_cutoff)), ...] ต่อกันตามลำดับ"""
+        params = np.concatenate([np.tile(np.asarray(p, dtype=np.float64), (count, 1)) for count, p in groups])
+        return cls(len(params), params[:, 0], params[:, 1], params[:, 2])
+
+    def reset(self):
+        self._last_t = None
+
+    def update(self, x, t):
         """
-        alpha: ค่าความหน่วง (0.1 = หน่วงมาก/ลื่นมาก, 0.9 = ไวมาก/สั่น)
+        x: ค่าใหม่ (ยาว size), t: เวลา (วินาที)
+        return: self.value (ถูกเขียนทับในการเรียกครั้งถัดไป)
         """
-        self.alpha = alpha
-        self.value = None
-
-    def update(self, new_value):
-        if self.value is None:
-            self.value = new_value
-        else:
-            # สูตร Exponential Moving Average
-            self.value = (self.alpha * new_value) + ((1 - self.alpha) * self.value)
-        return self.value
\ No newline at end of file
+        if self._last_t is None:
+            self.value[:] = x
+            self.speed[:] = 0.0
+            self._last_t = t
+            return self.value
+
+        dt = max(t - self._last_t, 1e-3)
+        self._last_t = t
+        value, speed, delta, alpha = self.value, self.speed, self._delta, self._alpha
+        k = 2.0 * math.pi * dt  # alpha = 1 / (1 + 1 / (2 pi cutoff dt)) = k*cutoff / (1 + k*cutoff)
+
+        # 1. ความเร็ว (กรองด้วย cutoff คงที่ d_cutoff)
+        np.subtract(x, value, out=delta)
+        np.multiply(self.d_cutoff, k, out=alpha)
+        alpha /= np.add(alpha, 1.0, out=self._denom)
+        delta /= dt
+        delta -= speed
+        delta *= alpha
+        speed += delta
+
+        # 2. cutoff ของแต่ละช่องตามความเร็ว แล้วกรองค่า
+        np.abs(speed, out=alpha)
+        alpha *= self.beta
+        alpha += self.min_cutoff
+        alpha *= k
+        alpha /= np.add(alpha, 1.0, out=self._denom)
+        np.subtract(x, value, out=delta)
+        delta *= alpha
+        value += delta
+        return value
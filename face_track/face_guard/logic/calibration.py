@@ -1,13 +1,13 @@
-import time
-import numpy as np
 from src.config import CALIBRATION_TIME
+from logic.clock import SYSTEM_CLOCK
 
 class Calibrator:
-    def __init__(self):
-        self.data_ear = []
-        self.data_mar = []
-        self.data_yaw = []
-        self.data_pitch = []
+    EAR_RATIO = 0.6   # EAR ต้องต่ำกว่า 60% ของตอนลืมตา ถึงจะนับว่าหลับ
+    MAR_MARGIN = 0.3  # MAR ต้องสูงกว่าตอนหุบปาก 0.3 ถึงจะนับว่าหาว
+
+    def __init__(self, clock=None):
+        self.clock = clock or SYSTEM_CLOCK
+        self._reset_sums()
         
         self.start_time = None
         self.is_calibrating = False
@@ -18,50 +18,87 @@ class Calibrator:
         self.thresh_mar = 0.5
         self.base_yaw = 0
         self.base_pitch = 0
+        self.reference = None  # ค่าตอน Calibrate/โหลด profile (ขอบเขตของ refine)
+
+    def _reset_sums(self):
+        # สะสมเป็นผลรวม ไม่ต้องเก็บทุกค่าไว้ใน List
+        self.count = 0
+        self.sum_ear = self.sum_mar = self.sum_yaw = self.sum_pitch = 0.0
 
-    def start(self):
+    def start(self, now=None):
         self.is_calibrating = True
-        self.start_time = time.time()
-        self.data_ear = []
-        self.data_mar = []
-        self.data_yaw = []
-        self.data_pitch = []
+        self.is_finished = False
+        self.start_time = now if now is not None else self.clock.now()
+        self._reset_sums()
         print("Starting Calibration... Keep face neutral.")
 
-    def update(self, ear, mar, pitch, yaw):
+    def update(self, ear, mar, pitch, yaw, now=None):
         if not self.is_calibrating:
             return
 
-        # เก็บข้อมูลใส่ List
-        self.data_ear.append(ear)
-        self.data_mar.append(mar)
-        self.data_yaw.append(yaw)
-        self.data_pitch.append(pitch)
+        self.count += 1
+        self.sum_ear += ear
+        self.sum_mar += mar
+        self.sum_yaw += yaw
+        self.sum_pitch += pitch
 
         # เช็คเวลา
-        elapsed = time.time() - self.start_time
+        if now is None: now = self.clock.now()
+        elapsed = now - self.start_time
         if elapsed >= CALIBRATION_TIME:
             self._calculate_thresholds()
             self.is_calibrating = False
             self.is_finished = True
             print(f"Calibration Done! EAR: {self.thresh_ear:.2f}, MAR: {self.thresh_mar:.2f}")
 
-    def get_progress(self):
+    def get_progress(self, now=None):
         if not self.is_calibrating or self.start_time is None:
             return 0.0
-        return min((time.time() - self.start_time) / CALIBRATION_TIME, 1.0)
+        if now is None: now = self.clock.now()
+        return min((now - self.start_time) / CALIBRATION_TIME, 1.0)
 
     def _calculate_thresholds(self):
-        avg_ear = np.mean(self.data_ear)
-        avg_mar = np.mean(self.data_mar)
-        
-        # แก้ตรงนี้: จาก 0.8 เป็น 0.6
-        # ความหมาย: ค่า EAR ต้องต่ำกว่า 60% ของตอนลืมตา ถึงจะนับว่าหลับ
-        # (ช่วยแก้เรื่องหรี่ตาแล้วโดนจับได้ชะงัดนัก)
-        self.thresh_ear = avg_ear * 0.6  
-        
-        # ปากเอาเหมือนเดิม เพราะดีอยู่แล้ว
-        self.thresh_mar = avg_mar + 0.3  
-        
-        self.base_yaw = np.mean(self.data_yaw)
-        self.base_pitch = np.mean(self.data_pitch)
\ No newline at end of file
+        n = max(self.count, 1)
+        self.thresh_ear = float(self.sum_ear / n * self.EAR_RATIO)
+        self.thresh_mar = float(self.sum_mar / n + self.MAR_MARGIN)
+        self.base_yaw = float(self.sum_yaw / n)
+        self.base_pitch = float(self.sum_pitch / n)
+        self.reference = self.to_profile()
+
+    # --- Driver Profile (logic/profiles.py) ---
+    def to_profile(self):
+        return {"thresh_ear": float(self.thresh_ear), "thresh_mar": float(self.thresh_mar),
+                "base_yaw": float(self.base_yaw), "base_pitch": float(self.base_pitch)}
+
+    def load(self, profile):
+        """ใช้ค่าที่บันทึกไว้แทนการ Calibrate (พร้อมใช้ทันที)"""
+        self.thresh_ear = float(profile["thresh_ear"])
+        self.thresh_mar = float(profile["thresh_mar"])
+        self.base_yaw = float(profile["base_yaw"])
+        self.base_pitch = float(profile["base_pitch"])
+        self.reference = dict(profile.get("reference") or self.to_profile())
+        self.is_calibrating = False
+        self.is_finished = True
+
+    def refine(self, ear, mar, pitch, yaw, alpha, max_drift, max_angle_drift):
+        """
+        ปรับค่าทีละนิดจากเฟรมที่ผู้ขับอยู่ในท่าปกติ (EMA) ระหว่างขับ
+        ขยับได้ไม่เกิน max_drift (สัดส่วน) / max_angle_drift (องศา) จากค่าตอน Calibrate
+        กันไม่ให้อาการง่วงที่ค่อยๆ เกิดดึงเกณฑ์ตามไปด้วย
+        """
+        ref = self.reference
+        if ref is None:
+            return
+
+        def step(value, target, low, high):
+            value += alpha * (target - value)
+            return min(max(value, low), high)
+
+        self.thresh_ear = step(self.thresh_ear, ear * self.EAR_RATIO,
+                               ref["thresh_ear"] * (1 - max_drift), ref["thresh_ear"] * (1 + max_drift))
+        self.thresh_mar = step(self.thresh_mar, mar + self.MAR_MARGIN,
+                               ref["thresh_mar"] * (1 - max_drift), ref["thresh_mar"] * (1 + max_drift))
+        self.base_yaw = step(self.base_yaw, yaw,
+                             ref["base_yaw"] - max_angle_drift, ref["base_yaw"] + max_angle_drift)
+        self.base_pitch = step(self.base_pitch, pitch,
+                               ref["base_pitch"] - max_angle_drift, ref["base_pitch"] + max_angle_drift)
@@ -0,0 +1,28 @@
+# logic/clock.py
+import time
+
+class SystemClock:
+    """เวลาจริงของเครื่อง (ค่าเริ่มต้นเมื่อไม่ได้ส่ง clock มา)"""
+    def now(self):
+        return time.time()
+
+class FrameClock:
+    """
+    เวลาที่เดินตามเฟรม: เวลาที่ถ่ายภาพ (กล้องสด), เวลาในวิดีโอ (replay) หรือเวลาสังเคราะห์ (simulate)
+    logic ทุกส่วนอ่านเวลาจากที่นี่ จึงรันเร็วกว่าเวลาจริงได้ และได้ผลเหมือนเดิมทุกครั้ง
+    """
+    def __init__(self, t=0.0):
+        self.t = t
+
+    def set(self, t):
+        self.t = t
+        return t
+
+    def advance(self, dt):
+        self.t += dt
+        return self.t
+
+    def now(self):
+        return self.t
+
+SYSTEM_CLOCK = SystemClock()
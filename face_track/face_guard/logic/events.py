@@ -0,0 +1,158 @@
+# logic/events.py
+import os
+import json
+import queue
+import threading
+from src.config import (EVENT_LOG_PATH, EVENT_LOG_MAX_BYTES, EVENT_LOG_BACKUPS, EVENT_FLUSH_INTERVAL,
+                        EVENT_QUEUE_SIZE)
+from logic.clock import SYSTEM_CLOCK
+
+# ชื่อเหตุการณ์ -> key ใน status ของ DriverMonitor.update()
+EVENT_FLAGS = {
+    "sleep": "is_sleep_locked",
+    "yawn": "trig_yawn",
+    "distraction": "trig_distract",
+    "rapid_blink": "is_rapid_blink",
+    "overtime": "is_overtime",
+    "static": "is_static",
+}
+
+class EventLogger:
+    """
+    เขียนเหตุการณ์ลงไฟล์ JSON Lines (ต่อท้ายอย่างเดียว) จาก thread แยก
+    - log() แค่ใส่คิว ไม่แตะดิสก์ (ไม่ทำให้ frame loop สะดุด) ถ้าคิวเต็มจะทิ้งและนับไว้ใน dropped
+    - thread เขียนรวบเป็นชุดทุก flush_interval วินาที
+    - ไฟล์ใหญ่เกิน max_bytes -> เปลี่ยนชื่อเป็น .1, .2, ... (เก็บไว้ backups ไฟล์)
+    """
+    def __init__(self, path=EVENT_LOG_PATH, max_bytes=EVENT_LOG_MAX_BYTES, backups=EVENT_LOG_BACKUPS,
+                 flush_interval=EVENT_FLUSH_INTERVAL, queue_size=EVENT_QUEUE_SIZE):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.flush_interval = flush_interval
+        self.dropped = 0
+
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._file = open(path, "a", encoding="utf-8")
+        self._thread = threading.Thread(target=self._writer_loop, name="EventLogger", daemon=True)
+        self._thread.start()
+
+    def log(self, event):
+        """event: dict ที่แปลงเป็น JSON ได้ (เรียกจาก frame loop)"""
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+
+    def _drain(self):
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                return batch
+
+    def _rotate(self):
+        self._file.close()
+        for i in range(self.backups - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def _write(self, batch):
+        if not batch:
+            return
+        lines = "".join(json.dumps(event, ensure_ascii=False) + "\n" for event in batch)
+        self._file.write(lines)
+        self._file.flush()
+        if self._file.tell() >= self.max_bytes:
+            self._rotate()
+
+    def _writer_loop(self):
+        # ไฟล์เป็นของ thread นี้คนเดียว: เขียนที่ค้างในคิวชุดสุดท้ายแล้วปิดเองก่อนออก
+        # (close() ไม่ปิดไฟล์แทน เพราะ thread อาจยังเขียนอยู่)
+        try:
+            while not self._stop.wait(self.flush_interval):
+                self._write_safe()
+            self._write_safe()
+        finally:
+            self._file.close()
+
+    def _write_safe(self):
+        try:
+            self._write(self._drain())
+        except OSError as e:
+            print(f"EventLogger: write failed ({e})")
+
+    def close(self, timeout=5.0):
+        """
+        สั่งให้ thread เขียนที่ค้างในคิวให้หมดแล้วปิดไฟล์ รอไม่เกิน timeout วินาที
+        return: True ถ้าเขียนเสร็จและปิดไฟล์แล้ว (False = thread ยังเขียนอยู่ จะปิดไฟล์เองเมื่อเสร็จ)
+        """
+        self._stop.set()
+        self._thread.join(timeout=timeout)
+        if self._thread.is_alive():
+            print(f"EventLogger: still writing {self._queue.qsize()} queued event(s) to {self.path}")
+            return False
+        return True
+
+class EventTracker:
+    """
+    ตรวจการเปลี่ยนสถานะของผู้ขับ 1 คน จาก status ของ DriverMonitor ทีละเฟรม
+    ส่งเหตุการณ์ "start" ตอนเริ่ม และ "end" (พร้อม duration) ตอนจบ ให้ EventLogger
+    แต่ละเหตุการณ์แนบค่าที่วัดได้ ณ ตอนนั้น (EAR, MAR, Pitch, Yaw, Iris, Score)
+    """
+    def __init__(self, logger, source="", clock=None):
+        self.logger = logger
+        self.source = source
+        self.clock = clock or SYSTEM_CLOCK
+        self.active = {}  # ชื่อเหตุการณ์ -> เวลาเริ่ม
+
+    def _emit(self, name, phase, now, features, duration=None):
+        event = {"t": round(now, 3), "source": self.source, "event": name, "phase": phase}
+        if duration is not None:
+            event["duration"] = round(duration, 3)
+        event["features"] = features
+        self.logger.log(event)
+
+    def update(self, status, snapshot, now=None):
+        """
+        status: dict จาก DriverMonitor.update()
+        snapshot: ฟังก์ชันคืน dict ค่าที่แนบไปกับเหตุการณ์ (เรียกเฉพาะเฟรมที่มีเหตุการณ์)
+        key ที่ไม่มีใน status (เช่น ตอนนิ่งซึ่ง monitor หยุดคำนวณส่วนอื่น) ถือว่าสถานะเดิม
+        """
+        if now is None: now = self.clock.now()
+        features = None
+        for name, key in EVENT_FLAGS.items():
+            if key not in status:
+                continue
+            on = bool(status[key])
+            if on == (name in self.active):
+                continue
+
+            if features is None: features = snapshot()
+            if on:
+                self.active[name] = now
+                self._emit(name, "start", now, features)
+            else:
+                start = self.active.pop(name)
+                self._emit(name, "end", now, features, now - start)
+
+    def end_all(self, snapshot, now=None):
+        """ปิดทุกเหตุการณ์ที่ค้างอยู่ (เช่น เข้าโหมดพัก หรือปิดโปรแกรม)"""
+        if not self.active: return
+        if now is None: now = self.clock.now()
+        features = snapshot()
+        for name, start in list(self.active.items()):
+            self._emit(name, "end", now, features, now - start)
+        self.active.clear()
@@ -0,0 +1,192 @@
+# logic/fatigue.py
+import math
+from collections import deque
+import numpy as np
+from src.config import FATIGUE_WINDOWS, FATIGUE_MAX_GAP
+
+# ช่วงแรกที่ข้อมูลยังไม่ถึงครึ่งหน้าต่าง หาร PERCLOS ด้วยครึ่งหน้าต่างแทน
+# (ไม่ให้ตาปิดไม่กี่วินาทีแรกหลัง Calibrate ได้ PERCLOS สูงเกินจริง)
+MIN_COVERAGE = 0.5
+
+class _Ring:
+    """
+    array วนหลาย column อ้างอิงด้วยเลขลำดับสะสม (ไม่วนกลับ ช่องจริง = เลข % capacity)
+    เต็มเมื่อไหร่ขยายเท่าตัว โดยเก็บเฉพาะค่าตั้งแต่ oldest ที่ยังมีหน้าต่างใช้อยู่
+    """
+    def __init__(self, columns, capacity=256):
+        self.capacity = capacity
+        self.columns = {name: np.zeros(capacity, dtype=dtype) for name, dtype in columns}
+        self.head = 0  # เลขของค่าถัดไป
+
+    def append(self, oldest, values):
+        """values: ค่าตามลำดับ column return: เลขของค่าที่เพิ่ม"""
+        if self.head - oldest >= self.capacity:
+            self._grow(oldest)
+        i = self.head % self.capacity
+        for column, value in zip(self.columns.values(), values):
+            column[i] = value
+        self.head += 1
+        return self.head - 1
+
+    def _grow(self, oldest):
+        capacity = self.capacity * 2
+        keep = np.arange(oldest, self.head)
+        for name, column in self.columns.items():
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[keep % capacity] = column[keep % self.capacity]
+            self.columns[name] = grown
+        self.capacity = capacity
+
+    def get(self, name, index):
+        return self.columns[name][index % self.capacity].item()
+
+    def set(self, name, index, value):
+        self.columns[name][index % self.capacity] = value
+
+class _Window:
+    """ผลรวมสะสมของ 1 หน้าต่าง (บวกตอนค่าเข้า ลบตอนค่าหลุด)"""
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.frame_tail = 0  # เลขเฟรมเก่าสุดที่ยังอยู่ในหน้าต่าง
+        self.total_time = 0.0
+        self.closed_time = 0.0
+        self.blink_tail = 0  # เลข blink เก่าสุดที่ยังอยู่ในหน้าต่าง
+        self.blinks = 0      # นับตั้งแต่ตาเริ่มปิด (รวมครั้งที่ยังปิดอยู่)
+        self.completed = 0   # ครั้งที่ลืมตาแล้ว (รู้ระยะเวลา)
+        self.duration_sum = 0.0
+        self.longest = deque()  # เลข blink เรียงตามเวลา ระยะเวลาลดลงเรื่อยๆ (ตัวแรก = ยาวสุดในหน้าต่าง)
+        self.intervals = 0
+        self.interval_sum = 0.0
+        self.interval_sq = 0.0
+
+class FatigueMetrics:
+    """
+    สถิติความล้าจากการปิด/เปิดตาทีละเฟรม หลายหน้าต่างเลื่อนพร้อมกัน (เช่น 10 วินาที, 1 นาที, 5 นาที)
+    - PERCLOS: สัดส่วนเวลาที่ตาปิดในหน้าต่าง
+    - จำนวน/อัตราการกระพริบ, ระยะเวลาที่ตาปิดแต่ละครั้ง (เฉลี่ย/ยาวสุด), ช่วงห่างระหว่างการกระพริบ (เฉลี่ย/SD)
+    เฟรมและการกระพริบเก็บใน ring buffer ครั้งเดียว ทุกหน้าต่างมีแค่ตำแหน่งท้าย + ผลรวม
+    ค่าแต่ละค่าเข้าและหลุดจากแต่ละหน้าต่างครั้งเดียว -> O(1) ต่อเฟรม ไม่ว่าหน้าต่างจะยาวแค่ไหน
+
+    max_gap: ช่วงระหว่างเฟรมที่นับเป็นเวลาได้สูงสุด (หน้าหาย/ภาพใช้ไม่ได้นานๆ ไม่นับเป็นเวลาตาปิด/เปิด)
+    """
+    def __init__(self, windows=FATIGUE_WINDOWS, max_gap=FATIGUE_MAX_GAP):
+        self.windows = {s: _Window(s) for s in sorted({float(s) for s in windows})}
+        self._widest = self.windows[max(self.windows)]  # หน้าต่างยาวสุดเก็บค่าเก่าสุด
+        self.max_gap = max_gap
+        self._frames = _Ring((("t", np.float64), ("dt", np.float64), ("closed", bool)))
+        # duration = NaN ระหว่างที่ตายังปิด, interval = NaN ถ้าเป็นครั้งแรก
+        self._blinks = _Ring((("start", np.float64), ("duration", np.float64), ("interval", np.float64)))
+        self._last_t = None
+        self._closed = False
+        self._open_blink = -1  # เลข blink ที่ตายังปิดอยู่
+        self._open_start = 0.0
+        self._last_onset = None
+        self.total_blinks = 0
+
+    def update(self, eye_closed, now):
+        """เพิ่ม 1 เฟรม: eye_closed = ตาปิดในเฟรมนี้, now = เวลาของเฟรม (วินาที)"""
+        eye_closed = bool(eye_closed)
+        dt = 0.0 if self._last_t is None else min(max(now - self._last_t, 0.0), self.max_gap)
+        self._last_t = now
+        windows = self.windows.values()
+
+        self._frames.append(self._widest.frame_tail, (now, dt, eye_closed))
+        for w in windows:
+            w.total_time += dt
+            if eye_closed: w.closed_time += dt
+
+        if eye_closed and not self._closed:
+            self._blink_start(now)
+        elif self._closed and not eye_closed and self._open_blink >= 0:
+            self._blink_end(now)
+        self._closed = eye_closed
+
+        frames, blinks = self._frames, self._blinks
+        for w in windows:
+            limit = now - w.seconds  # ค่าที่เก่ากว่า limit หลุดจากหน้าต่าง
+            while w.frame_tail < frames.head and frames.get("t", w.frame_tail) < limit:
+                self._evict_frame(w)
+            while w.blink_tail < blinks.head and blinks.get("start", w.blink_tail) < limit:
+                self._evict_blink(w)
+
+    def _blink_start(self, now):
+        interval = now - self._last_onset if self._last_onset is not None else math.nan
+        index = self._blinks.append(self._widest.blink_tail, (now, math.nan, interval))
+        self._open_blink = index
+        self._open_start = now
+        self._last_onset = now
+        self.total_blinks += 1
+        for w in self.windows.values():
+            w.blinks += 1
+            if not math.isnan(interval):
+                w.intervals += 1
+                w.interval_sum += interval
+                w.interval_sq += interval * interval
+
+    def _blink_end(self, now):
+        index = self._open_blink
+        duration = now - self._open_start
+        self._blinks.set("duration", index, duration)
+        self._open_blink = -1
+        durations = self._blinks
+        for w in self.windows.values():
+            if index < w.blink_tail: continue  # ตาปิดนานจนจุดเริ่มหลุดจากหน้าต่างไปแล้ว
+            w.completed += 1
+            w.duration_sum += duration
+            while w.longest and durations.get("duration", w.longest[-1]) <= duration:
+                w.longest.pop()
+            w.longest.append(index)
+
+    def _evict_frame(self, w):
+        frames, i = self._frames, w.frame_tail
+        dt = frames.get("dt", i)
+        w.total_time -= dt
+        if frames.get("closed", i): w.closed_time -= dt
+        w.frame_tail += 1
+
+    def _evict_blink(self, w):
+        blinks, i = self._blinks, w.blink_tail
+        w.blinks -= 1
+        interval = blinks.get("interval", i)
+        if not math.isnan(interval):
+            w.intervals -= 1
+            w.interval_sum -= interval
+            w.interval_sq -= interval * interval
+        duration = blinks.get("duration", i)
+        if not math.isnan(duration):  # ลืมตาแล้วตอนที่ยังอยู่ในหน้าต่าง (ถูกนับไว้)
+            w.completed -= 1
+            w.duration_sum -= duration
+            if w.longest and w.longest[0] == i:
+                w.longest.popleft()
+        w.blink_tail += 1
+
+    def perclos(self, seconds):
+        w = self.windows[float(seconds)]
+        return max(w.closed_time, 0.0) / max(w.total_time, w.seconds * MIN_COVERAGE)
+
+    def blink_count(self, seconds):
+        """จำนวนครั้งที่ตาเริ่มปิดในหน้าต่าง (รวมครั้งที่ยังปิดอยู่)"""
+        return self.windows[float(seconds)].blinks
+
+    def stats(self, seconds):
+        """สถิติทั้งหมดของหน้าต่าง seconds (เวลาเป็นวินาที, blink_rate เป็นครั้ง/นาที)"""
+        w = self.windows[float(seconds)]
+        mean_duration = w.duration_sum / w.completed if w.completed else 0.0
+        max_duration = float(self._blinks.get("duration", w.longest[0])) if w.longest else 0.0
+        interval_mean = interval_std = 0.0
+        if w.intervals:
+            interval_mean = w.interval_sum / w.intervals
+            interval_std = math.sqrt(max(w.interval_sq / w.intervals - interval_mean * interval_mean, 0.0))
+        return {
+            "perclos": self.perclos(seconds),
+            "blinks": w.blinks,
+            "blink_rate": w.blinks * 60.0 / w.seconds,
+            "blink_mean": mean_duration,
+            "blink_max": max_duration,
+            "interval_mean": interval_mean,
+            "interval_std": interval_std,
+        }
+
+    def summary(self):
+        """สถิติของทุกหน้าต่าง {วินาที: stats}"""
+        return {seconds: self.stats(seconds) for seconds in self.windows}
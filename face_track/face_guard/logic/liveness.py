@@ -1,23 +1,34 @@
 # logic/liveness.py
-import numpy as np
-from collections import deque
-from src.config import STATIC_VAR_THRESH
+from src.config import STATIC_VAR_THRESH, LIVENESS_NOSE_WINDOW, LIVENESS_IRIS_WINDOW
+from logic.rolling import RollingStats
+
+NOSE_TIP = 1
+IRIS_CENTER = 468
 
 class ActivityDetector:
-    def __init__(self):
-        self.nose_history = deque(maxlen=60) 
-        self.iris_history = deque(maxlen=60)
-        
-    def update_nose(self, nose_landmark, width, height):
-        x = nose_landmark.x * width
-        y = nose_landmark.y * height
-        self.nose_history.append((x, y))
+    def __init__(self, nose_window=LIVENESS_NOSE_WINDOW, iris_window=LIVENESS_IRIS_WINDOW):
+        # ตำแหน่ง (x, y) ย้อนหลัง พร้อมค่าเฉลี่ย/ความแปรปรวนที่อัปเดตทีละเฟรม
+        self.nose_history = RollingStats(nose_window)
+        self.iris_history = RollingStats(iris_window)
+
+    def update(self, points):
+        """
+        อัปเดตทั้งจมูกและตาดำจาก array (N, 3) พิกัด pixel
+        """
+        self.update_nose(points[NOSE_TIP])
+        if len(points) > IRIS_CENTER:
+            self.update_iris(points[IRIS_CENTER])
+
+    def update_nose(self, nose_point):
+        self.nose_history.push(nose_point[:2])
+
+    def update_iris(self, iris_point):
+        if iris_point is not None:
+            self.iris_history.push(iris_point[:2])
 
-    def update_iris(self, iris_landmark, width, height):
-        if iris_landmark:
-            x = iris_landmark.x * width
-            y = iris_landmark.y * height
-            self.iris_history.append((x, y))
+    def nose_variance(self):
+        """ความแปรปรวนของจมูก แกน X + Y รวมกัน"""
+        return self.nose_history.total_variance()
 
     def check_static(self, blink_count_recent):
         """
@@ -27,15 +38,13 @@ class ActivityDetector:
         # ข้อมูลต้องพอประมาณ (20 เฟรม)
         if len(self.nose_history) < 20: return False
         
-        # 1. คำนวณความนิ่งจมูก
-        nose_data = np.array(self.nose_history)
-        nose_var = np.var(nose_data[:, 0]) + np.var(nose_data[:, 1])
+        # 1. คำนวณความนิ่งจมูก (แกน X + Y ในครั้งเดียว)
+        nose_var = self.nose_variance()
         
         # 2. คำนวณความนิ่งตา (ถ้ามีข้อมูล)
         iris_var = 100 # ค่าเริ่มต้นสูงๆ
         if len(self.iris_history) > 20:
-            iris_data = np.array(self.iris_history)
-            iris_var = np.var(iris_data[:, 0]) + np.var(iris_data[:, 1])
+            iris_var = self.iris_history.total_variance()
         
         # 3. เช็คความนิ่ง (ใช้อันใดอันหนึ่งที่นิ่งผิดปกติ)
         # เราใช้ STATIC_VAR_THRESH (เช่น 0.08)
@@ -46,4 +55,4 @@ class ActivityDetector:
         has_blinked = blink_count_recent > 0
         
         # ถ้านิ่ง และ ไม่กระพริบตา = Lock ระบบ
-        return is_still and (not has_blinked)
\ No newline at end of file
+        return is_still and (not has_blinked)
@@ -0,0 +1,156 @@
+# logic/monitor.py
+from logic.timers import EventTimer
+from logic.scoring import ScoreManager
+from logic.priority import RuleEngine
+from logic.clock import SYSTEM_CLOCK
+from logic.fatigue import FatigueMetrics
+from src.config import FATIGUE_WINDOWS
+
+class DriverMonitor:
+    """
+    ตรรกะตัดสินใจของโหมด RUNNING (กระพริบตา, ความนิ่ง, หลับ, หาว, ละสายตา, ขับนาน)
+    ใช้ร่วมกันทั้งกล้องสด (main) และวิดีโอที่บันทึกไว้ (replay)
+    เกณฑ์และลำดับคำเตือนอยู่ใน RuleEngine (logic/priority.py) ส่วนนี้เก็บ state ทีละเฟรม
+    """
+    def __init__(self, calibrator, liveness, now=None, rules=None, clock=None):
+        self.calibrator = calibrator
+        self.liveness = liveness
+        self.rules = rules or RuleEngine()
+        self.clock = clock or SYSTEM_CLOCK
+        self.score_mgr = ScoreManager(now, self.clock)
+
+        # Timers
+        params = self.rules.params
+        self.timer_sleep = EventTimer(params["time_to_sleep"], self.clock)
+        self.timer_yawn = EventTimer(params["time_to_yawn"], self.clock)
+        self.timer_distract = EventTimer(params["time_to_distract"], self.clock)
+        self.timer_recovery = EventTimer(params["sleep_recovery_time"], self.clock)
+
+        # หน้าต่างของ config + หน้าต่างที่กฎใช้ (sweep ปรับได้)
+        self.fatigue = FatigueMetrics(FATIGUE_WINDOWS + (params["blink_window"], params["perclos_window"]))
+        self.is_sleep_locked = False
+        self.drive_start_time = None
+
+        # ค่าความนิ่งล่าสุด (ไว้โชว์ Debug)
+        self.nose_var = 100.0
+
+    def start(self, now=None):
+        """เริ่มนับเวลาขับ (เรียกตอน Calibrate เสร็จ)"""
+        self.drive_start_time = now if now is not None else self.clock.now()
+
+    def hold(self, now=None):
+        """เฟรมที่เชื่อไม่ได้ (ภาพมืด/เบลอ/หน้าเล็ก): หยุด timer ทุกตัวและคะแนนไว้ที่เดิม"""
+        if now is None: now = self.clock.now()
+        for timer in (self.timer_sleep, self.timer_yawn, self.timer_distract, self.timer_recovery):
+            timer.hold(now)
+        self.score_mgr.hold(now)
+
+    def update(self, ear, mar, pitch, yaw, iris_pos, now=None):
+        """
+        ประมวลผล 1 เฟรม (ค่าที่ Smooth แล้ว)
+        return: dict สถานะทั้งหมดที่ต้องใช้วาด UI / บันทึกผล
+        """
+        if now is None: now = self.clock.now()
+        cal = self.calibrator
+        params = self.rules.params
+        cond = self.rules.conditions(ear, mar, pitch, yaw, iris_pos,
+                                     (cal.thresh_ear, cal.thresh_mar, cal.base_yaw, cal.base_pitch))
+
+        # =========================================================
+        #  A. BLINK TRACKING (PERCLOS / blink ทุกหน้าต่างใน logic/fatigue.py)
+        # =========================================================
+        is_eye_closed_now = bool(cond["eye_closed"])
+        self.fatigue.update(is_eye_closed_now, now)
+
+        blink_rate = self.fatigue.blink_count(params["blink_window"])
+        is_rapid_blink = blink_rate >= params["blink_freq_threshold"]
+        perclos = self.fatigue.perclos(params["perclos_window"])
+        is_high_perclos = perclos >= params["perclos_threshold"]
+
+        status = {
+            "blink_rate": blink_rate,
+            "is_rapid_blink": is_rapid_blink,
+            "perclos": perclos,
+            "is_high_perclos": is_high_perclos,
+        }
+
+        # =========================================================
+        #  B. STATIC CHECK (กันรูปถ่าย + กันหลับใน)
+        # =========================================================
+        if len(self.liveness.nose_history) > 10:
+            self.nose_var = self.liveness.nose_variance()
+        status["nose_var"] = self.nose_var
+
+        # ตรวจสอบความนิ่ง ถ้านิ่ง หยุดการประมวลผลส่วนที่เหลือ (ไม่คิดคะแนน)
+        status["is_static"] = self.liveness.check_static(blink_rate)
+        if status["is_static"]:
+            return status
+
+        # =========================================================
+        #  C. NORMAL DROWSINESS DETECTION
+        # =========================================================
+
+        # 1. Drive Time Check
+        drive_duration = now - self.drive_start_time
+        is_overtime = drive_duration > params["max_drive_time"]
+
+        # 2. Sleep Logic (ตาปิด และไม่ได้ก้ม/เงยมากเกินไป)
+        is_sleeping_raw = bool(cond["is_sleeping_raw"])
+
+        trig_sleep, prog_sleep = self.timer_sleep.update(is_sleeping_raw, now)
+        if trig_sleep: self.is_sleep_locked = True
+
+        if self.is_sleep_locked:
+            unlocked, _ = self.timer_recovery.update(not is_sleeping_raw, now)
+            if unlocked: self.is_sleep_locked = False
+            final_is_sleeping = True
+            prog_sleep = 1.0
+        else:
+            self.timer_recovery.update(False, now)
+            final_is_sleeping = is_sleeping_raw
+
+        # 3. Yawn Logic
+        is_yawning = bool(cond["is_yawning"])
+        trig_yawn, prog_yawn = self.timer_yawn.update(is_yawning, now)
+
+        # 4. Distraction Logic (หันมาก / ก้มเงยมาก / หันพอประมาณแต่ตามองไปทางเดียวกัน)
+        is_distracted = bool(cond["is_distracted"])
+        trig_distract, prog_distract = self.timer_distract.update(is_distracted, now)
+
+        # =========================================================
+        #  D. PRIORITY WARNING SYSTEM
+        # =========================================================
+        # Sleep > Distraction > Yawn > Overtime (PRIORITY_RULES)
+        rule = self.rules.select({
+            "is_sleep_locked": self.is_sleep_locked,
+            "trig_distract": trig_distract,
+            "trig_yawn": trig_yawn,
+            "is_overtime": is_overtime,
+        })
+        _, warning_msg, warning_sub, penalty = rule or (-1, "", "", None)
+        score_mgr = self.score_mgr
+
+        if penalty:
+            score_mgr.update(penalty == "sleep", penalty == "yawn", penalty == "distract", False, False, False, now)
+            curr_score = score_mgr.score
+        else:
+            # Normal case (รวม Overtime)
+            curr_score = score_mgr.update(False, False, False, is_rapid_blink, is_high_perclos, True, now)
+
+        status.update({
+            "drive_duration": drive_duration,
+            "is_overtime": is_overtime,
+            "is_sleep_locked": self.is_sleep_locked,
+            "final_is_sleeping": final_is_sleeping,
+            "prog_sleep": prog_sleep,
+            "is_yawning": is_yawning,
+            "trig_yawn": trig_yawn,
+            "prog_yawn": prog_yawn,
+            "is_distracted": is_distracted,
+            "trig_distract": trig_distract,
+            "prog_distract": prog_distract,
+            "warning_msg": warning_msg,
+            "warning_sub": warning_sub,
+            "score": curr_score,
+        })
+        return status
@@ -0,0 +1,230 @@
+# logic/priority.py
+import numpy as np
+from src.config import (TIME_TO_SLEEP, TIME_TO_YAWN, TIME_TO_DISTRACT, SLEEP_RECOVERY_TIME,
+                        BLINK_FREQ_THRESHOLD, MAX_DRIVE_TIME, PITCH_DOWN_LIMIT, PITCH_UP_LIMIT,
+                        YAW_SOFT_LIMIT, YAW_HARD_LIMIT, BLINK_WINDOW, PERCLOS_WINDOW, PERCLOS_THRESHOLD,
+                        FATIGUE_MAX_GAP)
+from logic.fatigue import MIN_COVERAGE
+from logic.scoring import ScoreManager
+
+# ค่าที่ปรับได้ทั้งหมดของการตัดสินใจ (sweep ใน src/sweep.py ด้วยชื่อเหล่านี้)
+DEFAULT_PARAMS = {
+    "time_to_sleep": TIME_TO_SLEEP,
+    "time_to_yawn": TIME_TO_YAWN,
+    "time_to_distract": TIME_TO_DISTRACT,
+    "sleep_recovery_time": SLEEP_RECOVERY_TIME,
+    "blink_freq_threshold": BLINK_FREQ_THRESHOLD,
+    "blink_window": BLINK_WINDOW,
+    "perclos_window": PERCLOS_WINDOW,
+    "perclos_threshold": PERCLOS_THRESHOLD,
+    "max_drive_time": MAX_DRIVE_TIME,
+    "pitch_down": PITCH_DOWN_LIMIT,
+    "pitch_up": PITCH_UP_LIMIT,
+    "yaw_soft": YAW_SOFT_LIMIT,
+    "yaw_hard": YAW_HARD_LIMIT,
+    "ear_scale": 1.0,   # คูณ thresh_ear จาก Calibration
+    "mar_offset": 0.0,  # บวก thresh_mar จาก Calibration
+}
+
+# เหตุการณ์ที่ต้องเกิดต่อเนื่องจนครบเวลา: ชื่อ -> (เงื่อนไขดิบ, ค่าเวลาใน params)
+TIMED_RULES = {
+    "sleep": ("is_sleeping_raw", "time_to_sleep"),
+    "yawn": ("is_yawning", "time_to_yawn"),
+    "distract": ("is_distracted", "time_to_distract"),
+}
+
+# ลำดับความสำคัญของคำเตือน (บนสุดสำคัญสุด)
+# (flag ใน status, ข้อความ, ข้อความรอง, โทษที่ใช้คิดคะแนน: None = คิดแบบปกติ)
+PRIORITY_RULES = (
+    ("is_sleep_locked", "WAKE UP!", "Drowsiness Detected", "sleep"),
+    ("trig_distract", "EYES ON ROAD", "", "distract"),
+    ("trig_yawn", "TAKE A BREAK", "Yawning", "yawn"),
+    ("is_overtime", "TIME TO REST", "", None),
+)
+
+def _run_elapsed(cond, t):
+    """เวลาที่ cond เป็น True ต่อเนื่องมาจนถึงแต่ละเฟรม (0 ถ้า False) เหมือน EventTimer ทีละเฟรม"""
+    if len(cond) == 0:
+        return np.zeros(0)
+    idx = np.arange(len(cond))
+    starts = cond & ~np.r_[False, cond[:-1]]
+    run_start = np.maximum.accumulate(np.where(starts, idx, 0))
+    return np.where(cond, t - t[run_start], 0.0)
+
+def _timer(cond, t, limit):
+    """EventTimer แบบทั้งคลิป return: (triggered, progress)"""
+    elapsed = _run_elapsed(cond, t)
+    return cond & (elapsed >= limit), np.minimum(elapsed / limit, 1.0)
+
+def _latch(on, off):
+    """สถานะค้าง: เปิดที่เฟรม on, ปิดที่เฟรม off (ค่าของเหตุการณ์ล่าสุด)"""
+    idx = np.arange(len(on))
+    last = np.maximum.accumulate(np.where(on | off, idx, -1))
+    return (last >= 0) & on[np.maximum(last, 0)]
+
+def _fill_forward(values, mask, initial=0.0):
+    """ค่าที่เฟรม mask ค้างไว้จนถึงเฟรม mask ถัดไป"""
+    idx = np.arange(len(mask))
+    last = np.maximum.accumulate(np.where(mask, idx, -1))
+    out = np.full(len(mask), initial, dtype=np.float64)
+    has = last >= 0
+    out[has] = values[last[has]]
+    return out
+
+class RuleEngine:
+    """
+    กฎตัดสินใจของโหมด RUNNING (หลับ, หาว, ละสายตา, ขับนาน และลำดับคำเตือน)
+    - conditions(): เงื่อนไขดิบ ใช้ได้ทั้งค่า 1 เฟรม (DriverMonitor) และ NumPy array ทั้งคลิป
+    - select(): เลือกคำเตือนตาม PRIORITY_RULES
+    - evaluate(): คำนวณทั้งคลิปในครั้งเดียวจากค่าที่บันทึกไว้ (ไม่ต้องรัน MediaPipe ใหม่)
+    """
+    def __init__(self, params=None):
+        self.params = dict(DEFAULT_PARAMS)
+        if params:
+            unknown = set(params) - set(DEFAULT_PARAMS)
+            if unknown:
+                raise ValueError(f"Unknown rule params: {', '.join(sorted(unknown))}")
+            self.params.update(params)
+
+    def thresholds(self, thresh_ear, thresh_mar):
+        """ปรับเกณฑ์ตา/ปากจาก Calibration ตาม ear_scale / mar_offset"""
+        p = self.params
+        return thresh_ear * p["ear_scale"], thresh_mar + p["mar_offset"]
+
+    def conditions(self, ear, mar, pitch, yaw, iris, calibration):
+        """
+        calibration: (thresh_ear, thresh_mar, base_yaw, base_pitch) ลำดับเดียวกับไฟล์ replay
+        ค่าที่ส่งมาเป็นตัวเลขเดี่ยวหรือ array ก็ได้ (ใช้ & | แทน and/or)
+        """
+        p = self.params
+        thresh_ear, thresh_mar, base_yaw, base_pitch = calibration
+        thresh_ear, thresh_mar = self.thresholds(thresh_ear, thresh_mar)
+        dpitch = pitch - base_pitch
+        dyaw = yaw - base_yaw
+
+        eye_closed = ear < thresh_ear
+        # ก้ม/เงยมากเกินไป ไม่นับว่าหลับ
+        good_angle = (dpitch >= p["pitch_down"]) & (dpitch <= p["pitch_up"])
+        # หันมาก หรือ หันพอประมาณแต่ตาดำมองไปทางเดียวกัน
+        looking_away = ((dyaw < 0) & (iris == "LEFT")) | ((dyaw > 0) & (iris == "RIGHT"))
+        is_distracted = ((abs(dyaw) > p["yaw_hard"]) | (abs(dpitch) > p["pitch_up"]) |
+                         ((abs(dyaw) > p["yaw_soft"]) & looking_away))
+        return {
+            "eye_closed": eye_closed,
+            "is_sleeping_raw": good_angle & eye_closed,
+            "is_yawning": mar > thresh_mar,
+            "is_distracted": is_distracted,
+        }
+
+    def select(self, flags):
+        """return: (index, ข้อความ, ข้อความรอง, โทษ) ของกฎแรกที่เป็นจริง หรือ None"""
+        for i, (flag, msg, sub, penalty) in enumerate(PRIORITY_RULES):
+            if flags.get(flag):
+                return i, msg, sub, penalty
+        return None
+
+    def evaluate(self, t, ear, mar, pitch, yaw, iris, calibration, running, static, drive_start=None, t0=None):
+        """
+        คำนวณผลทั้งคลิปในครั้งเดียว ได้ผลเหมือน DriverMonitor.update() ทีละเฟรม
+        running: เฟรมที่อยู่ในโหมด RUNNING (รวมเฟรมนิ่ง), static: เฟรมที่ liveness ว่านิ่ง
+        (ค่านิ่งใช้ตามที่บันทึกไว้ เพราะต้องใช้จุดบนหน้าซึ่งไม่ได้เก็บ)
+        drive_start: เวลาที่ Calibrate เสร็จ, t0: เวลาที่เริ่ม session (เริ่มนับคะแนน)
+        return: dict ของ array ยาวเท่าคลิป (เฟรมที่ไม่ได้คำนวณเป็น False / 0)
+        """
+        p = self.params
+        t = np.asarray(t, dtype=np.float64)
+        running = np.asarray(running, dtype=bool)
+        active = running & ~np.asarray(static, dtype=bool)
+        n = len(t)
+        if drive_start is None: drive_start = t[running][0] if running.any() else 0.0
+        if t0 is None: t0 = t[0] if n else 0.0
+
+        cond = self.conditions(np.asarray(ear), np.asarray(mar), np.asarray(pitch), np.asarray(yaw),
+                               np.asarray(iris), calibration)
+
+        # A. Blink: นับขอบตาปิดเฉพาะเฟรม RUNNING (ช่วงอื่น monitor ไม่ได้ถูกเรียก)
+        tr = t[running]
+        closed = cond["eye_closed"][running]
+        onsets = closed & ~np.r_[False, closed[:-1]]
+        blink_times = tr[onsets]
+        in_window = (np.searchsorted(blink_times, tr, side="right") -
+                     np.searchsorted(blink_times, tr - p["blink_window"], side="left"))
+        blink_rate = np.zeros(n, dtype=np.int16)
+        blink_rate[running] = in_window
+        is_rapid_blink = running & (blink_rate >= p["blink_freq_threshold"])
+
+        # PERCLOS: เวลาตาปิด / เวลาทั้งหมดในหน้าต่าง (ช่วงห่างแต่ละเฟรมไม่เกิน FATIGUE_MAX_GAP เหมือน FatigueMetrics)
+        dt = np.clip(np.diff(tr, prepend=tr[:1]), 0.0, FATIGUE_MAX_GAP)
+        total = np.r_[0.0, np.cumsum(dt)]
+        closed_time = np.r_[0.0, np.cumsum(np.where(closed, dt, 0.0))]
+        start = np.searchsorted(tr, tr - p["perclos_window"], side="left")
+        end = np.arange(1, len(tr) + 1)
+        perclos = np.zeros(n)
+        perclos[running] = ((closed_time[end] - closed_time[start]) /
+                            np.maximum(total[end] - total[start], p["perclos_window"] * MIN_COVERAGE))
+        is_high_perclos = running & (perclos >= p["perclos_threshold"])
+
+        # C. Timers เดินเฉพาะเฟรมที่ไม่นิ่ง (เฟรมนิ่ง monitor หยุดก่อนถึงส่วนนี้)
+        ta = t[active]
+        out = {"blink_rate": blink_rate, "is_rapid_blink": is_rapid_blink, "perclos": perclos,
+               "is_high_perclos": is_high_perclos, "active": active}
+        sub = {}
+        for name, (key, limit) in TIMED_RULES.items():
+            sub[key] = cond[key][active]
+            sub["trig_" + name], sub["prog_" + name] = _timer(sub[key], ta, p[limit])
+
+        # Sleep lock: ค้างตั้งแต่หลับครบเวลา จนกว่าจะลืมตาต่อเนื่องครบ sleep_recovery_time
+        # (เฟรมที่ล็อกเป็นเฟรมหลับเสมอ ช่วงลืมตาหลังจากนั้นจึงเริ่มนับหลังล็อกพอดี)
+        unlock, _ = _timer(~sub["is_sleeping_raw"], ta, p["sleep_recovery_time"])
+        locked = _latch(sub["trig_sleep"], unlock)
+        sub["is_sleep_locked"] = locked
+        # เฟรมที่ปลดล็อกยังนับเป็นเฟรมหลับ (monitor เช็คการปลดหลังจากตั้ง prog_sleep)
+        held = locked | np.r_[False, locked[:-1]]
+        sub["prog_sleep"] = np.where(held, 1.0, sub["prog_sleep"])
+        sub["is_overtime"] = (ta - drive_start) > p["max_drive_time"]
+
+        # D. Priority: กฎแรกที่เป็นจริง (np.select เรียงตามลำดับ)
+        warning = np.select([sub[flag] for flag, _, _, _ in PRIORITY_RULES],
+                            np.arange(len(PRIORITY_RULES)), default=-1).astype(np.int8)
+
+        # คะแนนสะสมต้องคำนวณตามลำดับเวลา (ตัดที่ 0..100 ทุกเฟรม)
+        score_mgr = ScoreManager(t0)
+        penalties = [rule[3] for rule in PRIORITY_RULES]
+        rapid = is_rapid_blink[active]
+        high_perclos = is_high_perclos[active]
+        scores = np.empty(len(ta))
+        for i, (now, code) in enumerate(zip(ta.tolist(), warning.tolist())):
+            penalty = penalties[code] if code >= 0 else None
+            if penalty:
+                score_mgr.update(penalty == "sleep", penalty == "yawn", penalty == "distract", False, False, False, now)
+            else:
+                score_mgr.update(False, False, False, rapid[i], high_perclos[i], True, now)
+            scores[i] = score_mgr.score
+
+        for key, values in sub.items():
+            full = np.zeros(n, dtype=values.dtype)
+            full[active] = values
+            out[key] = full
+        out["warning"] = np.full(n, -1, dtype=np.int8)
+        out["warning"][active] = warning
+        score = np.zeros(n)
+        score[active] = scores
+        out["score"] = _fill_forward(score, active)
+        return out
+
+def summarize(result, t):
+    """สรุปผลทั้งคลิป: จำนวนครั้งที่เกิดแต่ละเหตุการณ์, เวลาที่มีคำเตือน, คะแนนสูงสุด/สุดท้าย"""
+    active = result["active"]
+    t = np.asarray(t, dtype=np.float64)
+    summary = {}
+    for name, flag in (("sleep", "is_sleep_locked"), ("distract", "trig_distract"), ("yawn", "trig_yawn")):
+        on = result[flag][active]
+        summary[name] = int(np.count_nonzero(on & ~np.r_[False, on[:-1]]))
+
+    # เวลาที่มีคำเตือน (นับช่วงจากเฟรมนี้ถึงเฟรมถัดไป)
+    dt = np.diff(t, append=t[-1] if len(t) else 0.0)
+    summary["alert_time"] = float(dt[result["warning"] >= 0].sum())
+    summary["drive_time"] = float(dt[active].sum())
+    summary["max_score"] = float(result["score"].max()) if len(t) else 0.0
+    summary["final_score"] = float(result["score"][-1]) if len(t) else 0.0
+    return summary
@@ -0,0 +1,71 @@
+# logic/profiles.py
+import os
+import json
+import time
+import tempfile
+from src.config import PROFILE_PATH, FACE_BACKEND, TASKS_USE_BLENDSHAPES, TASKS_USE_TRANSFORM
+
+def feature_source(backend=FACE_BACKEND, blendshapes=TASKS_USE_BLENDSHAPES, transform=TASKS_USE_TRANSFORM):
+    """
+    แหล่งของ EAR/MAR/มุมหัว (คนละแหล่ง = คนละสเกล เช่น blendshape EAR ~1 ตอนลืมตา, เรขาคณิต ~0.3)
+    blendshape / transformation matrix มีเฉพาะ backend "tasks"
+    """
+    tasks = backend == "tasks"
+    return {"backend": backend, "blendshapes": bool(tasks and blendshapes), "transform": bool(tasks and transform)}
+
+class ProfileStore:
+    """
+    ค่า Calibration ของผู้ขับแต่ละคน (key = ชื่อ/รหัสผู้ขับ) เก็บในไฟล์ JSON เดียว
+    { "driver": {"thresh_ear", "thresh_mar", "base_yaw", "base_pitch", "reference", "source", "updated"} }
+    source: แหล่งของค่าที่ใช้ Calibrate (feature_source) ไม่ตรงกับของตอนนี้ -> ไม่ใช้ profile นั้น (Calibrate ใหม่)
+    บันทึกแบบ atomic: เขียนไฟล์ชั่วคราวในโฟลเดอร์เดียวกันแล้ว os.replace (ไฟล์ไม่มีทางเสียครึ่งๆ กลางๆ)
+    """
+    def __init__(self, path=PROFILE_PATH, source=None):
+        self.path = path
+        self.source = source or feature_source()
+        self.profiles = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                text = f.read()
+        except FileNotFoundError:
+            return {}
+        if not text.strip():
+            return {}
+        try:
+            data = json.loads(text)
+        except ValueError as e:
+            print(f"ProfileStore: ignoring unreadable {self.path} ({e})")
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def get(self, driver):
+        profile = self.profiles.get(driver)
+        if profile is not None and profile.get("source") != self.source:
+            # เกณฑ์คนละสเกลกับค่าที่จะวัดได้ (เตือนตลอด หรือไม่เตือนเลย) -> Calibrate ใหม่
+            print(f"ProfileStore: profile '{driver}' was calibrated with {profile.get('source')}, "
+                  f"now using {self.source}. Please re-calibrate.")
+            return None
+        return profile
+
+    def put(self, driver, calibrator, now=None):
+        profile = calibrator.to_profile()
+        profile["reference"] = calibrator.reference or calibrator.to_profile()
+        profile["source"] = dict(self.source)
+        profile["updated"] = round(now if now is not None else time.time(), 3)
+        self.profiles[driver] = profile
+
+    def save(self):
+        folder = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".profiles_", suffix=".tmp", dir=folder)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self.profiles, f, indent=2, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
@@ -0,0 +1,75 @@
+# logic/rolling.py
+import numpy as np
+
+class RollingStats:
+    """
+    หน้าต่างเลื่อนขนาดคงที่ของค่าหลายแกน (เช่น x, y) เก็บใน array วน (ring buffer)
+    อัปเดตค่าเฉลี่ย/ความแปรปรวนทีละค่า ตอนใส่ค่าใหม่และตอนค่าเก่าหลุดออก (Welford) -> O(1) ต่อเฟรม
+    คำนวณใหม่จาก buffer ทั้งก้อนทุก capacity ครั้งที่มีค่าหลุด กันความคลาดเคลื่อนสะสม
+    """
+    def __init__(self, capacity, dims=2):
+        self.capacity = capacity
+        self.dims = dims
+        self.buffer = np.zeros((capacity, dims), dtype=np.float64)
+        self.clear()
+
+    def clear(self):
+        self.count = 0
+        self.head = 0  # ช่องที่จะเขียนถัดไป (= ค่าเก่าสุดเมื่อเต็ม)
+        self.mean = [0.0] * self.dims
+        self.m2 = [0.0] * self.dims  # ผลรวมกำลังสองของส่วนต่างจากค่าเฉลี่ย
+        self._evicted = 0
+
+    def __len__(self):
+        return self.count
+
+    def push(self, value):
+        """value: ค่า 1 ชุด (ยาว dims) เช่น (x, y)"""
+        mean, m2 = self.mean, self.m2
+
+        if self.count == self.capacity:
+            old = self.buffer[self.head].tolist()
+            n = self.count - 1
+            if n == 0:
+                mean[:] = [0.0] * self.dims
+                m2[:] = [0.0] * self.dims
+            else:
+                for i in range(self.dims):
+                    d = old[i] - mean[i]
+                    mean[i] -= d / n
+                    m2[i] -= d * (old[i] - mean[i])
+            self.count = n
+            self._evicted += 1
+
+        self.buffer[self.head] = value
+        self.head = (self.head + 1) % self.capacity
+        n = self.count + 1
+        for i in range(self.dims):
+            x = float(value[i])
+            d = x - mean[i]
+            mean[i] += d / n
+            m2[i] += d * (x - mean[i])
+        self.count = n
+
+        if self._evicted >= self.capacity:
+            self._refresh()
+
+    def _refresh(self):
+        values = self.values()
+        self.mean = values.mean(axis=0).tolist()
+        self.m2 = (values.var(axis=0) * self.count).tolist()
+        self._evicted = 0
+
+    def values(self):
+        """ค่าในหน้าต่าง (ไม่เรียงตามเวลาเมื่อเต็มแล้ว) ใช้กับสถิติที่ไม่สนลำดับ"""
+        return self.buffer[:self.count]
+
+    def variance(self):
+        """ความแปรปรวนแต่ละแกน (แบบเดียวกับ np.var)"""
+        if self.count == 0:
+            return [0.0] * self.dims
+        return [max(m / self.count, 0.0) for m in self.m2]
+
+    def total_variance(self):
+        """ความแปรปรวนรวมทุกแกน"""
+        return sum(self.variance())
@@ -1,20 +1,22 @@
 # logic/scoring.py
-import time
+from logic.clock import SYSTEM_CLOCK
 
 class ScoreManager:
-    def __init__(self):
+    def __init__(self, now=None, clock=None):
+        self.clock = clock or SYSTEM_CLOCK
         self.score = 0.0
         self.max_score = 100
-        self.last_update = time.time()
+        self.last_update = now if now is not None else self.clock.now()
         
         self.PENALTY_SLEEP = 20.0   # เพิ่มความรุนแรง
         self.PENALTY_YAWN = 5.0
         self.PENALTY_DISTRACT = 8.0
         self.PENALTY_BLINK = 10.0    # โทษฐานกระพริบตาถี่
+        self.PENALTY_PERCLOS = 5.0   # ตาปิดบ่อย/นานสะสม (PERCLOS เกินเกณฑ์)
         self.HEAL_RATE = 2.0
 
-    def update(self, is_sleeping, is_yawning, is_distracted, is_rapid_blink, can_heal):
-        now = time.time()
+    def update(self, is_sleeping, is_yawning, is_distracted, is_rapid_blink, is_high_perclos, can_heal, now=None):
+        if now is None: now = self.clock.now()
         dt = now - self.last_update
         self.last_update = now
 
@@ -27,6 +29,8 @@ class ScoreManager:
             self.score += self.PENALTY_DISTRACT * dt
         elif is_rapid_blink:
             self.score += self.PENALTY_BLINK * dt
+        elif is_high_perclos:
+            self.score += self.PENALTY_PERCLOS * dt
         
         # ถ้าไม่มีความผิด และ "อนุญาตให้ฮีลได้" (can_heal) ค่อยลดคะแนน
         elif can_heal:
@@ -35,6 +39,10 @@ class ScoreManager:
         self.score = max(0.0, min(self.score, self.max_score))
         return int(self.score)
 
+    def hold(self, now=None):
+        """ข้ามช่วงเวลานี้ (ไม่เพิ่ม/ไม่ลดคะแนน)"""
+        self.last_update = now if now is not None else self.clock.now()
+
     def get_level(self):
         if self.score < 20: return "FRESH", (0, 255, 0)
         elif self.score < 50: return "TIRED", (0, 255, 255)
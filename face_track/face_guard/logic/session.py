@@ -0,0 +1,217 @@
+# logic/session.py
+import numpy as np
+from src.config import (DEFAULT_DRIVER, PROFILE_REFINE_ALPHA, PROFILE_MAX_DRIFT, PROFILE_MAX_ANGLE_DRIFT,
+                        PROFILE_SAVE_INTERVAL, SMOOTH_FEATURES, SMOOTH_LANDMARKS, SMOOTH_LANDMARK_PARAMS)
+from detectors.features import compute_features
+from detectors.attention import HeadPoseEstimator
+from detectors.smoothing import OneEuroBank
+from logic.clock import SYSTEM_CLOCK
+from logic.calibration import Calibrator
+from logic.liveness import ActivityDetector
+from logic.monitor import DriverMonitor
+
+# ค่าที่ Smooth ต่อท้ายจุดบนหน้าใน filter bank เดียวกัน (ตามลำดับนี้)
+FEATURE_KEYS = ("ear", "mar", "yaw", "pitch")
+
+class DriverSession:
+    """
+    state ทั้งหมดของผู้ขับ 1 คน (1 กล้อง): IDLE -> CALIBRATING -> RUNNING <-> RESTING -> IDLE
+    รับจุดบนหน้าทีละเฟรม แล้วอัปเดต Smoothing, Calibration และ DriverMonitor
+    ใช้ร่วมกันทั้งกล้องสด (main), replay และ fleet (หลายกล้องใน process เดียว)
+
+    auto_calibrate=True: เริ่ม Calibrate เองเมื่อเจอหน้าครั้งแรก (ไม่มีคนกดปุ่ม)
+    events: EventTracker (logic/events.py) บันทึกการเปลี่ยนสถานะลง log (None = ไม่บันทึก)
+    profiles: ProfileStore (logic/profiles.py) ถ้ามี profile ของ driver อยู่แล้วจะเข้า RUNNING ทันที
+              และปรับค่าทีละนิดระหว่างขับ (None = Calibrate ทุกครั้งแบบเดิม)
+    clock: แหล่งเวลา (logic/clock.py) ใช้เมื่อไม่ได้ส่ง now มา ส่งต่อให้ Calibrator/DriverMonitor ด้วย
+    """
+    def __init__(self, width, height, auto_calibrate=False, now=None, events=None, profiles=None,
+                 driver=DEFAULT_DRIVER, clock=None):
+        self.clock = clock or SYSTEM_CLOCK
+        self.width = width
+        self.height = height
+        self.auto_calibrate = auto_calibrate
+        self.events = events
+        self.profiles = profiles
+        self.driver = driver
+
+        self.mode = "IDLE"
+        self.pose = HeadPoseEstimator()
+
+        # One-Euro filter ของจุดบนหน้า + EAR/MAR/Yaw/Pitch (สร้างเมื่อรู้จำนวนจุดจริง)
+        self.filters = None
+        self._signal = None
+
+        self.calibrator = Calibrator(clock=self.clock)
+        self.liveness = ActivityDetector()
+        self.monitor = DriverMonitor(self.calibrator, self.liveness, now, clock=self.clock)
+
+        self.rest_start_time = None
+
+        # ผลของเฟรมล่าสุด (ค่าที่ Smooth แล้ว)
+        self.has_face = False
+        self.ear = self.mar = self.pitch = self.yaw = 0.0
+        self.points = None  # จุดบนหน้าที่ Smooth แล้ว (ใช้วาด mesh)
+        self.iris = ""
+        self.status = {}  # ผลของ DriverMonitor.update() (โหมด RUNNING)
+
+        self._profile_saved_at = now if now is not None else self.clock.now()
+        profile = profiles.get(driver) if profiles is not None else None
+        if profile is not None:
+            self.calibrator.load(profile)
+            self.mode = "RUNNING"
+            self.monitor.start(now)
+
+    # --- คำสั่ง (ปุ่ม c / r) ---
+    def calibrate(self, now=None):
+        """เริ่ม Calibrate (จากหน้าแรก หรือ Calibrate ใหม่ระหว่างขับ)"""
+        if self.mode not in ("IDLE", "RUNNING"): return
+        if self.mode == "RUNNING":
+            self.close_events(now)
+        self.mode = "CALIBRATING"
+        self.calibrator.start(now)
+
+    def rest(self, now=None):
+        if self.mode != "RUNNING": return
+        self.mode = "RESTING"
+        self.rest_start_time = now if now is not None else self.clock.now()
+        self.close_events(self.rest_start_time)
+        self.save_profile(self.rest_start_time)
+
+    def save_profile(self, now=None):
+        """บันทึกค่า Calibration ปัจจุบันของ driver ลงไฟล์"""
+        if self.profiles is None or not self.calibrator.is_finished: return
+        if now is None: now = self.clock.now()
+        self.profiles.put(self.driver, self.calibrator, now)
+        try:
+            self.profiles.save()
+        except OSError as e:
+            print(f"Cannot save profile '{self.driver}': {e}")
+        self._profile_saved_at = now
+
+    def close_events(self, now=None):
+        """ปิดเหตุการณ์ที่ค้างอยู่ (เข้าโหมดพัก / ปิดโปรแกรม)"""
+        if self.events is not None:
+            self.events.end_all(self.snapshot, now)
+
+    def snapshot(self):
+        """ค่าล่าสุดที่แนบไปกับเหตุการณ์"""
+        return {
+            "ear": round(float(self.ear), 4), "mar": round(float(self.mar), 4),
+            "pitch": round(float(self.pitch), 2), "yaw": round(float(self.yaw), 2),
+            "iris": self.iris, "score": round(float(self.monitor.score_mgr.score), 2),
+            "blink_rate": self.status.get("blink_rate", 0),
+            "perclos": round(float(self.status.get("perclos", 0.0)), 3),
+        }
+
+    def resume(self, now=None):
+        """
+        ออกจากโหมดพัก: มี profile -> ขับต่อทันที (เริ่มนับเวลาขับใหม่)
+        ไม่มี -> กลับไปหน้าแรก (บังคับ Calibrate ใหม่)
+        """
+        if self.mode != "RESTING": return
+        self.rest_start_time = None
+        if self.profiles is not None and self.calibrator.is_finished:
+            self.mode = "RUNNING"
+            self.monitor.start(now)
+        else:
+            self.mode = "IDLE"
+
+    def rest_elapsed(self, now=None):
+        if self.rest_start_time is None: return 0.0
+        if now is None: now = self.clock.now()
+        return now - self.rest_start_time
+
+    def update(self, points, direct=None, measured=True, now=None):
+        """
+        ประมวลผล 1 เฟรม
+        points: array (N, 3) พิกัด pixel หรือ None ถ้าไม่เจอหน้า
+        direct: ค่าสำเร็จรูปจาก detector.get_direct_features()
+        measured: False = จุดที่ทำนายไว้ (InferenceScheduler) ไม่ใช้อัปเดต liveness
+        return: โหมดของเฟรมนี้ (เฟรมที่ Calibrate เสร็จยังนับเป็น CALIBRATING)
+        """
+        if now is None: now = self.clock.now()
+        self.has_face = points is not None
+        if self.mode == "RESTING":
+            return self.mode
+
+        if points is None:
+            self.pose.reset()  # หน้าหาย เฟรมถัดไปเริ่ม solvePnP ใหม่
+            return self.mode
+
+        # 1. Raw Calculations (EAR, MAR, Pose, Iris ในรอบเดียว)
+        feats = compute_features(points, self.width, self.height, self.pose, direct)
+        self.iris = feats["iris"]
+
+        # 2. Liveness เฉพาะค่าที่วัดจริง ไม่ใช้ค่าที่ทำนาย
+        if measured:
+            self.liveness.update(points)
+
+        # 3. Smoothing (จุดบนหน้า + ค่าทั้ง 4 ในการอัปเดตครั้งเดียว)
+        self._smooth(points, feats, now)
+
+        if self.mode == "IDLE" and self.auto_calibrate:
+            self.calibrate(now)
+
+        mode = self.mode
+        if mode == "CALIBRATING":
+            self.calibrator.update(self.ear, self.mar, self.pitch, self.yaw, now)
+            if self.calibrator.is_finished:
+                self.mode = "RUNNING"
+                self.monitor.start(now)
+                self.save_profile(now)
+
+        elif mode == "RUNNING":
+            # Blink, Static, Drowsiness, Priority (logic/monitor.py)
+            self.status = self.monitor.update(self.ear, self.mar, self.pitch, self.yaw, self.iris, now)
+            if self.events is not None:
+                self.events.update(self.status, self.snapshot, now)
+            if self.profiles is not None:
+                self._refine_profile(measured, now)
+
+        return mode
+
+    def _smooth(self, points, feats, now):
+        n = points.size if SMOOTH_LANDMARKS else 0
+        if self.filters is None or self.filters.size != n + len(FEATURE_KEYS):
+            groups = [(n, SMOOTH_LANDMARK_PARAMS)] if n else []
+            self.filters = OneEuroBank.from_groups(groups + [(1, SMOOTH_FEATURES[k]) for k in FEATURE_KEYS])
+            self._signal = np.empty(self.filters.size, dtype=np.float64)
+
+        signal = self._signal
+        if n:
+            signal[:n] = points.reshape(-1)
+        for i, key in enumerate(FEATURE_KEYS):
+            signal[n + i] = feats[key]
+
+        smoothed = self.filters.update(signal, now)
+        self.ear, self.mar, self.yaw, self.pitch = smoothed[n:].tolist()
+        self.points = smoothed[:n].reshape(points.shape) if n else points
+
+    def _refine_profile(self, measured, now):
+        """ปรับ profile จากเฟรมที่อยู่ในท่าปกติ (วัดจริง, ไม่นิ่ง, ไม่มีอาการใดๆ, ตาเปิด) แล้วบันทึกเป็นระยะ"""
+        status = self.status
+        neutral = (measured and not status["is_static"] and not status["warning_msg"]
+                   and not (status["final_is_sleeping"] or status["is_yawning"] or status["is_distracted"])
+                   and self.ear >= self.calibrator.thresh_ear)
+        if neutral:
+            self.calibrator.refine(self.ear, self.mar, self.pitch, self.yaw, PROFILE_REFINE_ALPHA,
+                                   PROFILE_MAX_DRIFT, PROFILE_MAX_ANGLE_DRIFT)
+
+        if now - self._profile_saved_at >= PROFILE_SAVE_INTERVAL:
+            self.save_profile(now)
+
+    def hold(self, now=None):
+        """
+        เฟรมที่ภาพใช้ไม่ได้ (detectors/quality.py): ไม่อัปเดตค่าใดๆ และหยุด timer ไว้
+        ค่าและ status ของเฟรมก่อนยังใช้วาด HUD ได้ตามเดิม
+        """
+        if self.mode == "RUNNING":
+            self.monitor.hold(now)
+        return self.mode
+
+    def risk(self):
+        """(ระดับคะแนน, ความคืบหน้าสูงสุดของ timer หลับ/หาว/ละสายตา) สำหรับ InferenceScheduler"""
+        progress = max(self.status.get("prog_sleep", 0), self.status.get("prog_yawn", 0),
+                       self.status.get("prog_distract", 0))
+        return self.monitor.score_mgr.get_level()[0], progress
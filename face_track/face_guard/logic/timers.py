@@ -1,23 +1,29 @@
-import time
+from logic.clock import SYSTEM_CLOCK
 
 class EventTimer:
-    def __init__(self, limit_seconds):
+    def __init__(self, limit_seconds, clock=None):
         self.limit = limit_seconds
+        self.clock = clock or SYSTEM_CLOCK
         self.start_time = None
         self.progress = 0.0 # 0.0 ถึง 1.0
         self.triggered = False
+        self.last_time = None # เวลาของการ update ครั้งล่าสุด
 
-    def update(self, condition_met):
+    def update(self, condition_met, now=None):
         """
         condition_met: True ถ้ากำลังเกิดเหตุการณ์ (เช่น หลับตาอยู่)
+        now: เวลาของเฟรม (ถ้าไม่ส่งมาใช้เวลาจาก clock)
         return: (is_triggered, progress)
         """
+        if now is None: now = self.clock.now()
+        self.last_time = now
+
         if condition_met:
             if self.start_time is None:
-                self.start_time = time.time()
+                self.start_time = now
             
             # คำนวณเวลาที่ผ่านไป
-            elapsed = time.time() - self.start_time
+            elapsed = now - self.start_time
             self.progress = min(elapsed / self.limit, 1.0)
             
             if elapsed >= self.limit:
@@ -28,4 +34,11 @@ class EventTimer:
             self.progress = 0.0
             self.triggered = False
             
-        return self.triggered, self.progress
\ No newline at end of file
+        return self.triggered, self.progress
+
+    def hold(self, now=None):
+        """หยุดนับชั่วคราว (เฟรมที่เชื่อไม่ได้): เลื่อนเวลาเริ่มตามช่วงที่ข้ามไป เวลาที่นับได้จึงไม่เพิ่ม"""
+        if now is None: now = self.clock.now()
+        if self.start_time is not None and self.last_time is not None:
+            self.start_time += now - self.last_time
+        self.last_time = now
\ No newline at end of file
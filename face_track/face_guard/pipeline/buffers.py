@@ -0,0 +1,60 @@
+# pipeline/buffers.py
+import threading
+import numpy as np
+
+class FrameBuffer:
+    """
+    ภาพ 1 ช่องจาก BufferPool: array ที่จองไว้แล้ว + จำนวนผู้ถือ (reference count)
+    ส่วนไหนจะเก็บภาพไว้ใช้ต่อ (เช่น Display) ให้ retain() แทนการ copy แล้ว release() เมื่อเลิกใช้
+    ผู้ถือคนสุดท้าย release() แล้ว buffer จึงกลับเข้า pool ให้กล้องเขียนเฟรมใหม่ทับได้
+    """
+    __slots__ = ("array", "_pool", "_refs")
+
+    def __init__(self, array, pool):
+        self.array = array
+        self._pool = pool
+        self._refs = 0
+
+    def retain(self):
+        with self._pool._lock:
+            self._refs += 1
+        return self
+
+    def release(self):
+        pool = self._pool
+        with pool._lock:
+            assert self._refs > 0, "FrameBuffer released more times than retained"
+            self._refs -= 1
+            if self._refs == 0:
+                pool._free.append(self)
+
+class BufferPool:
+    """
+    buffer ภาพขนาดเดียวกันที่จองครั้งเดียวแล้ววนใช้ (กล้อง -> detector -> HUD -> Display ใช้ภาพก้อนเดียวกัน)
+    acquire(): ได้ buffer ว่าง (ผู้ถือ 1 คน) ถ้าไม่มีว่างจึงจองเพิ่ม (allocated นับไว้ ควรนิ่งหลังเฟรมแรกๆ)
+    เรียกจากหลาย thread พร้อมกันได้
+    """
+    def __init__(self, shape, dtype=np.uint8, count=0):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self._lock = threading.Lock()
+        self._free = [FrameBuffer(np.empty(self.shape, self.dtype), self) for _ in range(count)]
+        self.allocated = count
+
+    def acquire(self):
+        with self._lock:
+            buffer = self._free.pop() if self._free else None
+            if buffer is None:
+                self.allocated += 1
+        if buffer is None:
+            buffer = FrameBuffer(np.empty(self.shape, self.dtype), self)
+        buffer._refs = 1
+        return buffer
+
+    def matches(self, frame):
+        return frame.shape == self.shape and frame.dtype == self.dtype
+
+    def in_use(self):
+        """จำนวน buffer ที่ยังมีคนถืออยู่"""
+        with self._lock:
+            return self.allocated - len(self._free)
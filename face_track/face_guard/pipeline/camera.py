@@ -1,25 +1,166 @@
 # pipeline/camera.py
+import threading
+import time
 import cv2
-from src.config import CAMERA_INDEX, FRAME_WIDTH, FRAME_HEIGHT
+from pipeline.buffers import BufferPool
+from src.config import CAMERA_INDEX, FRAME_WIDTH, FRAME_HEIGHT, CAMERA_THREADED, CAMERA_BUFFER_COUNT
 
 class Camera:
-    def __init__(self):
-        self.cap = cv2.VideoCapture(CAMERA_INDEX)
+    """
+    source: index กล้อง, path ไฟล์วิดีโอ หรือ URL (เช่น rtsp://)
+    pace=True: อ่านตาม fps ของไฟล์ (จำลองกล้องจริงจากคลิป) ต้องใช้คู่กับ threaded
+    ภาพที่ได้อยู่ใน BufferPool (pipeline/buffers.py) ใช้ได้จนถึง get_frame() ครั้งถัดไป
+    ถ้าจะเก็บไว้นานกว่านั้นให้ buffer.retain() (เช่น Display) แทนการ copy
+    """
+    def __init__(self, threaded=CAMERA_THREADED, buffer_count=CAMERA_BUFFER_COUNT, source=CAMERA_INDEX,
+                 pace=False):
+        self.source = source
+        self.cap = cv2.VideoCapture(source)
         # ตั้งค่าความละเอียด
         self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, FRAME_WIDTH)
         self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, FRAME_HEIGHT)
-        
+
         if not self.cap.isOpened():
-            raise RuntimeError(f"Cannot open camera index {CAMERA_INDEX}")
+            raise RuntimeError(f"Cannot open camera {source}")
 
-    def get_frame(self):
-        success, frame = self.cap.read()
+        self.threaded = threaded
+        fps = self.cap.get(cv2.CAP_PROP_FPS) if pace else 0
+        self._interval = 1.0 / fps if fps and fps > 0 else 0.0
+        self.dropped = 0  # จำนวนเฟรมที่ถ่ายมาแล้วแต่ไม่เคยถูกส่งออก (ถูกเฟรมใหม่ทับ)
+        self.pool = None
+        self.buffer = None  # FrameBuffer ของเฟรมที่ get_frame() คืนล่าสุด (กล้องถือไว้แทน main loop)
+        self._raw = None
+
+        if self.threaded:
+            self._start_capture_thread(buffer_count)
+
+    def _start_capture_thread(self, buffer_count):
+        # ลด buffer ฝั่ง driver ให้เหลือน้อยที่สุด (บาง backend ไม่รองรับ ก็ไม่เป็นไร)
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+        # อ่านเฟรมแรกเพื่อรู้ขนาดจริงของกล้อง (อาจไม่ตรงกับที่ขอไว้)
+        success, first = self.cap.read()
         if not success:
-            return False, None
-        
-        # กลับด้านภาพ (Mirror) ให้เหมือนกระจกเงา จะได้ไม่งงซ้ายขวา
-        frame = cv2.flip(frame, 1)
-        return True, frame
+            raise RuntimeError(f"Cannot read from camera {self.source}")
+
+        # Buffer จองไว้ล่วงหน้า อย่างน้อย 3 ช่อง: ช่องที่กำลังเขียน / ช่องล่าสุด / ช่องที่ main loop ถืออยู่
+        # (+ ช่องที่ Display ถือไว้ ถ้าไม่พอ pool จองเพิ่มเองครั้งเดียว)
+        self._raw = first
+        self._buffer_count = max(3, buffer_count)
+        self.pool = BufferPool(first.shape, first.dtype, self._buffer_count)
+
+        self._latest = None  # เฟรมใหม่สุดที่ยังไม่ถูกส่งออก (กล้องถือไว้ 1 ref)
+        self._latest_seq = 0
+        self._latest_stamp = 0.0
+        self._seq = 0        # เลขลำดับเฟรมที่ถ่ายได้
+        self._served_seq = 0
+        self._running = True
+        self._failed = False
+        self._stopped = False          # capture thread ออกจาก loop แล้ว (เลิกใช้ cap)
+        self._release_pending = False  # release() ขอให้ capture thread ปิด cap เองตอนออก
+        self._cond = threading.Condition()
+
+        self._publish(first, time.time())
+
+        self._thread = threading.Thread(target=self._capture_loop, name="CameraCapture", daemon=True)
+        self._thread.start()
+
+    def _publish(self, raw, timestamp):
+        # กลับด้านภาพลง buffer ที่ว่างใน pool (ไม่สร้าง array ใหม่)
+        if not self.pool.matches(raw):
+            # ขนาดภาพเปลี่ยนกลางทาง (เช่น stream เปลี่ยนความละเอียด) -> pool ใหม่
+            # buffer เก่าที่ยังมีคนถือจะกลับเข้า pool เดิมแล้วหายไปเอง
+            self.pool = BufferPool(raw.shape, raw.dtype, self._buffer_count)
+        buffer = self.pool.acquire()
+        cv2.flip(raw, 1, dst=buffer.array)
+        with self._cond:
+            stale = self._latest  # ยังไม่มีใครหยิบไป ถูกเฟรมนี้ทับ
+            self._seq += 1
+            self._latest = buffer
+            self._latest_seq = self._seq
+            self._latest_stamp = timestamp
+            self._cond.notify_all()
+        if stale is not None:
+            stale.release()
+
+    def _hold(self, buffer):
+        """ส่ง buffer ให้ main loop ถือแทนเฟรมก่อนหน้า"""
+        previous = self.buffer
+        self.buffer = buffer
+        if previous is not None:
+            previous.release()
+
+    def _capture_loop(self):
+        try:
+            next_time = time.monotonic()
+            while self._running:
+                if self._interval:
+                    next_time += self._interval
+                    delay = next_time - time.monotonic()
+                    if delay > 0: time.sleep(delay)
+                success, raw = self.cap.read(self._raw)
+                if not success: break
+                self._raw = raw
+                self._publish(raw, time.time())
+        finally:
+            # ออกด้วยเหตุใดก็ตาม (อ่านไม่ได้, exception, release) get_frame() ที่รออยู่ต้องไม่ค้าง
+            with self._cond:
+                self._failed = True
+                self._stopped = True
+                self._cond.notify_all()
+                release = self._release_pending
+            if release: self.cap.release()
+
+    def get_frame(self):
+        """
+        return: (success, frame, timestamp, dropped)
+        timestamp = เวลาที่ถ่ายเฟรมนั้น (time.time())
+        dropped = จำนวนเฟรมสะสมที่ถูกข้ามไปเพราะประมวลผลไม่ทัน
+        """
+        if not self.threaded:
+            success, raw = self.cap.read(self._raw)
+            if not success:
+                return False, None, 0.0, self.dropped
+            self._raw = raw
+
+            # กลับด้านภาพ (Mirror) ให้เหมือนกระจกเงา จะได้ไม่งงซ้ายขวา
+            if self.pool is None or not self.pool.matches(raw):
+                self.pool = BufferPool(raw.shape, raw.dtype, 2)
+            buffer = self.pool.acquire()
+            cv2.flip(raw, 1, dst=buffer.array)
+            self._hold(buffer)
+            return True, buffer.array, time.time(), self.dropped
+
+        with self._cond:
+            # รอจนกว่าจะมีเฟรมใหม่ที่ยังไม่เคยส่งออก
+            while self._latest is None and not self._failed:
+                self._cond.wait()
+            buffer = self._latest
+            if buffer is None:
+                return False, None, 0.0, self.dropped
+
+            self._latest = None  # ref ของกล้องย้ายไปเป็นของ main loop
+            seq = self._latest_seq
+            self.dropped += seq - self._served_seq - 1
+            self._served_seq = seq
+            timestamp = self._latest_stamp
+        self._hold(buffer)
+        return True, buffer.array, timestamp, self.dropped
+
+    def ready(self):
+        """มีเฟรมใหม่ที่ get_frame() คืนได้ทันทีโดยไม่ต้องรอ (หรือกล้องหยุดไปแล้ว)"""
+        if not self.threaded:
+            return True
+        with self._cond:
+            return self._failed or self._latest is not None
 
     def release(self):
-        self.cap.release()
\ No newline at end of file
+        if self.threaded:
+            self._running = False
+            self._thread.join(timeout=1.0)
+            with self._cond:
+                if not self._stopped:
+                    # thread ยังค้างอยู่ใน cap.read() ห้ามปิด cap ตอนนี้ ให้ thread ปิดเองเมื่ออ่านเสร็จ
+                    self._release_pending = True
+                    return
+        self.cap.release()
@@ -0,0 +1,178 @@
+# pipeline/metrics.py
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+from src.config import METRICS_HOST, METRICS_PORT, METRICS_QUANTILES, METRICS_HUD_INTERVAL
+
+# ช่วงเวลาของแต่ละเฟรม (วัดจากจุดก่อนหน้า)
+# queue = ถ่ายภาพ -> เริ่มประมวลผล, inference = FaceMesh, logic = Features/DriverMonitor, render = HUD + ส่งขึ้นจอ
+STAGES = ("queue", "inference", "logic", "render")
+END_TO_END = "end_to_end"  # ถ่ายภาพ -> ขึ้นจอ (เช่น ตาปิดในภาพ -> เห็น "WAKE UP!")
+HUD_LABELS = {END_TO_END: "E2E", "queue": "QUEUE", "inference": "INFER", "logic": "LOGIC", "render": "DRAW"}
+
+SUB_BITS = 5  # 32 ช่องย่อยต่อช่วงกำลังสอง -> คลาดเคลื่อนไม่เกิน ~3%
+MAX_SECONDS = 60.0
+
+class LatencyHistogram:
+    """
+    Histogram แบบ HDR (log-linear): เวลาเป็น microsecond แบ่งช่องตามกำลังสอง แต่ละช่วงแบ่งย่อยเท่าๆ กัน
+    ความละเอียดสัมพัทธ์คงที่ตั้งแต่ 1 us ถึง MAX_SECONDS ใช้หน่วยความจำคงที่ (~400 ช่อง) บันทึกได้ O(1)
+    """
+    def __init__(self, sub_bits=SUB_BITS, max_seconds=MAX_SECONDS):
+        self.sub_bits = sub_bits
+        self.sub_count = 1 << sub_bits
+        self.half = self.sub_count // 2
+        self.max_value = int(max_seconds * 1e6)
+        self.counts = [0] * (self._index(self.max_value) + 1)
+        self.count = 0
+        self.total = 0.0  # ผลรวม (วินาที)
+        self.max = 0.0
+
+    def _index(self, value):
+        if value < self.sub_count:
+            return value
+        shift = value.bit_length() - self.sub_bits
+        return self.sub_count + (shift - 1) * self.half + (value >> shift) - self.half
+
+    def _upper(self, index):
+        """ค่าสูงสุด (us) ที่ตกอยู่ในช่อง index"""
+        if index < self.sub_count:
+            return index
+        k = index - self.sub_count
+        shift = k // self.half + 1
+        return ((k % self.half + self.half + 1) << shift) - 1
+
+    def record(self, seconds):
+        value = min(max(int(seconds * 1e6), 0), self.max_value)
+        self.counts[self._index(value)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max: self.max = seconds
+
+    def percentiles(self, quantiles):
+        """ค่า (วินาที) ที่ quantile ต่างๆ เช่น (0.5, 0.99) ตอบเป็นขอบบนของช่อง"""
+        if self.count == 0:
+            return [0.0] * len(quantiles)
+        cumulative = np.cumsum(self.counts)
+        targets = np.maximum(np.ceil(np.asarray(quantiles) * self.count), 1)
+        indices = np.searchsorted(cumulative, targets)
+        return [min(self._upper(int(i)) / 1e6, self.max) for i in indices]
+
+class FrameMetrics:
+    """
+    จับเวลาทุกเฟรมตามขั้นตอน (begin -> mark ... -> done) เก็บเป็น LatencyHistogram ต่อขั้น + end-to-end
+    และนับเฟรมที่ถูกข้าม/ทิ้ง อ่านจาก thread อื่นได้ (MetricsServer) ผ่าน lock
+    """
+    def __init__(self, hud_interval=METRICS_HUD_INTERVAL):
+        self.histograms = {name: LatencyHistogram() for name in STAGES + (END_TO_END,)}
+        self.frames = 0
+        self.dropped = 0  # กล้องถ่ายแล้วแต่ไม่เคยถูกประมวลผล (ค่าสะสมจาก Camera)
+        self.skipped = {"quality": 0, "scheduler": 0, "display": 0}
+        self.hud_interval = hud_interval
+        self._lock = threading.Lock()
+        self._capture = self._last = 0.0
+        self._hud_lines = []
+        self._hud_time = 0.0
+
+    def begin(self, capture_time, now=None):
+        """เริ่มเฟรม: capture_time = เวลาที่ถ่ายภาพ (time.time() จาก Camera)"""
+        if now is None: now = time.time()
+        self._capture = capture_time
+        self._last = capture_time
+        self.mark("queue", now)
+
+    def mark(self, stage, now=None):
+        """จบขั้น stage (เวลานับจาก mark ก่อนหน้า)"""
+        if now is None: now = time.time()
+        with self._lock:
+            self.histograms[stage].record(now - self._last)
+        self._last = now
+
+    def done(self, rendered=True, now=None):
+        """จบเฟรม: rendered=False (Headless) ไม่มีขั้น render"""
+        if now is None: now = time.time()
+        if rendered:
+            self.mark("render", now)
+        with self._lock:
+            self.histograms[END_TO_END].record(now - self._capture)
+            self.frames += 1
+
+    def skip(self, reason):
+        with self._lock:
+            self.skipped[reason] += 1
+
+    def set_skipped(self, reason, total):
+        """ค่าสะสมที่ส่วนอื่นนับไว้เอง (เช่น Display.skipped)"""
+        self.skipped[reason] = total
+
+    def set_dropped(self, dropped):
+        self.dropped = dropped
+
+    def hud_lines(self, now=None):
+        """ข้อความ p50/p99 (ms) สำหรับ HUD คำนวณใหม่ทุก hud_interval วินาที"""
+        if now is None: now = time.time()
+        if now - self._hud_time >= self.hud_interval:
+            self._hud_time = now
+            lines = []
+            with self._lock:
+                for name in (END_TO_END,) + STAGES:
+                    p50, p99 = self.histograms[name].percentiles((0.5, 0.99))
+                    lines.append(f"{HUD_LABELS[name]:5} {p50 * 1000:5.1f} / {p99 * 1000:5.1f} ms")
+            self._hud_lines = lines
+        return self._hud_lines
+
+    def render_prometheus(self):
+        """ข้อความแบบ Prometheus text exposition (summary ต่อขั้น + counter)"""
+        out = [
+            "# HELP safegaze_frame_latency_seconds Per-stage and end-to-end frame latency.",
+            "# TYPE safegaze_frame_latency_seconds summary",
+        ]
+        with self._lock:
+            for name, hist in self.histograms.items():
+                for q, value in zip(METRICS_QUANTILES, hist.percentiles(METRICS_QUANTILES)):
+                    out.append(f'safegaze_frame_latency_seconds{{stage="{name}",quantile="{q}"}} {value:.6f}')
+                out.append(f'safegaze_frame_latency_seconds_sum{{stage="{name}"}} {hist.total:.6f}')
+                out.append(f'safegaze_frame_latency_seconds_count{{stage="{name}"}} {hist.count}')
+            out += [
+                "# HELP safegaze_frames_total Frames processed.",
+                "# TYPE safegaze_frames_total counter",
+                f"safegaze_frames_total {self.frames}",
+                "# HELP safegaze_frames_dropped_total Frames captured but overwritten before processing.",
+                "# TYPE safegaze_frames_dropped_total counter",
+                f"safegaze_frames_dropped_total {self.dropped}",
+                "# HELP safegaze_frames_skipped_total Frames without inference or display, by reason.",
+                "# TYPE safegaze_frames_skipped_total counter",
+            ]
+            out += [f'safegaze_frames_skipped_total{{reason="{reason}"}} {count}'
+                    for reason, count in self.skipped.items()]
+        return "\n".join(out) + "\n"
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = self.server.metrics.render_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # ไม่พิมพ์ทุก request
+
+class MetricsServer:
+    """HTTP endpoint /metrics ใน thread แยก (ค่าเริ่มต้นฟังเฉพาะ localhost)"""
+    def __init__(self, metrics, host=METRICS_HOST, port=METRICS_PORT):
+        self.server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        self.server.daemon_threads = True
+        self.server.metrics = metrics
+        self.url = f"http://{host}:{self.server.server_address[1]}/metrics"
+        self._thread = threading.Thread(target=self.server.serve_forever, name="MetricsServer", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
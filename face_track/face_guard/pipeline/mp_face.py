@@ -1,26 +1,253 @@
 # pipeline/mp_face.py
-import mediapipe as mp
+import threading
+import time
 import cv2
 import numpy as np
-from src.config import MAX_FACES, REFINE_LANDMARKS, MIN_DETECTION_CONFIDENCE, MIN_TRACKING_CONFIDENCE
+from detectors.attention import FACE_FLIP
+from src.config import (MAX_FACES, REFINE_LANDMARKS, MIN_DETECTION_CONFIDENCE, MIN_TRACKING_CONFIDENCE,
+                        FACE_BACKEND, FACE_MODEL_PATH, TASKS_USE_BLENDSHAPES, TASKS_USE_TRANSFORM,
+                        ROI_TRACKING, INFERENCE_PROCESS, INFERENCE_PIPELINED, STARTUP_WARMUP_FRAMES)
+
+# import mediapipe ตอนสร้าง detector เท่านั้น (ใช้เวลาเกือบ 1 วินาที) ให้ main เปิดกล้องไปพร้อมกันได้
+
+# จำนวนจุดบนหน้า (468 จุด + ตาดำ 10 จุด เมื่อเปิด refine_landmarks)
+NUM_LANDMARKS = 478 if REFINE_LANDMARKS else 468
+
+def landmarks_to_array(landmarks, width, height, out=None):
+    """
+    แปลง landmark (protobuf หรือ object ที่มี x, y, z) เป็น NumPy array (N, 3) float32
+    พิกัดเป็น pixel: x * width, y * height, z * width (สเกลเดียวกับแกน x ตามแบบ MediaPipe)
+    out: array ที่จองไว้ล่วงหน้า (ถ้าไม่ส่งมาจะสร้างใหม่)
+    """
+    n = len(landmarks)
+    if out is None or out.shape[0] != n:
+        out = np.empty((n, 3), dtype=np.float32)
+
+    out[:] = [(p.x, p.y, p.z) for p in landmarks]
+    np.multiply(out, (width, height, width), out=out)
+    return out
+
+def to_rgb(frame, out=None):
+    """
+    BGR (OpenCV) -> RGB (MediaPipe) ลง out ที่จองไว้ (จองใหม่เฉพาะครั้งแรก / ขนาดภาพเปลี่ยน)
+    MediaPipe copy ภาพเข้าไปเองตอนรับ out จึงเขียนทับในเฟรมถัดไปได้
+    """
+    if out is None or out.shape != frame.shape:
+        out = np.empty_like(frame)
+    cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=out)
+    return out
 
 class FaceMeshDetector:
-    def __init__(self):
+    """
+    static=True: หาหน้าใหม่ทุกภาพ ไม่ตามจากเฟรมก่อน (ใช้ detector เดียวสลับหลายกล้องได้)
+    """
+    def __init__(self, static=False):
+        import mediapipe as mp
+
         self.mp_face_mesh = mp.solutions.face_mesh
         self.face_mesh = self.mp_face_mesh.FaceMesh(
+            static_image_mode=static,
             max_num_faces=MAX_FACES,
             refine_landmarks=REFINE_LANDMARKS,
             min_detection_confidence=MIN_DETECTION_CONFIDENCE,
             min_tracking_confidence=MIN_TRACKING_CONFIDENCE
         )
+        # Array กลางที่ detector ทุกตัวใช้ร่วมกัน (จองครั้งเดียว เขียนทับทุกเฟรม)
+        self.points = np.zeros((NUM_LANDMARKS, 3), dtype=np.float32)
+        self._rgb = None
+        self._stamp = None
 
-    def process(self, frame):
+    def process(self, frame, stamp=None):
+        """stamp: ข้อมูลของเฟรมนี้ (เช่น index, เวลา) คืนทาง get_stamp() คู่กับผล"""
+        self._stamp = stamp
         # MediaPipe ต้องการภาพ RGB แต่ OpenCV ให้มาเป็น BGR
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        rgb_frame = self._rgb = to_rgb(frame, self._rgb)
         
         # ประมวลผลหาจุดต่าง ๆ บนใบหน้า
         rgb_frame.flags.writeable = False # Performance trick
         results = self.face_mesh.process(rgb_frame)
         rgb_frame.flags.writeable = True
         
-        return results
\ No newline at end of file
+        return results
+
+    def get_points(self, results, width, height):
+        """
+        แปลงผลลัพธ์ของหน้าแรกเป็น array (N, 3) พิกัด pixel ครั้งเดียวต่อเฟรม
+        return: self.points (ถูกเขียนทับในเฟรมถัดไป) หรือ None ถ้าไม่เจอหน้า
+        """
+        if not results.multi_face_landmarks:
+            return None
+        self.points = landmarks_to_array(results.multi_face_landmarks[0].landmark, width, height, self.points)
+        return self.points
+
+    def get_direct_features(self, results):
+        """Face Mesh แบบเดิมไม่มีค่าสำเร็จรูป (ต้องคำนวณจากจุดเอง)"""
+        return {}
+
+    def get_stamp(self, results):
+        """stamp ของเฟรมที่ results เป็นผล (รอผลตรงเฟรมเสมอ = stamp ที่ส่งเข้า process() ล่าสุด)"""
+        return self._stamp
+
+# แปลงแกนกล้องแบบ OpenGL (y ขึ้น, มองไปทาง -z) เป็นแบบ OpenCV (y ลง, มองไปทาง +z)
+# ให้มุมที่ได้อยู่ในระบบเดียวกับ solvePnP ใน detectors/attention.py
+_GL_TO_CV = np.diag([1.0, -1.0, -1.0])
+
+def transform_to_rotation(matrix):
+    """
+    facial transformation matrix (4x4 แกน OpenGL) -> Rotation Matrix แกน OpenCV
+    เทียบกับหน้าตรง (FACE_FLIP ใน detectors/attention.py) หน้าตรงได้มุม ~0 แบบเดียวกับ solvePnP
+    """
+    return _GL_TO_CV @ np.asarray(matrix)[:3, :3] @ FACE_FLIP
+
+class FaceLandmarkerDetector:
+    """
+    Backend ใหม่: MediaPipe Tasks FaceLandmarker (models/face_landmarker.task)
+    live=True  -> LIVE_STREAM: ส่งภาพแล้วไปต่อเลย ผลลัพธ์มาทาง callback (ได้ผลของเฟรมล่าสุดที่เสร็จแล้ว)
+                  ผลแต่ละชุดคืนแค่ครั้งเดียว ถ้ายังไม่มีผลใหม่ process() คืน None และ get_stamp() เป็น None
+    live=False -> VIDEO: รอผลของเฟรมนั้น (ใช้กับ replay)
+    static=True -> IMAGE: ไม่ตามจากเฟรมก่อน (ใช้ร่วมกันหลายกล้องได้)
+    """
+    def __init__(self, live=True, blendshapes=TASKS_USE_BLENDSHAPES, transform=TASKS_USE_TRANSFORM, static=False):
+        import mediapipe as mp
+        from mediapipe.tasks import python as mp_tasks
+        from mediapipe.tasks.python import vision
+
+        self._mp_image = mp.Image
+        self._srgb = mp.ImageFormat.SRGB
+
+        self.live = live and not static
+        self.static = static
+        self.use_blendshapes = blendshapes
+        self.use_transform = transform
+
+        self._lock = threading.Lock()
+        self._latest = None   # (ผลใหม่ที่ยังไม่ถูกหยิบไป, stamp ของเฟรมนั้น)
+        self._inflight = {}   # timestamp_ms ที่ส่งเข้าไปแล้ว -> stamp (รอ callback)
+        self._last_ts = -1
+
+        options = vision.FaceLandmarkerOptions(
+            base_options=mp_tasks.BaseOptions(model_asset_path=FACE_MODEL_PATH),
+            running_mode=(vision.RunningMode.IMAGE if static else
+                          vision.RunningMode.LIVE_STREAM if live else vision.RunningMode.VIDEO),
+            num_faces=MAX_FACES,
+            min_face_detection_confidence=MIN_DETECTION_CONFIDENCE,
+            min_face_presence_confidence=MIN_DETECTION_CONFIDENCE,
+            min_tracking_confidence=MIN_TRACKING_CONFIDENCE,
+            output_face_blendshapes=blendshapes,
+            output_facial_transformation_matrixes=transform,
+            result_callback=self._on_result if self.live else None,
+        )
+        self.landmarker = vision.FaceLandmarker.create_from_options(options)
+        self.points = np.zeros((478, 3), dtype=np.float32)
+        self._rgb = None
+        self._stamp = None
+
+    def _on_result(self, result, output_image, timestamp_ms):
+        # เรียกจาก thread ของ MediaPipe
+        with self._lock:
+            stamp = self._inflight.pop(timestamp_ms, None)
+            # เฟรมที่ส่งก่อนหน้านี้แต่ไม่มีผล (MediaPipe ข้ามไปเพราะยังทำเฟรมเก่าไม่เสร็จ) ไม่ต้องรออีก
+            for ts in [ts for ts in self._inflight if ts < timestamp_ms]:
+                del self._inflight[ts]
+            self._latest = (result, stamp)
+
+    def _next_timestamp(self):
+        # timestamp ต้องเพิ่มขึ้นเสมอ (หน่วย ms)
+        ts = int(time.monotonic() * 1000)
+        if ts <= self._last_ts:
+            ts = self._last_ts + 1
+        self._last_ts = ts
+        return ts
+
+    def process(self, frame, stamp=None):
+        self._stamp = stamp
+        self._rgb = to_rgb(frame, self._rgb)
+        mp_image = self._mp_image(image_format=self._srgb, data=self._rgb)
+
+        if self.static:
+            return self.landmarker.detect(mp_image)
+        if not self.live:
+            return self.landmarker.detect_for_video(mp_image, self._next_timestamp())
+
+        # ส่งภาพเข้าไปแบบไม่รอ แล้วคืนผลใหม่ล่าสุดที่มี (อาจเป็นของเฟรมก่อนหน้า)
+        # ผลเดิมห้ามคืนซ้ำ ไม่งั้นค่าเดิมถูกนับเป็นการวัดใหม่หลายเฟรม (liveness, บันทึก .lmk, scheduler)
+        ts = self._next_timestamp()
+        with self._lock:
+            self._inflight[ts] = stamp
+        self.landmarker.detect_async(mp_image, ts)
+        with self._lock:
+            latest, self._latest = self._latest, None
+        if latest is None:
+            self._stamp = None
+            return None
+        result, self._stamp = latest
+        return result
+
+    def get_points(self, results, width, height):
+        if results is None or not results.face_landmarks:
+            return None
+        self.points = landmarks_to_array(results.face_landmarks[0], width, height, self.points)
+        return self.points
+
+    def get_direct_features(self, results):
+        """
+        ค่าที่โมเดลให้มาโดยตรง ไม่ต้องคำนวณเรขาคณิตเอง
+        - ear: 1 - ค่าเฉลี่ย eyeBlinkLeft/Right (ลืมตา ~1, หลับ ~0 ทิศเดียวกับ EAR)
+        - mar: jawOpen (0 - 1)
+        - rotation: Rotation Matrix (แกน OpenCV) จาก facial transformation matrix
+        สเกลไม่เท่ากับ EAR/MAR แบบเรขาคณิต แต่ Calibration คำนวณเกณฑ์จากค่าจริงของแต่ละคนอยู่แล้ว
+        """
+        direct = {}
+        if results is None or not results.face_landmarks:
+            return direct
+
+        if self.use_blendshapes and results.face_blendshapes:
+            scores = {c.category_name: c.score for c in results.face_blendshapes[0]}
+            direct["ear"] = 1.0 - (scores["eyeBlinkLeft"] + scores["eyeBlinkRight"]) / 2.0
+            direct["mar"] = scores["jawOpen"]
+
+        if self.use_transform and results.facial_transformation_matrixes:
+            direct["rotation"] = transform_to_rotation(results.facial_transformation_matrixes[0])
+
+        return direct
+
+    def get_stamp(self, results):
+        return self._stamp
+
+    def close(self):
+        self.landmarker.close()
+
+def create_detector(backend=FACE_BACKEND, live=True, roi=ROI_TRACKING, static=False, remote=INFERENCE_PROCESS):
+    """
+    เลือก backend จาก config (FACE_BACKEND)
+    "solutions" = mp.solutions.face_mesh (เดิม), "tasks" = FaceLandmarker
+    roi=True: ครอบด้วย FaceROITracker ส่งเฉพาะภาพส่วนหน้าเข้า inference
+    (tracker ต้องรู้ผลของเฟรมที่ส่งเข้าไป จึงใช้ FaceLandmarker แบบ VIDEO แทน LIVE_STREAM)
+    static=True: ไม่มี state ระหว่างเฟรม ใช้ตัวเดียวกับหลายกล้องได้ (ห้ามใช้คู่กับ roi)
+    remote=True: รันใน process แยก (pipeline/remote.py) แบบ pipeline เฉพาะกล้องสด (live และไม่ static)
+    """
+    if remote:
+        from pipeline.remote import RemoteDetector
+        return RemoteDetector(backend, roi=roi, static=static, pipelined=live and not static and INFERENCE_PIPELINED)
+
+    if backend == "tasks":
+        factory = lambda: FaceLandmarkerDetector(live=live and not roi, static=static)
+    elif backend == "solutions":
+        factory = lambda: FaceMeshDetector(static=static)
+    else:
+        raise ValueError(f"Unknown face backend: {backend}")
+
+    if roi:
+        from pipeline.target_tracker import FaceROITracker
+        return FaceROITracker(factory)
+    return factory()
+
+def warm_up(detector, width, height, frames=STARTUP_WARMUP_FRAMES):
+    """
+    รัน detector กับภาพว่างก่อนใช้งานจริง (เฟรมแรกช้ามาก: จองหน่วยความจำ/สร้าง delegate ของ TFLite)
+    ผลที่ได้ทิ้งไป ภาพว่างไม่มีหน้า จึงไม่กระทบ tracking ของเฟรมจริง
+    """
+    blank = np.zeros((height, width, 3), dtype=np.uint8)
+    for _ in range(frames):
+        detector.process(blank)
+    return detector
@@ -0,0 +1,127 @@
+# pipeline/recording.py
+import os
+import struct
+import time
+import numpy as np
+from src.config import REFINE_LANDMARKS
+
+# ไฟล์ .lmk: header 32 byte + record ขนาดคงที่ต่อเนื่องกัน (1 record ต่อ 1 เฟรม)
+# จุดบนหน้าเก็บเป็น int16 = pixel * scale (scale อยู่ใน header) เล็กกว่าวิดีโอหลายเท่า
+LANDMARK_EXT = ".lmk"
+MAGIC = b"SGLM"
+VERSION = 1
+HEADER = struct.Struct("<4sHHHHf16x")  # magic, version, num_points, width, height, scale
+
+DEFAULT_NUM_POINTS = 478 if REFINE_LANDMARKS else 468
+
+def record_dtype(num_points):
+    """record 1 เฟรม: index เฟรม, เวลา (วินาที), เจอหน้าไหม, จุด (N, 3) int16"""
+    return np.dtype([("frame", "<i4"), ("t", "<f8"), ("face", "u1"), ("points", "<i2", (num_points, 3))])
+
+def landmark_scale(width, height):
+    """ความละเอียดต่อ pixel ที่ยังเก็บจุดที่หลุดขอบภาพได้ (~2.5 เท่าของขนาดภาพ) ไม่เกิน 1/16 pixel"""
+    return float(min(16, 16000 // max(width, height, 1)))
+
+def is_landmark_file(path):
+    return str(path).lower().endswith(LANDMARK_EXT)
+
+def new_recording_path(folder):
+    """ชื่อไฟล์ตามเวลาที่เริ่มบันทึก เช่น recordings/20250101_083000.lmk"""
+    os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, time.strftime("%Y%m%d_%H%M%S") + LANDMARK_EXT)
+
+class LandmarkWriter:
+    """
+    เขียนจุดบนหน้าทีละเฟรมต่อท้ายไฟล์ (ใช้ระหว่างกล้องสด หรือ replay)
+    ไฟล์อ่านได้ตลอดแม้ยังเขียนไม่เสร็จ (record สุดท้ายที่ขาดจะถูกข้าม)
+    """
+    def __init__(self, path, width, height, num_points=DEFAULT_NUM_POINTS):
+        self.path = path
+        self.num_points = num_points
+        self.scale = landmark_scale(width, height)
+        self.count = 0
+
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        self._record = np.zeros(1, dtype=record_dtype(num_points))
+        self._points = self._record["points"][0]  # view (N, 3) ของ record ที่จองไว้
+        self._file = open(path, "wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, num_points, width, height, self.scale))
+
+    def write(self, frame_idx, t, points):
+        """points: array (N, 3) พิกัด pixel หรือ None ถ้าไม่เจอหน้า"""
+        record = self._record
+        record["frame"] = frame_idx
+        record["t"] = t
+        if points is None:
+            record["face"] = 0
+            self._points[:] = 0
+        else:
+            n = min(len(points), self.num_points)
+            record["face"] = 1
+            self._points[:n] = np.clip(np.rint(points[:n] * self.scale), -32768, 32767)
+            self._points[n:] = 0
+        self._file.write(record.tobytes())
+        self.count += 1
+
+    def close(self):
+        self._file.close()
+
+class LandmarkRecording:
+    """
+    อ่านไฟล์ .lmk แบบ memory-map (ไม่โหลดทั้งไฟล์ ไม่ copy) เข้าถึงเฟรมไหนก็ได้ทันที
+    records["t"], records["frame"], records["face"] เป็น view ของไฟล์โดยตรง
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            header = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ValueError(f"{path}: file too short for a landmark recording")
+        magic, version, self.num_points, self.width, self.height, self.scale = HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: not a landmark recording (v{VERSION})")
+
+        dtype = record_dtype(self.num_points)
+        count = (os.path.getsize(path) - HEADER.size) // dtype.itemsize
+        if count > 0:
+            self.records = np.memmap(path, dtype=dtype, mode="r", offset=HEADER.size, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=dtype)
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def t(self):
+        return self.records["t"]
+
+    def time_range(self, start=None, end=None):
+        """ช่วง index ของเฟรมที่เวลาอยู่ใน [start, end] (เวลาเรียงจากน้อยไปมาก)"""
+        t = self.t
+        i0 = 0 if start is None else int(np.searchsorted(t, start, side="left"))
+        i1 = len(t) if end is None else int(np.searchsorted(t, end, side="right"))
+        return i0, i1
+
+    def points(self, i, out=None):
+        """จุดของเฟรม i เป็น float32 (N, 3) พิกัด pixel หรือ None ถ้าเฟรมนั้นไม่เจอหน้า"""
+        record = self.records[i]
+        if not record["face"]:
+            return None
+        if out is None:
+            out = np.empty((self.num_points, 3), dtype=np.float32)
+        np.multiply(record["points"], 1.0 / self.scale, out=out, casting="unsafe")
+        return out
+
+    def frames(self, start=None, end=None):
+        """
+        วนทีละเฟรมในช่วงเวลา [start, end] -> (frame index, t, points หรือ None)
+        points ใช้ buffer เดียวกันทุกเฟรม (เหมือน detector.get_points())
+        """
+        i0, i1 = self.time_range(start, end)
+        buffer = np.empty((self.num_points, 3), dtype=np.float32)
+        for i in range(i0, i1):
+            record = self.records[i]
+            yield int(record["frame"]), float(record["t"]), self.points(i, buffer)
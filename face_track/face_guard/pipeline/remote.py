@@ -0,0 +1,164 @@
+# pipeline/remote.py
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+from src.config import INFERENCE_SLOTS
+
+MAX_POINTS = 478  # จองที่ไว้เผื่อ backend ที่มีตาดำ (tasks ได้ 478 จุดเสมอ)
+
+class RemoteResult:
+    """
+    ผลของ 1 เฟรมจาก worker: ช่องใน shared memory ที่เก็บจุดไว้ + ค่าสำเร็จรูปเล็กๆ (ส่งทาง Pipe)
+    stamp: ข้อมูลของเฟรมต้นทาง (ที่ส่งมากับ process()) แบบ pipeline ผลเป็นของเฟรมก่อนหน้า ไม่ใช่เฟรมที่เพิ่งส่ง
+    """
+    __slots__ = ("slot", "num_points", "direct", "stamp")
+
+    def __init__(self, slot, num_points, direct, stamp=None):
+        self.slot = slot
+        self.num_points = num_points  # 0 = ไม่เจอหน้า
+        self.direct = direct
+        self.stamp = stamp
+
+def _worker_main(conn, backend, roi, static):
+    """
+    process แยกที่รัน detector: รอเลขช่อง -> อ่านภาพจาก shared memory -> เขียนจุดกลับลง shared memory
+    ข้อความใน Pipe มีแค่ตัวเลขและ dict เล็กๆ (ไม่ส่งภาพผ่าน pickle)
+    """
+    from pipeline.mp_face import create_detector
+
+    detector = create_detector(backend, live=False, roi=roi, static=static, remote=False)
+    frames = points = None
+    segments = []
+    try:
+        while True:
+            msg = conn.recv()
+            if msg is None: break
+
+            if msg[0] == "setup":
+                _, frame_name, points_name, shape, count = msg
+                frames = points = None  # ต้องไม่มี view ค้างอยู่ก่อน close
+                for shm in segments: shm.close()
+                # worker ที่ spawn มาใช้ resource_tracker ตัวเดียวกับ process หลัก ซึ่งเป็นคน unlink ตอน close()
+                segments = [shared_memory.SharedMemory(name=frame_name), shared_memory.SharedMemory(name=points_name)]
+                frames = np.ndarray((count,) + shape, dtype=np.uint8, buffer=segments[0].buf)
+                points = np.ndarray((count, MAX_POINTS, 3), dtype=np.float32, buffer=segments[1].buf)
+                continue
+
+            slot = msg[1]
+            height, width = shape[:2]
+            results = detector.process(frames[slot])
+            found = detector.get_points(results, width, height)
+            num_points = 0
+            if found is not None:
+                num_points = min(len(found), MAX_POINTS)
+                points[slot, :num_points] = found[:num_points]
+            conn.send((slot, num_points, detector.get_direct_features(results)))
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        frames = points = None
+        for shm in segments: shm.close()
+        if hasattr(detector, "close"): detector.close()
+
+class RemoteDetector:
+    """
+    รัน detector ใน process แยก (ไม่แย่ง GIL กับ logic / HUD) ใช้แทน detector ปกติได้เลย
+    ภาพและจุดอยู่ใน shared memory แบบวนช่อง (slots) ส่งแค่เลขช่องผ่าน Pipe
+
+    pipelined=True: process() ส่งเฟรมนี้เข้า worker แล้วคืนผลของเฟรมก่อนหน้า
+                    (worker รันเฟรม N+1 ระหว่างที่ loop หลักทำ logic/HUD ของเฟรม N) ผลช้าไป 1 เฟรม
+                    แบบเดียวกับ FaceLandmarker LIVE_STREAM และเฟรมแรกจะไม่มีผล
+    pipelined=False: รอผลของเฟรมนั้นเลย (ใช้กับ replay / fleet ที่ต้องได้ผลตรงเฟรม)
+    """
+    def __init__(self, backend, roi=False, static=False, pipelined=True, slots=INFERENCE_SLOTS):
+        self.pipelined = pipelined
+        self.slots = max(3, slots)  # ช่องที่ worker อ่านอยู่ / ช่องที่รอ / ช่องที่กำลังเขียน
+        self.points = np.zeros((MAX_POINTS, 3), dtype=np.float32)
+
+        ctx = mp.get_context("spawn")  # ไม่ fork thread ของกล้อง/MediaPipe ติดไปด้วย
+        self._conn, child_conn = ctx.Pipe()
+        self._process = ctx.Process(target=_worker_main, args=(child_conn, backend, roi, static),
+                                    name="InferenceWorker", daemon=True)
+        self._process.start()
+        child_conn.close()
+
+        self._shape = None
+        self._segments = []
+        self._frames = self._results = None
+        self._next = 0
+        self._pending = []  # ช่องที่ส่งไปแล้ว ยังไม่ได้ผล (เรียงตามลำดับ)
+        self._stamps = [None] * self.slots  # stamp ของเฟรมในแต่ละช่อง
+
+    def _setup(self, shape):
+        """จอง shared memory ตามขนาดภาพ (ครั้งแรก หรือเมื่อขนาดภาพเปลี่ยน)"""
+        while self._pending:
+            self._receive()
+        self._release()
+        count = self.slots
+        frame_shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * count)
+        points_shm = shared_memory.SharedMemory(create=True, size=count * MAX_POINTS * 3 * 4)
+        self._segments = [frame_shm, points_shm]
+        self._frames = np.ndarray((count,) + shape, dtype=np.uint8, buffer=frame_shm.buf)
+        self._results = np.ndarray((count, MAX_POINTS, 3), dtype=np.float32, buffer=points_shm.buf)
+        self._shape = shape
+        self._conn.send(("setup", frame_shm.name, points_shm.name, shape, count))
+
+    def _receive(self):
+        try:
+            slot, num_points, direct = self._conn.recv()
+        except EOFError:
+            raise RuntimeError("Inference worker stopped") from None
+        expected = self._pending.pop(0)
+        assert slot == expected, f"worker returned slot {slot}, expected {expected}"
+        return RemoteResult(slot, num_points, direct, self._stamps[slot])
+
+    def process(self, frame, stamp=None):
+        """stamp: ข้อมูลของเฟรมนี้ (เช่น index, เวลา) ติดไปกับผลของเฟรมนี้ (get_stamp)"""
+        if frame.shape != self._shape:
+            self._setup(frame.shape)
+
+        slot = self._next
+        self._next = (slot + 1) % self.slots
+        np.copyto(self._frames[slot], frame)
+        self._stamps[slot] = stamp
+        self._pending.append(slot)
+        self._conn.send(("frame", slot))
+
+        if self.pipelined and len(self._pending) < 2:
+            return None  # เฟรมแรก: ยังไม่มีผลของเฟรมก่อนหน้า
+        return self._receive()
+
+    def get_points(self, results, width, height):
+        """copy จุดออกจาก shared memory (ช่องนั้นจะถูกใช้ซ้ำในอีกไม่กี่เฟรม)"""
+        if results is None or results.num_points == 0:
+            return None
+        n = results.num_points
+        if len(self.points) != n:
+            self.points = np.empty((n, 3), dtype=np.float32)
+        np.copyto(self.points, self._results[results.slot, :n])
+        return self.points
+
+    def get_direct_features(self, results):
+        return results.direct if results is not None else {}
+
+    def get_stamp(self, results):
+        """stamp ของเฟรมที่ results เป็นผล (None = ยังไม่มีผล เช่นเฟรมแรกของ pipeline)"""
+        return results.stamp if results is not None else None
+
+    def _release(self):
+        self._frames = self._results = None
+        for shm in self._segments:
+            shm.close()
+            shm.unlink()
+        self._segments = []
+
+    def close(self):
+        try:
+            self._conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self._process.join(timeout=2.0)
+        if self._process.is_alive():
+            self._process.terminate()
+        self._conn.close()
+        self._release()
@@ -0,0 +1,85 @@
+# pipeline/scheduler.py
+import numpy as np
+from src.config import SCHED_MAX_INTERVAL, SCHED_MOTION_THRESH, SCHED_MAX_PREDICT
+
+class InferenceScheduler:
+    """
+    ปรับความถี่การรัน FaceMesh ตามความเสี่ยง
+    - เสี่ยง (DROWSY/DANGER, timer กำลังนับ, หน้าขยับเร็ว, ยังไม่เจอหน้า) -> ทุกเฟรม
+    - TIRED -> เว้น 1 เฟรม, FRESH -> เว้นได้ถึง SCHED_MAX_INTERVAL - 1 เฟรม
+    เฟรมที่ไม่ได้รัน ใช้จุดที่ทำนายจากความเร็วของ keyframe ล่าสุด (constant velocity)
+    เพื่อให้ timer และ HUD ยังอัปเดตทุกเฟรม
+    """
+    def __init__(self, max_interval=SCHED_MAX_INTERVAL, motion_thresh=SCHED_MOTION_THRESH,
+                 max_predict=SCHED_MAX_PREDICT):
+        self.max_interval = max(1, max_interval)
+        self.motion_thresh = motion_thresh
+        self.max_predict = max_predict
+
+        self.interval = 1
+        self.motion = 0.0       # ความเร็วเฉลี่ยของจุดบนหน้า (pixel/วินาที)
+        self.skipped_total = 0
+
+        self._skipped = 0
+        self._last = None       # จุดของ keyframe ล่าสุด
+        self._last_t = None
+        self._velocity = None
+        self._pred = None
+
+    def set_risk(self, level_text, progress=0.0):
+        """
+        level_text: ระดับจาก ScoreManager.get_level()
+        progress: ความคืบหน้าสูงสุดของ EventTimer (หลับ/หาว/ละสายตา) 0.0 - 1.0
+        """
+        if self._last is None or progress > 0 or self.motion > self.motion_thresh:
+            self.interval = 1
+        elif level_text in ("DROWSY", "DANGER"):
+            self.interval = 1
+        elif level_text == "TIRED":
+            self.interval = min(2, self.max_interval)
+        else:
+            self.interval = self.max_interval
+
+    def force(self):
+        """บังคับรันทุกเฟรม (เช่น ตอน Calibrate)"""
+        self.interval = 1
+
+    def should_infer(self):
+        if self._skipped + 1 >= self.interval:
+            self._skipped = 0
+            return True
+        self._skipped += 1
+        self.skipped_total += 1
+        return False
+
+    def observe(self, points, t):
+        """บันทึกผลของ keyframe (points=None คือไม่เจอหน้า)"""
+        if points is None:
+            self._last = None
+            self.motion = 0.0
+            return
+
+        if self._last is None or self._last.shape != points.shape:
+            self._last = np.empty_like(points)
+            self._velocity = np.zeros_like(points)
+            self._pred = np.empty_like(points)
+        elif t > self._last_t:
+            np.subtract(points, self._last, out=self._velocity)
+            self._velocity /= (t - self._last_t)
+            self.motion = float(np.abs(self._velocity[:, :2]).mean())
+
+        np.copyto(self._last, points)
+        self._last_t = t
+
+    def predict(self, t):
+        """
+        ทำนายจุดของเฟรมที่ข้าม inference: last + velocity * dt
+        dt จำกัดไม่เกิน SCHED_MAX_PREDICT วินาที (กันทำนายไกลเกินจริง)
+        return: array (ถูกเขียนทับทุกครั้ง) หรือ None ถ้ายังไม่มี keyframe
+        """
+        if self._last is None:
+            return None
+        dt = min(max(t - self._last_t, 0.0), self.max_predict)
+        np.multiply(self._velocity, dt, out=self._pred)
+        self._pred += self._last
+        return self._pred
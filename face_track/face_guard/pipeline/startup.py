@@ -0,0 +1,32 @@
+# pipeline/startup.py
+import threading
+import time
+
+class StartupTimer:
+    """
+    จับเวลาแต่ละขั้นตอนตอนเริ่มโปรแกรม (เรียกจากหลาย thread พร้อมกันได้)
+    ขั้นที่ทำพร้อมกันรวมกันแล้วจึงมากกว่าเวลาจริง ดูเวลารวมจาก ready
+    """
+    def __init__(self, start=None):
+        self.start = start if start is not None else time.perf_counter()
+        self.steps = []  # (ชื่อ, วินาที) ตามลำดับที่เสร็จ
+        self._lock = threading.Lock()
+
+    def add(self, name, seconds):
+        with self._lock:
+            self.steps.append((name, seconds))
+
+    def timed(self, name, fn, *args, **kwargs):
+        """เรียก fn(*args, **kwargs) แล้วบันทึกเวลาที่ใช้"""
+        t0 = time.perf_counter()
+        result = fn(*args, **kwargs)
+        self.add(name, time.perf_counter() - t0)
+        return result
+
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    def report(self):
+        with self._lock:
+            steps = " | ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in self.steps)
+        return f"Startup: {steps} | ready in {self.elapsed() * 1000:.0f} ms"
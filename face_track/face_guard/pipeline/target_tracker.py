@@ -0,0 +1,103 @@
+# pipeline/target_tracker.py
+import cv2
+import numpy as np
+from src.config import ROI_INPUT_SIZE, ROI_PADDING, ROI_MIN_INSIDE
+
+class FaceROITracker:
+    """
+    ตามกรอบหน้าจากจุดของเฟรมก่อน แล้วส่งเฉพาะภาพส่วนหน้า (crop สี่เหลี่ยมจัตุรัส ย่อเป็น ROI_INPUT_SIZE)
+    เข้า detector แทนภาพเต็ม แล้วแปลงจุดกลับเป็นพิกัดของภาพเต็ม
+    จะกลับไปหาหน้าจากภาพเต็มเมื่อหน้าหาย หรือจุดหลุดออกนอกกรอบมากเกินไป (ความมั่นใจต่ำ)
+
+    ใช้ detector 2 ตัว: ตัวหนึ่งเห็นแต่ภาพเต็ม อีกตัวเห็นแต่ crop
+    เพื่อไม่ให้ระบบ tracking ภายในของ MediaPipe สับสนระหว่างภาพสองขนาด
+    detector ต้องคืนผลของเฟรมที่ส่งเข้าไป (ห้ามใช้แบบ LIVE_STREAM)
+    """
+    def __init__(self, detector_factory, size=ROI_INPUT_SIZE, padding=ROI_PADDING, min_inside=ROI_MIN_INSIDE):
+        self.full_detector = detector_factory()
+        self.roi_detector = detector_factory()
+        self.size = size
+        self.padding = padding
+        self.min_inside = min_inside
+
+        self.box = None     # (x0, y0, side) กรอบที่จะใช้ crop เฟรมถัดไป
+        self.region = None  # กรอบที่ผลลัพธ์ล่าสุดอ้างอิง (None = ภาพเต็ม)
+        self.redetections = 0
+
+        self._crop = np.empty((size, size, 3), dtype=np.uint8)
+        self._active = self.full_detector
+        self._points = None
+        self._stamp = None
+
+    def _box_from_points(self, points, width, height):
+        # กรอบสี่เหลี่ยมจัตุรัสรอบจุดทั้งหมด + ขอบเผื่อการขยับ แล้วบีบให้อยู่ในภาพ
+        x_min, y_min = points[:, :2].min(axis=0)
+        x_max, y_max = points[:, :2].max(axis=0)
+        side = max(x_max - x_min, y_max - y_min) * (1 + 2 * self.padding)
+        side = int(min(max(side, 32), width, height))
+
+        cx, cy = (x_min + x_max) / 2, (y_min + y_max) / 2
+        x0 = int(min(max(cx - side / 2, 0), width - side))
+        y0 = int(min(max(cy - side / 2, 0), height - side))
+        return x0, y0, side
+
+    def _detect_full(self, frame):
+        height, width = frame.shape[:2]
+        self.redetections += 1
+        self._active = self.full_detector
+        self.region = None
+
+        results = self.full_detector.process(frame)
+        self._points = self.full_detector.get_points(results, width, height)
+        self.box = None if self._points is None else self._box_from_points(self._points, width, height)
+        return results
+
+    def _detect_roi(self, frame):
+        height, width = frame.shape[:2]
+        x0, y0, side = self.box
+        cv2.resize(frame[y0:y0 + side, x0:x0 + side], (self.size, self.size), dst=self._crop)
+
+        results = self.roi_detector.process(self._crop)
+        # พิกัดปกติ (0-1) ของ crop คูณด้วยขนาด crop จริง แล้วเลื่อนไปตำแหน่งในภาพเต็ม
+        points = self.roi_detector.get_points(results, side, side)
+        if points is None:
+            return None, None
+
+        points[:, 0] += x0
+        points[:, 1] += y0
+
+        # ความมั่นใจ: สัดส่วนจุดที่ยังอยู่ในกรอบ ถ้าน้อยไปแปลว่าหน้ากำลังหลุดกรอบ
+        inside = ((points[:, 0] >= x0) & (points[:, 0] < x0 + side) &
+                  (points[:, 1] >= y0) & (points[:, 1] < y0 + side)).mean()
+        if inside < self.min_inside:
+            return None, None
+
+        self._active = self.roi_detector
+        self.region = (x0, y0, side)
+        self.box = self._box_from_points(points, width, height)
+        return results, points
+
+    def process(self, frame, stamp=None):
+        self._stamp = stamp
+        if self.box is not None:
+            results, points = self._detect_roi(frame)
+            if points is not None:
+                self._points = points
+                return results
+
+        # ยังไม่เคยเจอหน้า หรือ tracking หลุด -> หาใหม่จากภาพเต็ม
+        return self._detect_full(frame)
+
+    def get_points(self, results, width, height):
+        """จุดของผลล่าสุดในพิกัด pixel ของภาพเต็ม (แปลงไว้แล้วตอน process)"""
+        return self._points
+
+    def get_direct_features(self, results):
+        return self._active.get_direct_features(results)
+
+    def get_stamp(self, results):
+        return self._stamp
+
+    def close(self):
+        for detector in (self.full_detector, self.roi_detector):
+            if hasattr(detector, "close"): detector.close()
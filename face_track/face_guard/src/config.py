@@ -1,4 +1,5 @@
 # src/config.py
+import os
 import cv2
 
 # --- Camera & Display ---
@@ -6,6 +7,12 @@ CAMERA_INDEX = 0
 WINDOW_NAME = "SafeGaze V.2 (HD)"
 FRAME_WIDTH = 1280  # ปรับเป็น HD
 FRAME_HEIGHT = 720  # ปรับเป็น HD
+CAMERA_THREADED = True   # อ่านกล้องใน Thread แยก ให้ได้เฟรมล่าสุดเสมอ
+CAMERA_BUFFER_COUNT = 4  # buffer ภาพที่จองไว้ตอนเริ่ม (ขั้นต่ำ 3, +1 ให้ Display ถือเฟรมที่รอแสดง)
+MESH_DETAIL = "full"     # เส้น Face Mesh: "full" = ทั้งโครงหน้า, "low" = เฉพาะกรอบตา/คิ้ว/ปาก และตาดำ
+DISPLAY_THREADED = True  # imshow/waitKey ใน Thread แยก (macOS ต้องเป็น False: GUI ต้องอยู่ใน main thread)
+DISPLAY_MAX_FPS = 30     # อัตราแสดงผลสูงสุด (0 = ไม่จำกัด) ไม่เกี่ยวกับอัตราประมวลผล
+HEADLESS = False         # ไม่มีหน้าจอ: ไม่วาด HUD/Mesh, Calibrate อัตโนมัติ (เปิดด้วย --headless ก็ได้)
 
 # --- MediaPipe Settings ---
 MAX_FACES = 1
@@ -13,6 +20,62 @@ REFINE_LANDMARKS = True
 MIN_DETECTION_CONFIDENCE = 0.5
 MIN_TRACKING_CONFIDENCE = 0.5
 
+# Backend ตรวจจับหน้า: "solutions" (Face Mesh เดิม) หรือ "tasks" (FaceLandmarker แบบ LIVE_STREAM)
+FACE_BACKEND = "solutions"
+FACE_MODEL_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models", "face_landmarker.task")
+TASKS_USE_BLENDSHAPES = False  # ใช้ eyeBlink/jawOpen แทน EAR/MAR แบบเรขาคณิต
+TASKS_USE_TRANSFORM = False    # ใช้ facial transformation matrix แทน solvePnP
+
+# --- Smoothing (detectors/smoothing.py, One-Euro filter) ---
+# (min_cutoff Hz, beta, d_cutoff Hz): นิ่ง -> กรองที่ min_cutoff, ขยับเร็ว -> cutoff เพิ่มตาม beta * ความเร็ว
+SMOOTH_FEATURES = {
+    "ear": (0.5, 4.0, 1.0),     # หลับตา: EAR เปลี่ยน ~2 /วินาที -> cutoff ~8 Hz
+    "mar": (0.5, 4.0, 1.0),
+    "yaw": (0.5, 0.03, 1.0),    # องศา: หันหน้า ~100 องศา/วินาที -> cutoff ~3.5 Hz
+    "pitch": (0.5, 0.03, 1.0),
+}
+SMOOTH_LANDMARKS = True                    # กรองจุดบนหน้าทั้งหมดด้วย (mesh ไม่สั่น) ใน array เดียวกัน
+SMOOTH_LANDMARK_PARAMS = (1.0, 0.05, 1.0)  # หน่วย pixel
+
+STARTUP_WARMUP_FRAMES = 2  # รัน detector กับภาพว่างกี่ครั้งก่อนประกาศ Ready (0 = ไม่วอร์มอัพ)
+
+# --- Face ROI Tracking (pipeline/target_tracker.py) ---
+ROI_TRACKING = False  # ส่งเฉพาะภาพส่วนหน้า (crop) เข้า inference แทนภาพเต็ม
+ROI_INPUT_SIZE = 256  # ขนาด crop ที่ส่งเข้า detector (pixel, สี่เหลี่ยมจัตุรัส)
+ROI_PADDING = 0.25    # ขอบเผื่อรอบหน้า (สัดส่วนของขนาดหน้า ต่อด้าน)
+ROI_MIN_INSIDE = 0.9  # ถ้าจุดอยู่ในกรอบน้อยกว่านี้ ถือว่า tracking หลุด -> หาใหม่จากภาพเต็ม
+
+# --- Latency Metrics (pipeline/metrics.py) ---
+METRICS_ENABLED = False      # จับเวลาแต่ละขั้น (HDR histogram) + endpoint แบบ Prometheus
+METRICS_HOST = "127.0.0.1"   # ฟังเฉพาะในเครื่อง
+METRICS_PORT = 9108          # http://127.0.0.1:9108/metrics
+METRICS_QUANTILES = (0.5, 0.9, 0.99, 0.999)
+METRICS_HUD = False          # แสดง p50/p99 ของแต่ละขั้นบนหน้าจอ
+METRICS_HUD_INTERVAL = 0.5   # คำนวณข้อความบน HUD ใหม่ทุกกี่วินาที
+
+# --- Inference Process (pipeline/remote.py) ---
+INFERENCE_PROCESS = False   # รัน detector ใน process แยก รับส่งภาพ/จุดผ่าน shared memory (เครื่องหลาย core)
+INFERENCE_PIPELINED = True  # กล้องสด: รัน inference เฟรมถัดไประหว่างทำ logic/HUD (ผลช้าไป 1 เฟรม)
+INFERENCE_SLOTS = 3         # จำนวนช่องภาพใน shared memory (ขั้นต่ำ 3)
+
+# --- Inference Scheduler (pipeline/scheduler.py) ---
+SCHEDULER_ENABLED = False  # ลดความถี่ FaceMesh ตอนความเสี่ยงต่ำ (ทำนายจุดระหว่าง keyframe)
+SCHED_MAX_INTERVAL = 3     # ตอน FRESH รัน inference 1 ใน 3 เฟรม
+SCHED_MOTION_THRESH = 120.0  # ความเร็วจุดบนหน้า (pixel/วินาที) ที่ถือว่าขยับเร็ว -> รันทุกเฟรม
+SCHED_MAX_PREDICT = 0.2    # ทำนายล่วงหน้าได้ไม่เกิน (วินาที)
+
+# --- Frame Quality Gate (detectors/quality.py) ---
+QUALITY_GATE = True         # ตรวจคุณภาพภาพก่อนรัน FaceMesh (ข้ามภาพมืด/สว่างเกิน/เบลอ, หยุด timer ตอนภาพใช้ไม่ได้)
+QUALITY_SAMPLE_SIZE = 64    # ความกว้างภาพย่อที่ใช้วัดแสงทั้งเฟรม (pixel)
+QUALITY_ROI_SIZE = 64       # ขนาดภาพย่อบริเวณหน้าที่ใช้วัดความคม/แสง
+QUALITY_DARK = 25           # ความสว่างเฉลี่ย (0-255) ต่ำกว่านี้ = มืดเกิน
+QUALITY_BRIGHT = 235        # สูงกว่านี้ = สว่างเกิน (ย้อนแสง/แฟลช)
+QUALITY_MIN_CONTRAST = 8    # ส่วนเบี่ยงเบนมาตรฐานของความสว่าง ต่ำกว่านี้ = ภาพแบน ไม่มีรายละเอียด
+QUALITY_BLUR_RATIO = 0.3    # ความคมต่ำกว่า 30% ของค่าปกติ = เบลอ
+QUALITY_MIN_FACE = 60       # ความกว้างหน้าขั้นต่ำ (pixel) ที่ EAR ยังเชื่อได้
+QUALITY_MIN_INSIDE = 0.8    # สัดส่วนของหน้าที่ต้องอยู่ในภาพ
+QUALITY_MAX_REUSE = 0.5     # ใช้จุดของเฟรมดีล่าสุดแทนได้นานสุด (วินาที)
+
 # --- Colors (B, G, R) ---
 GREEN = (0, 255, 0)
 YELLOW = (0, 255, 255)
@@ -29,6 +92,19 @@ TIME_TO_DISTRACT = 2.0
 SLEEP_RECOVERY_TIME = 2.0
 BLINK_FREQ_THRESHOLD = 15
 
+# --- Decision Thresholds (logic/priority.py, องศาเทียบกับตอน Calibrate) ---
+PITCH_DOWN_LIMIT = -10  # ก้มมากกว่านี้ ไม่นับว่าหลับ (อาจมองต่ำ เช่น ดูหน้าปัด)
+PITCH_UP_LIMIT = 25     # เงย/ก้มเกินนี้ ไม่นับว่าหลับ และนับเป็นละสายตา
+YAW_SOFT_LIMIT = 15     # หันเกินนี้ + ตาดำมองไปทางเดียวกัน = ละสายตา
+YAW_HARD_LIMIT = 35     # หันเกินนี้ = ละสายตาทันที
+BLINK_WINDOW = 10.0     # นับการกระพริบตาย้อนหลังกี่วินาที
+PERCLOS_WINDOW = 60.0   # PERCLOS (สัดส่วนเวลาที่ตาปิด) ย้อนหลังกี่วินาที
+PERCLOS_THRESHOLD = 0.15  # ตาปิดเกิน 15% ของเวลา = ล้าสะสม (เพิ่มคะแนนแม้ยังไม่ถึงขั้นหลับ)
+
+# --- Fatigue Metrics (logic/fatigue.py) ---
+FATIGUE_WINDOWS = (10.0, 60.0, 300.0)  # หน้าต่างเลื่อนที่คำนวณพร้อมกัน (วินาที) O(1) ต่อเฟรมทุกความยาว
+FATIGUE_MAX_GAP = 0.5                  # ช่วงห่างระหว่างเฟรมที่นับเป็นเวลาได้สูงสุด (วินาที)
+
 # --- V.2 New Configs ---
 MAX_DRIVE_TIME = 7200
 REST_TIME_REQUIRED = 900
@@ -38,6 +114,39 @@ REST_TIME_REQUIRED = 900
 STATIC_VAR_THRESH = 15.0  
 # เวลานับถอยหลัง Blink (วินาที)
 BLINK_WAIT_TIME = 5.0
+# จำนวนเฟรมย้อนหลังที่ใช้วัดความนิ่ง (ยาวขึ้นได้ คำนวณแบบ O(1) ต่อเฟรม)
+LIVENESS_NOSE_WINDOW = 60
+LIVENESS_IRIS_WINDOW = 60
 
 # --- Calibration Settings ---
-CALIBRATION_TIME = 3.0
\ No newline at end of file
+CALIBRATION_TIME = 3.0
+
+# --- Driver Profiles (logic/profiles.py) ---
+PROFILES_ENABLED = True   # โหลดค่า Calibration ที่บันทึกไว้ -> เข้า RUNNING ได้ทันที
+PROFILE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "calibration.json")
+DEFAULT_DRIVER = "default"
+PROFILE_REFINE_ALPHA = 0.002     # น้ำหนักต่อเฟรมตอนปรับค่าระหว่างขับ (~15 วินาทีที่ 30 FPS)
+PROFILE_MAX_DRIFT = 0.2          # EAR/MAR ปรับได้ไม่เกิน ±20% จากตอน Calibrate
+PROFILE_MAX_ANGLE_DRIFT = 10.0   # Yaw/Pitch ปรับได้ไม่เกิน ±10 องศา
+PROFILE_SAVE_INTERVAL = 60.0     # บันทึกค่าที่ปรับแล้วลงไฟล์ทุกกี่วินาที
+
+# --- Offline Replay (src/replay.py) ---
+REPLAY_WORKERS = 0                # 0 = ใช้ทุก CPU core
+REPLAY_OUTPUT_DIR = "replay_out"  # โฟลเดอร์เก็บผลลัพธ์รายเฟรม (.npz)
+SWEEP_WORKERS = 0                 # src/sweep.py: 0 = ใช้ทุก CPU core
+
+# --- Landmark Recording (pipeline/recording.py) ---
+LANDMARK_RECORD = False  # บันทึกจุดบนหน้าระหว่างใช้กล้องสด (.lmk) ไว้ replay ซ้ำโดยไม่ต้องรัน detector
+LANDMARK_RECORD_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "recordings")
+
+# --- Fleet Mode (src/fleet.py) ---
+FLEET_WORKERS = 2            # จำนวน detector ที่ใช้ร่วมกันทุกกล้อง
+FLEET_REPORT_INTERVAL = 5.0  # พิมพ์ FPS / latency ของแต่ละกล้องทุกกี่วินาที
+
+# --- Event Log (logic/events.py) ---
+EVENT_LOG_ENABLED = True
+EVENT_LOG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "logs", "events.jsonl")
+EVENT_LOG_MAX_BYTES = 5 * 1024 * 1024  # ไฟล์ใหญ่เกินนี้ -> หมุนเป็น events.jsonl.1
+EVENT_LOG_BACKUPS = 3                  # จำนวนไฟล์เก่าที่เก็บไว้
+EVENT_FLUSH_INTERVAL = 1.0             # เขียนลงดิสก์ทุกกี่วินาที (รวบเป็นชุด)
+EVENT_QUEUE_SIZE = 10000               # คิวเต็ม (ดิสก์ช้ามาก) -> ทิ้งเหตุการณ์ใหม่ ไม่รอ
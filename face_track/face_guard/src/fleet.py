@@ -0,0 +1,217 @@
+import sys
+import os
+import argparse
+import queue
+import threading
+import time
+from collections import deque
+import numpy as np
+
+# Setup paths
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import FLEET_WORKERS, FLEET_REPORT_INTERVAL, FACE_BACKEND, EVENT_LOG_ENABLED
+from pipeline.camera import Camera
+from pipeline.mp_face import create_detector
+from logic.clock import FrameClock
+from logic.session import DriverSession
+from logic.events import EventLogger, EventTracker
+
+class Stream:
+    """กล้อง 1 ตัว + state ของผู้ขับคนนั้น + สถิติ FPS / latency"""
+    def __init__(self, name, source):
+        self.name = name
+        # ไฟล์วิดีโออ่านตามความเร็วจริง (จำลองกล้อง) ส่วนกล้อง/URL อ่านเท่าที่ได้
+        self.camera = Camera(threaded=True, source=source, pace=os.path.isfile(str(source)))
+        self.session = None  # สร้างตอนได้เฟรมแรก (รู้ขนาดภาพจริง)
+        self.clock = FrameClock()  # เวลาของเฟรมล่าสุดที่ประมวลผล (แต่ละกล้องเดินเวลาของตัวเอง)
+
+        self.busy = False    # มีเฟรมอยู่ใน worker (ให้ได้ทีละ 1 เฟรมต่อกล้อง)
+        self.ended = False
+        self.warning = ""
+
+        self.frames = 0
+        self.dropped = 0
+        self.latencies = deque(maxlen=300)  # วินาที: ถ่ายภาพ -> ประมวลผลเสร็จ
+        self._window_start = time.time()
+        self._window_frames = 0
+
+    def record(self, latency):
+        self.latencies.append(latency)
+        self.frames += 1
+        self._window_frames += 1
+
+    def report(self, now):
+        """return: ข้อความสรุป 1 บรรทัด แล้วเริ่มนับ FPS รอบใหม่"""
+        elapsed = max(now - self._window_start, 1e-6)
+        fps = self._window_frames / elapsed
+        self._window_start = now
+        self._window_frames = 0
+
+        if self.latencies:
+            p50, p95 = np.percentile(self.latencies, [50, 95]) * 1000.0
+            lat = f"lat p50 {p50:6.1f}ms p95 {p95:6.1f}ms"
+        else:
+            lat = f"lat {'-':>29}"
+
+        mode = "ENDED" if self.ended else (self.session.mode if self.session else "WAITING")
+        score = self.session.monitor.score_mgr.score if self.session else 0.0
+        return (f"{self.name:<10}{fps:6.1f} FPS  {lat}  drop {self.dropped:<6}"
+                f"{mode:<12}score {score:5.1f}  {self.warning}")
+
+class FleetServer:
+    """
+    ดูแลหลายกล้องใน process เดียว โดยใช้ detector ร่วมกันจำนวนจำกัด (workers)
+    - detector เป็นแบบ static (ไม่จำเฟรมก่อน) จึงสลับใช้กับกล้องไหนก็ได้
+    - แต่ละกล้องมีเฟรมค้างในระบบได้ทีละ 1 เฟรม (ใช้เฟรมล่าสุดเสมอ เฟรมที่ช้าเกินถูกข้าม)
+    - เลือกกล้องแบบวนรอบ (round-robin) เริ่มจากกล้องถัดจากตัวที่ได้คิวล่าสุด ทุกกล้องได้ส่วนแบ่งเท่ากัน
+    """
+    def __init__(self, sources, workers=FLEET_WORKERS, backend=FACE_BACKEND):
+        self.streams = [Stream(f"cam{i}", src) for i, src in enumerate(sources)]
+        self.workers = max(1, min(workers, len(self.streams)))
+        # ไฟล์ log เดียวสำหรับทุกกล้อง (แยกด้วย source ในแต่ละเหตุการณ์)
+        self.event_log = EventLogger() if EVENT_LOG_ENABLED else None
+
+        self._jobs = queue.Queue()
+        self._free = threading.Semaphore(self.workers)
+        self._next = 0
+        self._running = True
+
+        self._threads = []
+        for i in range(self.workers):
+            # detector แยกต่อ worker (MediaPipe graph 1 ชุดต่อ thread)
+            detector = create_detector(backend, live=False, roi=False, static=True)
+            thread = threading.Thread(target=self._worker_loop, args=(detector,), name=f"FleetWorker{i}",
+                                      daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _pick_stream(self):
+        """หากล้องถัดไปที่มีเฟรมใหม่และไม่มีงานค้าง (วนรอบ)"""
+        n = len(self.streams)
+        for k in range(n):
+            stream = self.streams[(self._next + k) % n]
+            if stream.busy or stream.ended or not stream.camera.ready():
+                continue
+            self._next = (self._next + k + 1) % n
+            return stream
+        return None
+
+    def _dispatch(self):
+        """ส่งเฟรมเข้า worker ที่ว่าง return: False ถ้าไม่มีงานให้ทำตอนนี้"""
+        if not self._free.acquire(timeout=0.05):
+            return True
+
+        stream = self._pick_stream()
+        if stream is None:
+            self._free.release()
+            return False
+
+        success, frame, timestamp, dropped = stream.camera.get_frame()
+        if not success:
+            stream.ended = True
+            self._free.release()
+            print(f"[{stream.name}] source ended")
+            return True
+
+        stream.dropped = dropped
+        stream.busy = True
+        self._jobs.put((stream, frame, timestamp))
+        return True
+
+    def _worker_loop(self, detector):
+        while True:
+            job = self._jobs.get()
+            if job is None: break
+            stream, frame, timestamp = job
+            try:
+                self._process(detector, stream, frame, timestamp)
+            except Exception as e:
+                print(f"[{stream.name}] error: {e}")
+            finally:
+                stream.busy = False
+                self._free.release()
+
+        if hasattr(detector, "close"): detector.close()
+
+    def _process(self, detector, stream, frame, timestamp):
+        height, width = frame.shape[:2]
+        stream.clock.set(timestamp)
+        if stream.session is None:
+            events = EventTracker(self.event_log, stream.name, clock=stream.clock) if self.event_log else None
+            stream.session = DriverSession(width, height, auto_calibrate=True, now=timestamp, events=events,
+                                           clock=stream.clock)
+
+        results = detector.process(frame)
+        points = detector.get_points(results, width, height)
+        stream.session.update(points, detector.get_direct_features(results), now=timestamp)
+
+        stream.record(time.time() - timestamp)
+
+        # แจ้งเตือนเฉพาะตอนข้อความเปลี่ยน
+        warning = stream.session.status.get("warning_msg", "") if stream.session.mode == "RUNNING" else ""
+        if warning != stream.warning:
+            stream.warning = warning
+            if warning:
+                print(f"[{stream.name}] {warning} {stream.session.status.get('warning_sub', '')}")
+
+    def print_report(self):
+        now = time.time()
+        print(f"--- {time.strftime('%H:%M:%S')} ({self.workers} worker(s)) ---")
+        for stream in self.streams:
+            print(stream.report(now))
+
+    def run(self, report_interval=FLEET_REPORT_INTERVAL, duration=None):
+        start = last_report = time.time()
+        try:
+            while self._running and not all(s.ended for s in self.streams):
+                if not self._dispatch():
+                    time.sleep(0.002)  # ยังไม่มีเฟรมใหม่จากกล้องไหนเลย
+
+                now = time.time()
+                if now - last_report >= report_interval:
+                    self.print_report()
+                    last_report = now
+                if duration and now - start >= duration:
+                    break
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+        self.print_report()
+
+    def close(self):
+        self._running = False
+        for _ in self._threads:
+            self._jobs.put(None)
+        for thread in self._threads:
+            thread.join(timeout=2.0)
+        for stream in self.streams:
+            stream.camera.release()
+            if stream.session is not None:
+                stream.session.close_events()
+        if self.event_log is not None:
+            self.event_log.close()
+
+def _parse_source(text):
+    # ตัวเลข = index กล้อง, อย่างอื่น = path ไฟล์ / URL
+    return int(text) if text.isdigit() else text
+
+def main():
+    parser = argparse.ArgumentParser(description="SafeGaze fleet mode (หลายกล้องใน process เดียว, ไม่มีหน้าจอ)")
+    parser.add_argument("sources", nargs="+", help="index กล้อง, ไฟล์วิดีโอ หรือ URL (rtsp://...)")
+    parser.add_argument("-j", "--workers", type=int, default=FLEET_WORKERS,
+                        help="จำนวน detector ที่ใช้ร่วมกัน")
+    parser.add_argument("--backend", default=FACE_BACKEND, choices=["solutions", "tasks"],
+                        help="backend ตรวจจับหน้า (ค่าเริ่มต้นจาก config)")
+    parser.add_argument("--report", type=float, default=FLEET_REPORT_INTERVAL,
+                        help="พิมพ์สถิติทุกกี่วินาที")
+    parser.add_argument("--duration", type=float, default=None, help="หยุดเองหลังผ่านไปกี่วินาที")
+    args = parser.parse_args()
+
+    server = FleetServer([_parse_source(s) for s in args.sources], args.workers, args.backend)
+    print(f"SafeGaze Fleet: {len(server.streams)} stream(s), {server.workers} worker(s) (backend: {args.backend})")
+    server.run(args.report, args.duration)
+
+if __name__ == "__main__":
+    main()
@@ -1,60 +1,113 @@
 import sys
 import os
-import cv2
 import time
-import numpy as np  # Import numpy ที่หัวไฟล์ให้ถูกต้อง
-from collections import deque
+_START = time.perf_counter()  # เริ่มจับเวลา startup (รวมเวลา import)
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import cv2
 
 # Setup paths
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.config import *
 from pipeline.camera import Camera
-from pipeline.mp_face import FaceMeshDetector
-from ui.draw_utils import draw_face_mesh
-
-from detectors.eye import calculate_ear, get_iris_position
-from detectors.mouth import calculate_mar
-from detectors.attention import calculate_head_pose
-from detectors.smoothing import SmoothValue
-
-from logic.calibration import Calibrator
-from logic.timers import EventTimer
-from logic.scoring import ScoreManager
-from logic.liveness import ActivityDetector
+from pipeline.mp_face import create_detector, warm_up, NUM_LANDMARKS
+from pipeline.scheduler import InferenceScheduler
+from pipeline.recording import LandmarkWriter, new_recording_path
+from pipeline.metrics import FrameMetrics, MetricsServer
+from pipeline.startup import StartupTimer
+from detectors.quality import QualityGate, RUN, UNRELIABLE
+from ui.draw_utils import draw_face_mesh, prepare_mesh
+
+from logic.clock import FrameClock
+from logic.session import DriverSession
+from logic.events import EventLogger, EventTracker
+from logic.profiles import ProfileStore
 from ui.overlay import HUD
+from ui.display import Display
+
+def _start_detector(startup, mesh):
+    """import mediapipe + สร้าง graph แล้ววอร์มอัพ (รันใน thread แยก พร้อมกับการเปิดกล้อง)"""
+    detector = startup.timed("detector", create_detector)
+    if STARTUP_WARMUP_FRAMES > 0:
+        startup.timed("warm-up", warm_up, detector, FRAME_WIDTH, FRAME_HEIGHT)
+    if mesh:
+        startup.timed("mesh", prepare_mesh, NUM_LANDMARKS)
+    return detector
 
 def main():
+    parser = argparse.ArgumentParser(description="SafeGaze driver monitor")
+    parser.add_argument("--driver", default=DEFAULT_DRIVER,
+                        help="ชื่อ/รหัสผู้ขับ (ใช้ค่า Calibration ที่บันทึกไว้ของคนนี้)")
+    parser.add_argument("--headless", action="store_true", default=HEADLESS,
+                        help="ไม่เปิดหน้าต่าง ไม่วาด HUD (Calibrate อัตโนมัติ, หยุดด้วย Ctrl+C)")
+    args = parser.parse_args()
+    startup = StartupTimer(_START)
+    startup.add("imports", startup.elapsed())
+
     # 1. Initialize System Components
-    cam = Camera()
-    detector = FaceMeshDetector()
-    
-    s_ear = SmoothValue(0.3)
-    s_mar = SmoothValue(0.3)
-    s_yaw = SmoothValue(0.3)
-    s_pitch = SmoothValue(0.3)
-    
-    calibrator = Calibrator()
-    liveness = ActivityDetector()
-    hud = HUD(FRAME_WIDTH, FRAME_HEIGHT)
-    score_mgr = ScoreManager()
-
-    # 2. Timers
-    timer_sleep = EventTimer(TIME_TO_SLEEP)
-    timer_yawn = EventTimer(TIME_TO_YAWN)
-    timer_distract = EventTimer(TIME_TO_DISTRACT)
-    timer_recovery = EventTimer(SLEEP_RECOVERY_TIME)
-
-    # 3. State Variables
-    mode = "IDLE"  # IDLE, CALIBRATING, RUNNING, RESTING
+    # เปิดกล้อง กับ สร้าง FaceMesh (+ วอร์มอัพ) ทำพร้อมกัน ส่วนอื่นสร้างใน thread หลักระหว่างรอ
+    pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="Startup")
+    cam_future = pool.submit(startup.timed, "camera", Camera)
+    detector_future = pool.submit(_start_detector, startup, not args.headless)
+    scheduler = InferenceScheduler() if SCHEDULER_ENABLED else None
+    # เวลาของ logic ทั้งหมด = เวลาที่ถ่ายเฟรม (ไม่ใช่เวลาตอนประมวลผลเสร็จ)
+    # ตั้งเป็นเวลาปัจจุบันก่อนสร้าง session (profile ที่โหลดไว้เริ่มนับเวลาขับทันที ไม่ใช่นับจาก 0)
+    clock = FrameClock(time.time())
+    gate = QualityGate(clock=clock) if QUALITY_GATE else None
+    last_points = None  # จุดของเฟรมล่าสุดที่เชื่อได้ (ใช้วัดคุณภาพบริเวณหน้า / ใช้แทนตอนภาพเบลอ)
+    # ค่าสำเร็จรูปจาก detector ของ inference ล่าสุด เฟรมที่ไม่ได้รัน inference ใช้ค่าเดิมต่อ
+    # (ห้ามสลับไปคำนวณจากจุด: blendshape EAR ~1 ตอนลืมตา แต่ EAR เรขาคณิต ~0.3 -> อ่านเป็นหลับตา)
+    direct = {}
+    points = None
+    logic_time = None   # เวลาของเฟรมล่าสุดที่ session ประมวลผลไปแล้ว (เวลาต้องไม่ย้อนกลับ)
+    # Headless: ไม่มีหน้าต่าง ไม่มี HUD (ไม่เสียเวลาวาดเลย)
+    display = None if args.headless else Display()
+    hud = None if args.headless else HUD(FRAME_WIDTH, FRAME_HEIGHT)
+
+    # จับเวลาแต่ละขั้นของทุกเฟรม (ถ่ายภาพ -> ขึ้นจอ) ดูได้ที่ http://127.0.0.1:9108/metrics
+    metrics = FrameMetrics() if METRICS_ENABLED else None
+    metrics_server = None
+    if metrics is not None:
+        try:
+            metrics_server = MetricsServer(metrics)
+            print(f"Metrics on {metrics_server.url}")
+        except OSError as e:
+            print(f"Cannot start metrics endpoint on port {METRICS_PORT}: {e}")
+
+    def present(frame):
+        """ส่งเฟรมขึ้นจอ (ถ้ามี) แล้วจบการจับเวลาของเฟรมนี้"""
+        if display is not None:
+            if metrics is not None and METRICS_HUD:
+                hud.draw_latency(frame, metrics.hud_lines())
+            display.show(frame, cam.buffer)  # Display ถือ buffer ของกล้องไว้เอง ไม่ต้อง copy
+        if metrics is not None:
+            if display is not None:
+                metrics.set_skipped("display", display.skipped)
+            metrics.done(rendered=display is not None)
+
+    # 2. State ของผู้ขับ (IDLE, CALIBRATING, RUNNING, RESTING), Timers, Score, Blink
+    # บันทึกเหตุการณ์ (หลับ, หาว, ละสายตา, ...) ลงไฟล์จาก thread แยก
+    event_log = EventLogger() if EVENT_LOG_ENABLED else None
+    # มี profile ของผู้ขับอยู่แล้ว -> เข้า RUNNING ทันทีไม่ต้อง Calibrate
+    profiles = ProfileStore() if PROFILES_ENABLED else None
+    events = EventTracker(event_log, clock=clock) if event_log else None
+    # Headless ไม่มีคนกดปุ่ม -> Calibrate เองเมื่อเจอหน้าครั้งแรก
+    session = DriverSession(FRAME_WIDTH, FRAME_HEIGHT, auto_calibrate=args.headless, events=events,
+                            profiles=profiles, driver=args.driver, clock=clock)
+    if session.mode == "RUNNING":
+        print(f"Loaded calibration profile '{args.driver}'. Drive Safe! (press 'c' to re-calibrate)")
+
+    # บันทึกจุดบนหน้าทุกเฟรมที่รัน detector (replay ซ้ำได้ด้วย src/replay.py)
+    recorder = None
+    if LANDMARK_RECORD:
+        recorder = LandmarkWriter(new_recording_path(LANDMARK_RECORD_DIR), FRAME_WIDTH, FRAME_HEIGHT)
+        print(f"Recording landmarks to {recorder.path}")
+    frame_idx = -1  # index ของเฟรมจากกล้อง (เริ่มที่ 0)
     
-    blink_timestamps = deque(maxlen=20)
-    is_eye_closed_prev = False
-    is_sleep_locked = False
     show_mesh = True  # Toggle Face Mesh
-    
-    drive_start_time = None
-    rest_start_time = None
+    paused = False    # เฟรมก่อนติด Static (System Paused) รับแค่ปุ่ม m / q
+    warning = ""      # ข้อความเตือนล่าสุด (Headless พิมพ์เฉพาะตอนเปลี่ยน)
     
     prev_frame_time = 0
     fps = 0
@@ -62,238 +115,215 @@ def main():
     # ตัวแปรสำหรับ Debug ค่าความนิ่ง
     current_nose_var = 100.0
 
-    print(f"SafeGaze V.2 Ready on Camera Index {CAMERA_INDEX}")
-    print("Controls: 'c'=Calibrate, 'r'=Rest, 'm'=Toggle Mesh, 'q'=Quit")
-
-    while True:
-        # --- Frame Capture & FPS ---
-        success, frame = cam.get_frame()
-        if not success: break
-        
-        new_frame_time = time.time()
-        if prev_frame_time > 0:
-            fps = 1 / (new_frame_time - prev_frame_time)
-        prev_frame_time = new_frame_time
-
-        # --- MODE: RESTING (พักรถ) ---
-        if mode == "RESTING":
-            if rest_start_time is None: rest_start_time = time.time()
-            elapsed_rest = time.time() - rest_start_time
-            
-            hud.draw_rest_screen(frame, elapsed_rest)
-            cv2.imshow(WINDOW_NAME, frame)
-            
-            key = cv2.waitKey(5) & 0xFF
-            if key == ord('r'): 
-                mode = "IDLE" # กลับไปหน้าแรก (บังคับ Calibrate ใหม่)
-                drive_start_time = None
-                rest_start_time = None
-                print("Resuming... Please Calibrate.")
-            elif key == ord('q'): break
-            continue
-
-        # --- FACE PROCESSING ---
-        results = detector.process(frame)
-        
-        if show_mesh:
-            draw_face_mesh(frame, results)
-
-        if results.multi_face_landmarks:
-            lm = results.multi_face_landmarks[0].landmark
-            
-            # 1. Raw Calculations
-            raw_ear = calculate_ear(lm, FRAME_WIDTH, FRAME_HEIGHT)
-            raw_mar = calculate_mar(lm, FRAME_WIDTH, FRAME_HEIGHT)
-            p, y, r = calculate_head_pose(lm, FRAME_WIDTH, FRAME_HEIGHT)
-            iris_pos = get_iris_position(lm, FRAME_WIDTH, FRAME_HEIGHT)
-            
-            # 2. Update Liveness Data (Head & Iris)
-            liveness.update_nose(lm[1], FRAME_WIDTH, FRAME_HEIGHT)
-            liveness.update_iris(lm[468], FRAME_WIDTH, FRAME_HEIGHT)
-
-            # 3. Smoothing
-            ear = s_ear.update(raw_ear)
-            mar = s_mar.update(raw_mar)
-            yaw = s_yaw.update(y)
-            pitch = s_pitch.update(p)
-
-            # --- MODE SWITCHING ---
-            if mode == "CALIBRATING":
-                calibrator.update(ear, mar, pitch, yaw)
-                hud.draw_calibration(frame, calibrator.get_progress())
-                
-                if calibrator.is_finished:
-                    mode = "RUNNING"
-                    drive_start_time = time.time()
-                    print("Calibration Done. Drive Safe!")
-
-            elif mode == "RUNNING":
-                # =========================================================
-                #  A. BLINK TRACKING
-                # =========================================================
-                is_eye_closed_now = (ear < calibrator.thresh_ear)
-                if is_eye_closed_now and not is_eye_closed_prev:
-                    blink_timestamps.append(time.time())
-                
-                # ลบ blink ที่เก่าเกิน 10 วินาที
-                curr_time = time.time()
-                while blink_timestamps and curr_time - blink_timestamps[0] > 10.0:
-                    blink_timestamps.popleft()
-                
-                blink_rate = len(blink_timestamps)
-                is_rapid_blink = blink_rate >= BLINK_FREQ_THRESHOLD
-                is_eye_closed_prev = is_eye_closed_now
-
-                # =========================================================
-                #  B. STATIC CHECK (กันรูปถ่าย + กันหลับใน)
-                # =========================================================
-                
-                # คำนวณค่า Variance เพื่อโชว์บนหน้าจอ (Debug)
-                if len(liveness.nose_history) > 10:
-                    data = np.array(liveness.nose_history)
-                    # คำนวณความแปรปรวนของแกน X และ Y รวมกัน
-                    current_nose_var = np.var(data[:, 0]) + np.var(data[:, 1])
-
-                # ตรวจสอบความนิ่ง
-                is_static = liveness.check_static(blink_rate)
-                
-                if is_static:
-                    # 1. แจ้งเตือนให้กระพริบตา
-                    hud.draw_warning(frame, "PLEASE BLINK", "Verifying Driver...")
+    cam = cam_future.result()
+    detector = detector_future.result()
+    pool.shutdown()
+    print(startup.report())
+    print(f"SafeGaze V.2 Ready on Camera Index {CAMERA_INDEX} (backend: {FACE_BACKEND})")
+    if display is not None:
+        print("Controls: 'c'=Calibrate, 'r'=Rest, 'm'=Toggle Mesh, 'q'=Quit")
+    else:
+        print("Headless mode: auto calibrate, press Ctrl+C to quit")
+
+    try:
+        while True:
+            # --- Keyboard (ส่งมาจาก Display thread) ---
+            key = display.get_key() if display is not None else -1
+            if key == ord('q'): break
+            elif key == ord('m'):
+                show_mesh = not show_mesh
+            elif session.mode == "RESTING":
+                if key == ord('r'):
+                    session.resume() # มี profile -> ขับต่อ, ไม่มี -> กลับไปหน้าแรก (บังคับ Calibrate ใหม่)
+                    print("Resuming..." if session.mode == "RUNNING" else "Resuming... Please Calibrate.")
+            elif not paused:
+                if key == ord('c'):
+                    session.calibrate()
+                elif key == ord('r'):
+                    session.rest()
+
+            # --- Frame Capture & FPS ---
+            success, frame, frame_time, dropped_frames = cam.get_frame()
+            if not success: break
+            clock.set(frame_time)
+
+            new_frame_time = frame_time
+            if prev_frame_time > 0:
+                fps = 1 / (new_frame_time - prev_frame_time)
+            prev_frame_time = new_frame_time
+            frame_idx += 1
+            paused = False
+
+            # --- MODE: RESTING (พักรถ) ---
+            if session.mode == "RESTING":
+                if display is not None:
+                    hud.draw_rest_screen(frame, session.rest_elapsed())
+                    display.show(frame, cam.buffer)
+                continue
+
+            if metrics is not None:
+                metrics.begin(frame_time)
+                metrics.set_dropped(dropped_frames)
+
+            # --- FACE PROCESSING ---
+            # Quality gate: ภาพมืด/สว่างเกิน/เบลอ ไม่ต้องรัน FaceMesh (ได้ EAR มั่วๆ อยู่ดี)
+            quality = gate.check_frame(frame, last_points, frame_time) if gate is not None else RUN
+            reliable = quality != UNRELIABLE
+
+            # Scheduler: เฟรมที่ความเสี่ยงต่ำอาจข้าม inference แล้วใช้จุดที่ทำนายไว้แทน
+            run_inference = quality == RUN and (scheduler is None or scheduler.should_infer())
+            measured = run_inference
+            result_time = frame_time  # เวลาของภาพที่ค่าในเฟรมนี้วัดมา
+
+            if run_inference:
+                results = detector.process(frame, (frame_idx, frame_time))
+                stamp = detector.get_stamp(results)
+                if metrics is not None:
+                    metrics.mark("inference")
+
+            if run_inference and stamp is None:
+                # detector แบบ pipeline ยังไม่มีผลใหม่ (เช่นเฟรมแรก) -> ไม่มีค่าที่วัดใหม่ในเฟรมนี้
+                measured = False
+                result_time = None
+            elif run_inference:
+                # ผลอาจเป็นของเฟรมก่อนหน้า (RemoteDetector แบบ pipeline) ใช้ index/เวลาของภาพนั้น
+                # ไม่ใช่ของเฟรมที่เพิ่งอ่านจากกล้อง บันทึก/timer จะได้ไม่เลื่อนไป 1 เฟรม
+                result_idx, result_time = stamp
+
+                # แปลง landmark เป็น array (478, 3) พิกัด pixel ครั้งเดียวต่อเฟรม
+                points = detector.get_points(results, FRAME_WIDTH, FRAME_HEIGHT)
+                direct = detector.get_direct_features(results)
+                if recorder is not None:
+                    recorder.write(result_idx, result_time, points)
+                if scheduler is not None:
+                    scheduler.observe(points, result_time)
+                if gate is not None:
+                    # หน้าเล็กเกิน / หลุดขอบภาพ -> จุดที่ได้เชื่อไม่ได้
+                    reliable = gate.check_face(points, FRAME_WIDTH, FRAME_HEIGHT, result_time)
+                    last_points = points.copy() if points is not None and reliable else None
+            elif quality == RUN:
+                points = scheduler.predict(frame_time)
+                if metrics is not None: metrics.skip("scheduler")
+            else:
+                # REUSE: ใช้จุดของเฟรมดีล่าสุด, UNRELIABLE: ใช้วาดอย่างเดียว
+                points = last_points
+                if metrics is not None: metrics.skip("quality")
+
+            # Features, Smoothing, Calibration, DriverMonitor (logic/session.py)
+            if result_time is None or (logic_time is not None and result_time < logic_time):
+                # ไม่มีค่าใหม่ หรือเป็นผลของภาพที่เก่ากว่าเฟรมที่ประมวลผลไปแล้ว (ช่วงนั้นใช้จุดที่ทำนายไปแล้ว)
+                # -> คงค่าและ status เดิมไว้ ไม่ย้อนเวลาของ session
+                mode = session.mode
+            else:
+                logic_time = clock.set(result_time)
+                if reliable:
+                    mode = session.update(points, direct, measured=measured)
+                else:
+                    mode = session.hold()  # ไม่อัปเดตค่า และไม่ให้ timer เดินต่อ
+            if metrics is not None:
+                metrics.mark("logic")
+
+            if show_mesh and display is not None:
+                # จุดที่ Smooth แล้ว (session) ถ้าเฟรมนี้อัปเดต ไม่งั้นใช้จุดดิบ
+                draw_face_mesh(frame, session.points if reliable and points is not None else points)
+
+            if points is not None:
+                ear, mar, pitch, yaw = session.ear, session.mar, session.pitch, session.yaw
+                iris_pos = session.iris
+
+                # --- MODE SWITCHING ---
+                if scheduler is not None and mode != "RUNNING":
+                    scheduler.force()  # Calibrate / IDLE ใช้ค่าจริงทุกเฟรม
+
+                if mode == "CALIBRATING":
+                    if display is not None:
+                        hud.draw_calibration(frame, session.calibrator.get_progress())
                     
-                    # 2. แสดงค่า Debug (ส่งค่า current_nose_var ไปด้วย)
-                    hud.draw_debug(frame, ear, mar, pitch, yaw, fps, current_nose_var)
+                    if session.mode == "RUNNING":
+                        print("Calibration Done. Drive Safe!")
+
+                elif mode == "RUNNING":
+                    status = session.status
+                    current_nose_var = status["nose_var"]
+
+                    if scheduler is not None:
+                        # ความเสี่ยงกำลังขึ้น (timer นับอยู่ / ระดับสูง) -> กลับไปรันทุกเฟรม
+                        scheduler.set_risk(*session.risk())
+
+                    if display is None:
+                        # Headless: แจ้งเฉพาะตอนข้อความเตือนเปลี่ยน (รายละเอียดอยู่ใน Event Log)
+                        msg = "PLEASE BLINK" if status["is_static"] else status["warning_msg"]
+                        if msg != warning:
+                            warning = msg
+                            if msg: print(f"[WARNING] {msg}")
+                        present(frame)
+                        continue
+
+                    if status["is_static"]:
+                        # 1. แจ้งเตือนให้กระพริบตา
+                        hud.draw_warning(frame, "PLEASE BLINK", "Verifying Driver...")
+                        
+                        # 2. แสดงค่า Debug (ส่งค่า current_nose_var ไปด้วย)
+                        hud.draw_debug(frame, ear, mar, pitch, yaw, fps, current_nose_var, dropped_frames)
+                        
+                        # 3. แสดงสถานะ System Paused
+                        hud.draw_bar(frame, "System Paused", 1.0, 1.0, 0, (100,100,100))
+                        
+                        # 4. หยุดการประมวลผลส่วนที่เหลือ (ไม่คิดคะแนน)
+                        present(frame)
+                        paused = True
+                        continue 
+
+                    # =========================================================
+                    #  E. DRAW UI
+                    # =========================================================
+                    lvl_text, lvl_color = session.monitor.score_mgr.get_level()
                     
-                    # 3. แสดงสถานะ System Paused
-                    hud.draw_bar(frame, "System Paused", 1.0, 1.0, 0, (100,100,100))
+                    # Info Panel
+                    hud.draw_info_panel(frame, int(status["score"]), status["blink_rate"], status["drive_duration"], lvl_text, lvl_color,
+                                        status["perclos"])
                     
-                    # 4. หยุดการประมวลผลส่วนที่เหลือ (ไม่คิดคะแนน)
-                    cv2.imshow(WINDOW_NAME, frame)
-                    key = cv2.waitKey(5) & 0xFF
-                    if key == ord('q'): break
-                    elif key == ord('m'): show_mesh = not show_mesh
-                    continue 
-
-                # =========================================================
-                #  C. NORMAL DROWSINESS DETECTION
-                # =========================================================
-                
-                # 1. Drive Time Check
-                drive_duration = time.time() - drive_start_time
-                is_overtime = drive_duration > MAX_DRIVE_TIME
-
-                # 2. Sleep Logic (ตาปิด)
-                is_bad_angle = (pitch - calibrator.base_pitch) < -10 or (pitch - calibrator.base_pitch) > 25
-                is_sleeping_raw = (not is_bad_angle) and is_eye_closed_now
-                
-                trig_sleep, prog_sleep = timer_sleep.update(is_sleeping_raw)
-                if trig_sleep: is_sleep_locked = True
-                
-                if is_sleep_locked:
-                    unlocked, _ = timer_recovery.update(not is_sleeping_raw)
-                    if unlocked: is_sleep_locked = False
-                    final_is_sleeping = True
-                    prog_sleep = 1.0
-                else:
-                    timer_recovery.update(False)
-                    final_is_sleeping = is_sleeping_raw
-
-                # 3. Yawn Logic
-                is_yawning = mar > calibrator.thresh_mar
-                trig_yawn, prog_yawn = timer_yawn.update(is_yawning)
-
-                # 4. Distraction Logic
-                diff_yaw = abs(yaw - calibrator.base_yaw)
-                is_distracted = False
-                
-                if diff_yaw > 35 or abs(pitch - calibrator.base_pitch) > 25: 
-                    is_distracted = True
-                elif diff_yaw > 15:
-                    if (yaw < calibrator.base_yaw and iris_pos == 'LEFT') or \
-                       (yaw > calibrator.base_yaw and iris_pos == 'RIGHT'):
-                        is_distracted = True
-
-                trig_distract, prog_distract = timer_distract.update(is_distracted)
-
-                # =========================================================
-                #  D. PRIORITY WARNING SYSTEM
-                # =========================================================
-                warning_msg = ""
-                warning_sub = ""
-                
-                # Priority 1: Sleep (อันตรายสุด)
-                if is_sleep_locked:
-                    warning_msg = "WAKE UP!"
-                    warning_sub = "Drowsiness Detected"
-                    score_mgr.update(True, False, False, False, False)
-                
-                # Priority 2: Distraction
-                elif trig_distract:
-                    warning_msg = "EYES ON ROAD"
-                    score_mgr.update(False, False, True, False, False)
-
-                # Priority 3: Yawn
-                elif trig_yawn:
-                    warning_msg = "TAKE A BREAK"
-                    warning_sub = "Yawning"
-                    score_mgr.update(False, True, False, False, False)
-                
-                # Priority 4: Overtime
-                elif is_overtime:
-                    warning_msg = "TIME TO REST"
-
-                # Update Score (Normal case)
-                if not (is_sleep_locked or trig_distract or trig_yawn):
-                     curr_score = score_mgr.update(False, False, False, is_rapid_blink, True)
-                else:
-                     curr_score = score_mgr.score
-
-                # =========================================================
-                #  E. DRAW UI
-                # =========================================================
-                lvl_text, lvl_color = score_mgr.get_level()
-                
-                # Info Panel
-                hud.draw_info_panel(frame, int(curr_score), blink_rate, drive_duration, lvl_text, lvl_color)
-                
-                # Status Bars
-                c_sleep = (0,0,255) if final_is_sleeping else (0,255,0)
-                hud.draw_bar(frame, "Sleep", prog_sleep, 1.0, 0, c_sleep)
-                
-                c_yawn = (0,0,255) if is_yawning else (0,255,0)
-                hud.draw_bar(frame, "Yawn", prog_yawn, 1.0, 1, c_yawn)
-                
-                c_dist = (0,0,255) if is_distracted else (0,255,0)
-                hud.draw_bar(frame, f"Focus ({iris_pos})", prog_distract, 1.0, 2, c_dist)
-                
-                if is_rapid_blink:
-                    hud.draw_bar(frame, "Rapid Blink!", 1.0, 1.0, 3, (0,165,255))
-
-                # Warning Overlay
-                if warning_msg:
-                    hud.draw_warning(frame, warning_msg, warning_sub)
-
-                # Debug Info (ส่งค่า current_nose_var ไปแสดงผล)
-                hud.draw_debug(frame, ear, mar, pitch, yaw, fps, current_nose_var)
-
-            else: # IDLE Screen
-                cv2.putText(frame, "Press 'c' to Calibrate", (FRAME_WIDTH//2 - 200, FRAME_HEIGHT//2), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 255, 0), 3)
-
-        cv2.imshow(WINDOW_NAME, frame)
-        key = cv2.waitKey(5) & 0xFF
-        if key == ord('q'): break
-        elif key == ord('c') and mode == "IDLE":
-            mode = "CALIBRATING"
-            calibrator.start()
-        elif key == ord('r') and mode == "RUNNING":
-            mode = "RESTING"
-            rest_start_time = time.time()
-        elif key == ord('m'):
-            show_mesh = not show_mesh
+                    # Status Bars
+                    c_sleep = (0,0,255) if status["final_is_sleeping"] else (0,255,0)
+                    hud.draw_bar(frame, "Sleep", status["prog_sleep"], 1.0, 0, c_sleep)
+                    
+                    c_yawn = (0,0,255) if status["is_yawning"] else (0,255,0)
+                    hud.draw_bar(frame, "Yawn", status["prog_yawn"], 1.0, 1, c_yawn)
+                    
+                    c_dist = (0,0,255) if status["is_distracted"] else (0,255,0)
+                    hud.draw_bar(frame, f"Focus ({iris_pos})", status["prog_distract"], 1.0, 2, c_dist)
+                    
+                    if status["is_rapid_blink"]:
+                        hud.draw_bar(frame, "Rapid Blink!", 1.0, 1.0, 3, (0,165,255))
+                    elif status["is_high_perclos"]:
+                        hud.draw_bar(frame, "Eyes Closing Often", 1.0, 1.0, 3, (0,165,255))
+
+                    # Warning Overlay
+                    if status["warning_msg"]:
+                        hud.draw_warning(frame, status["warning_msg"], status["warning_sub"])
+
+                    # Debug Info (ส่งค่า current_nose_var ไปแสดงผล)
+                    hud.draw_debug(frame, ear, mar, pitch, yaw, fps, current_nose_var, dropped_frames)
+
+                elif display is not None: # IDLE Screen
+                    cv2.putText(frame, "Press 'c' to Calibrate", (FRAME_WIDTH//2 - 200, FRAME_HEIGHT//2), 
+                               cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 255, 0), 3)
+
+            present(frame)
+    except KeyboardInterrupt:
+        pass
 
     cam.release()
-    cv2.destroyAllWindows()
+    if hasattr(detector, "close"): detector.close()
+    if recorder is not None: recorder.close()
+    session.save_profile()
+    if event_log is not None:
+        session.close_events()
+        event_log.close()
+    if display is not None:
+        display.close()
+    if metrics_server is not None:
+        metrics_server.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,236 @@
+import sys
+import os
+import argparse
+import time
+import cv2
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Setup paths
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import REPLAY_WORKERS, REPLAY_OUTPUT_DIR, FACE_BACKEND
+from pipeline.mp_face import create_detector
+from pipeline.recording import LandmarkWriter, LandmarkRecording, is_landmark_file, LANDMARK_EXT
+from logic.calibration import Calibrator
+from logic.clock import FrameClock
+from logic.session import DriverSession
+
+# โหมดของแต่ละเฟรม (เก็บเป็นตัวเลขในไฟล์ผลลัพธ์)
+MODE_NO_FACE = -1
+MODE_CALIBRATING = 0
+MODE_RUNNING = 1
+MODE_STATIC = 2
+
+# backend ของแต่ละ worker process
+_backend = FACE_BACKEND
+
+def _init_worker(backend=FACE_BACKEND):
+    global _backend
+    _backend = backend
+
+def output_names(paths):
+    """
+    ชื่อไฟล์ผลลัพธ์ (ไม่มีนามสกุล) ของแต่ละ input: path เทียบกับโฟลเดอร์ร่วมของทุก input
+    เช่น day1/cam.mp4, day2/cam.mp4 -> day1/cam, day2/cam (ไฟล์ชื่อเดียวกันต่างโฟลเดอร์ไม่ทับกัน)
+    ถ้ายังซ้ำกัน (ไฟล์เดียวกัน 2 ครั้ง หรือ cam.mp4 กับ cam.lmk) -> ValueError
+    """
+    full = [os.path.abspath(path) for path in paths]
+    root = os.path.commonpath([os.path.dirname(path) for path in full])
+    names = [os.path.splitext(os.path.relpath(path, root))[0] for path in full]
+
+    seen = {}
+    for path, name in zip(paths, names):
+        if name in seen:
+            raise ValueError(f"{seen[name]} and {path} would both write {name}.npz")
+        seen[name] = path
+    return names
+
+def _frame_time(cap, frame_idx, fps, prev_t):
+    # ใช้เวลาจากไฟล์วิดีโอ ถ้า container ไม่บอกเวลาก็คำนวณจาก fps
+    t = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+    if t <= prev_t:
+        t = frame_idx / fps
+    return t
+
+def _video_frames(path, mirror, detector=None):
+    """
+    รัน detector ทีละเฟรมของวิดีโอ -> (frame index, t, width, height, points, direct)
+    detector=None: สร้างใหม่สำหรับคลิปนี้แล้วปิดเมื่อจบ
+    (tracking/smoothing ภายในของ MediaPipe ไม่พาหน้าจากคลิปก่อนมาใช้กับเฟรมแรกของคลิปนี้)
+    """
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise RuntimeError(f"Cannot open video {path}")
+    owned = detector is None
+    if owned:
+        # replay ต้องได้ผลครบทุกเฟรม จึงไม่ใช้โหมด LIVE_STREAM
+        detector = create_detector(_backend, live=False)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+
+    frame_idx = 0
+    t = -1.0
+    raw = mirrored = None  # อ่าน/กลับด้านลง array เดิมทุกเฟรม
+    try:
+        while True:
+            success, raw = cap.read(raw)
+            if not success: break
+            t = _frame_time(cap, frame_idx, fps, t)
+            frame = raw
+            if mirror:
+                frame = mirrored = cv2.flip(raw, 1, dst=mirrored)
+            height, width = frame.shape[:2]
+
+            results = detector.process(frame)
+            points = detector.get_points(results, width, height)
+            yield frame_idx, t, width, height, points, detector.get_direct_features(results)
+            frame_idx += 1
+    finally:
+        cap.release()
+        if owned and hasattr(detector, "close"): detector.close()
+
+def _landmark_frames(path):
+    """อ่านจุดที่บันทึกไว้ (.lmk) แทนการรัน detector (ไม่มีค่าสำเร็จรูปจาก blendshape/matrix)"""
+    recording = LandmarkRecording(path)
+    for frame_idx, t, points in recording.frames():
+        yield frame_idx, t, recording.width, recording.height, points, None
+
+def replay_video(path, out_dir, mirror=True, detector=None, save_landmarks=False, name=None):
+    """
+    ประมวลผลวิดีโอ (หรือไฟล์จุด .lmk) 1 ไฟล์เร็วที่สุดเท่าที่ CPU ทำได้ (ไม่รอเวลาจริง)
+    ใช้เวลาของวิดีโอแทนนาฬิกาเครื่อง Calibrate อัตโนมัติช่วงต้นคลิป
+    แล้วบันทึกค่ารายเฟรมเป็นไฟล์ .npz แบบ column (1 array ต่อ 1 ค่า)
+    save_landmarks: บันทึกจุดบนหน้าเป็น .lmk ด้วย (ครั้งถัดไป replay จากไฟล์นี้ได้โดยไม่ต้องรัน detector)
+    name: ชื่อไฟล์ผลลัพธ์เทียบกับ out_dir (ค่าเริ่มต้น = ชื่อไฟล์ input, ดู output_names)
+    return: (path ไฟล์ผลลัพธ์, จำนวนเฟรม)
+    """
+    if name is None:
+        name = os.path.splitext(os.path.basename(path))[0]
+    if is_landmark_file(path):
+        frames = _landmark_frames(path)
+        save_landmarks = False
+    else:
+        frames = _video_frames(path, mirror, detector)
+
+    session = None
+    writer = None
+    clock = FrameClock()  # เวลาในคลิป ไม่ใช่เวลาจริง (replay เร็วกว่าเวลาจริงได้ ผลเหมือนเดิมทุกครั้ง)
+
+    cols = {name: [] for name in (
+        "frame", "t", "mode", "ear", "mar", "pitch", "yaw", "iris", "score",
+        "blink_rate", "perclos", "sleep", "yawn", "distract", "rapid_blink", "overtime", "static",
+    )}
+
+    frame_count = 0
+    for frame_idx, t, width, height, points, direct in frames:
+        clock.set(t)
+        if session is None:
+            # Calibrate อัตโนมัติจากหน้าแรกที่เจอในคลิป
+            session = DriverSession(width, height, auto_calibrate=True, now=t, clock=clock)
+            if save_landmarks:
+                landmark_path = os.path.join(out_dir, name + LANDMARK_EXT)
+                os.makedirs(os.path.dirname(landmark_path), exist_ok=True)
+                writer = LandmarkWriter(landmark_path, width, height)
+
+        if writer is not None:
+            writer.write(frame_idx, t, points)
+        mode = session.update(points, direct, now=t)
+
+        ear = mar = pitch = yaw = np.nan
+        iris = ""
+        status = {}
+        if points is None:
+            mode = MODE_NO_FACE
+        else:
+            ear, mar, pitch, yaw, iris = session.ear, session.mar, session.pitch, session.yaw, session.iris
+            if mode == "CALIBRATING":
+                mode = MODE_CALIBRATING
+            else:
+                status = session.status
+                mode = MODE_STATIC if status["is_static"] else MODE_RUNNING
+
+        cols["frame"].append(frame_idx)
+        cols["t"].append(t)
+        cols["mode"].append(mode)
+        cols["ear"].append(ear)
+        cols["mar"].append(mar)
+        cols["pitch"].append(pitch)
+        cols["yaw"].append(yaw)
+        cols["iris"].append(iris)
+        cols["score"].append(session.monitor.score_mgr.score)
+        cols["blink_rate"].append(status.get("blink_rate", 0))
+        cols["perclos"].append(status.get("perclos", 0.0))
+        cols["sleep"].append(status.get("is_sleep_locked", False))
+        cols["yawn"].append(status.get("trig_yawn", False))
+        cols["distract"].append(status.get("trig_distract", False))
+        cols["rapid_blink"].append(status.get("is_rapid_blink", False))
+        cols["overtime"].append(status.get("is_overtime", False))
+        cols["static"].append(status.get("is_static", False))
+        frame_count += 1
+
+    if writer is not None:
+        writer.close()
+
+    dtypes = {
+        "frame": np.int32, "t": np.float64, "mode": np.int8, "ear": np.float32, "mar": np.float32,
+        "pitch": np.float32, "yaw": np.float32, "iris": "U6", "score": np.float32,
+        "blink_rate": np.int16, "perclos": np.float32, "sleep": bool, "yawn": bool, "distract": bool,
+        "rapid_blink": bool, "overtime": bool, "static": bool,
+    }
+    arrays = {name: np.asarray(values, dtype=dtypes[name]) for name, values in cols.items()}
+
+    # เก็บค่า Calibration ไว้ด้วย เผื่อเอาไปคำนวณซ้ำภายหลัง
+    calibrator = session.calibrator if session is not None else Calibrator()
+    arrays["calibration"] = np.array(
+        [calibrator.thresh_ear, calibrator.thresh_mar, calibrator.base_yaw, calibrator.base_pitch],
+        dtype=np.float64)
+
+    out_path = os.path.join(out_dir, name + ".npz")
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    np.savez_compressed(out_path, **arrays)
+    return out_path, frame_count
+
+def main():
+    parser = argparse.ArgumentParser(description="SafeGaze offline replay (headless, no display)")
+    parser.add_argument("videos", nargs="+", help="ไฟล์วิดีโอ หรือไฟล์จุดบนหน้า (.lmk) ที่ต้องการประมวลผล")
+    parser.add_argument("-o", "--out", default=REPLAY_OUTPUT_DIR, help="โฟลเดอร์เก็บไฟล์ผลลัพธ์ .npz")
+    parser.add_argument("-j", "--workers", type=int, default=REPLAY_WORKERS,
+                        help="จำนวน process (0 = เท่าจำนวน CPU)")
+    parser.add_argument("--backend", default=FACE_BACKEND, choices=["solutions", "tasks"],
+                        help="backend ตรวจจับหน้า (ค่าเริ่มต้นจาก config)")
+    parser.add_argument("--no-mirror", action="store_true",
+                        help="ไม่กลับด้านภาพ (ค่าเริ่มต้นกลับด้านเหมือนกล้องสด)")
+    parser.add_argument("--save-landmarks", action="store_true",
+                        help="บันทึกจุดบนหน้าเป็น .lmk ไว้ replay ซ้ำโดยไม่ต้องรัน detector")
+    args = parser.parse_args()
+    try:
+        names = output_names(args.videos)
+    except ValueError as e:
+        parser.error(f"output name collision: {e}")
+
+    workers = args.workers or os.cpu_count()
+    workers = max(1, min(workers, len(args.videos)))
+    mirror = not args.no_mirror
+
+    print(f"Replaying {len(args.videos)} file(s) with {workers} worker(s)...")
+    start = time.time()
+    total_frames = 0
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(args.backend,)) as pool:
+        jobs = {pool.submit(replay_video, path, args.out, mirror, None, args.save_landmarks, name): path
+                for path, name in zip(args.videos, names)}
+        for job in as_completed(jobs):
+            path = jobs[job]
+            try:
+                out_path, frames = job.result()
+            except Exception as e:
+                print(f"[FAIL] {path}: {e}")
+                continue
+            total_frames += frames
+            print(f"[DONE] {path} -> {out_path} ({frames} frames)")
+
+    elapsed = time.time() - start
+    print(f"Finished {total_frames} frames in {elapsed:.1f}s ({total_frames / max(elapsed, 1e-6):.1f} FPS)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+import sys
+import os
+import argparse
+import hashlib
+import time
+import numpy as np
+
+# Setup paths
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import MAX_DRIVE_TIME, REST_TIME_REQUIRED
+from logic.clock import FrameClock
+from logic.calibration import Calibrator
+from logic.liveness import ActivityDetector
+from logic.monitor import DriverMonitor
+from logic.events import EventTracker
+
+# ค่า Calibration คงที่ของผู้ขับจำลอง (ไม่ต้อง Calibrate จากภาพ)
+PROFILE = {"thresh_ear": 0.18, "thresh_mar": 0.6, "base_yaw": 0.0, "base_pitch": 0.0}
+
+# อาการที่สุ่มใส่ในการขับ: ชื่อ -> (โอกาสเริ่มต่อวินาที, ช่วงเวลาที่เป็น (วินาที))
+EPISODES = {
+    "blink": (0.3, (0.1, 0.3)),
+    "yawn": (0.004, (3.0, 6.0)),
+    "drowsy": (0.002, (2.0, 5.0)),
+    "glance": (0.01, (0.5, 3.5)),
+}
+
+class ListLogger:
+    """เก็บเหตุการณ์ไว้ใน list แทนการเขียนไฟล์ (ใช้แทน EventLogger)"""
+    def __init__(self):
+        self.events = []
+
+    def log(self, event):
+        self.events.append(event)
+
+# การขยับของจมูก (pixel): ส่วนที่ลอยไปช้าๆ + ส่วนที่สั่นทุกเฟรม
+# ความแปรปรวนในหน้าต่าง liveness (60 เฟรม) ต่ำสุด ~29 ตลอด 2 ชั่วโมง (เกณฑ์ Static = 15)
+# ถ้ามีแค่ส่วนที่ลอย ค่าจะตกลงไป ~7 เป็นช่วงๆ และติด Static ทั้งที่ไม่ได้ตั้งใจจำลอง
+NOSE_DRIFT = 2.0
+NOSE_TREMOR = 4.0
+
+class SyntheticDriver:
+    """
+    สร้างค่า EAR, MAR, Pitch, Yaw, Iris และตำแหน่งจมูกทีละเฟรม จาก rng ที่กำหนด seed
+    seed เดียวกัน -> ค่าเหมือนเดิมทุกครั้ง
+    """
+    def __init__(self, fps, seed):
+        self.dt = 1.0 / fps
+        self.rng = np.random.default_rng(seed)
+        self.remaining = dict.fromkeys(EPISODES, 0.0)
+        self.glance_yaw = 0.0
+        self.nose = np.array([320.0, 240.0])
+
+    def step(self):
+        rng = self.rng
+        for name, (rate, (low, high)) in EPISODES.items():
+            if self.remaining[name] > 0:
+                self.remaining[name] -= self.dt
+            elif rng.random() < rate * self.dt:
+                self.remaining[name] = rng.uniform(low, high)
+                if name == "glance":
+                    self.glance_yaw = rng.choice((-1.0, 1.0)) * rng.uniform(20.0, 45.0)
+        active = {name for name, left in self.remaining.items() if left > 0}
+
+        ear = 0.30 + rng.normal(0.0, 0.01)
+        mar = 0.30 + rng.normal(0.0, 0.02)
+        pitch = rng.normal(0.0, 2.0)
+        yaw = rng.normal(0.0, 2.0)
+        iris = "CENTER"
+        if "blink" in active or "drowsy" in active:
+            ear = 0.10 + rng.normal(0.0, 0.01)
+        if "yawn" in active:
+            mar = 0.85 + rng.normal(0.0, 0.03)
+        if "glance" in active:
+            yaw += self.glance_yaw
+            iris = "LEFT" if self.glance_yaw < 0 else "RIGHT"
+
+        # จมูกขยับตลอด (คนจริงไม่นิ่ง) ไม่ให้ติด Static: ลอยช้าๆ รอบจุดกลาง + สั่นเล็กน้อยทุกเฟรม
+        self.nose += rng.normal(0.0, NOSE_DRIFT, 2)
+        self.nose += (np.array([320.0, 240.0]) - self.nose) * 0.05
+        return ear, mar, pitch, yaw, iris, self.nose + rng.normal(0.0, NOSE_TREMOR, 2)
+
+def simulate(hours, fps, seed):
+    """
+    ขับจำลอง hours ชั่วโมงที่ fps เฟรม/วินาที โดยใช้ FrameClock (ไม่รอเวลาจริง)
+    ขับเกิน MAX_DRIVE_TIME -> จอดพัก REST_TIME_REQUIRED วินาที (ไม่ประมวลผลเฟรม เหมือนโหมดพักของ main)
+    แล้วขับต่อ (นับเวลาขับใหม่ แบบ DriverSession.resume)
+    return: dict สรุปผล (digest = sha1 ของสถานะทุกเฟรม ใช้เทียบว่าผลเหมือนเดิม)
+    """
+    clock = FrameClock(0.0)
+    calibrator = Calibrator(clock=clock)
+    calibrator.load(PROFILE)
+    liveness = ActivityDetector()
+    monitor = DriverMonitor(calibrator, liveness, clock=clock)
+    logger = ListLogger()
+    events = EventTracker(logger, "sim", clock=clock)
+    driver = SyntheticDriver(fps, seed)
+    monitor.start()
+
+    digest = hashlib.sha1()
+    status = {}
+    snapshot = lambda: {"score": round(monitor.score_mgr.score, 2)}
+    overtime_at = None
+    rests = []         # (เวลาเริ่มพัก, เวลาขับต่อ)
+    rest_until = None
+    frames = int(hours * 3600 * fps)
+    for i in range(frames):
+        now = clock.set(i / fps)
+        if rest_until is not None:
+            if now < rest_until: continue
+            rest_until = None
+            monitor.start(now)  # ขับต่อ เริ่มนับเวลาขับใหม่
+            rests[-1] = (rests[-1][0], now)
+
+        ear, mar, pitch, yaw, iris, nose = driver.step()
+        liveness.update_nose(nose)
+        status = monitor.update(ear, mar, pitch, yaw, iris)
+        events.update(status, snapshot)
+        digest.update(f"{status.get('warning_msg', '')}|{status.get('score', -1):.4f};".encode())
+
+        if status.get("is_overtime"):
+            if overtime_at is None:
+                overtime_at = now
+            # ผู้ขับจำลองจอดพักทันทีที่ระบบเตือน (ปิดเหตุการณ์ที่ค้าง แบบ DriverSession.rest)
+            events.end_all(snapshot)
+            rest_until = now + REST_TIME_REQUIRED
+            rests.append((now, None))
+            digest.update(b"rest;")
+
+    events.end_all(snapshot)
+
+    counts = {}
+    for event in logger.events:
+        if event["phase"] == "start":
+            counts[event["event"]] = counts.get(event["event"], 0) + 1
+    return {
+        "frames": frames, "events": counts, "overtime_at": overtime_at, "rests": rests,
+        "score": monitor.score_mgr.score, "digest": digest.hexdigest(),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="SafeGaze simulation (ขับจำลองด้วยเวลาสังเคราะห์ เร็วกว่าเวลาจริง)")
+    parser.add_argument("--hours", type=float, default=MAX_DRIVE_TIME / 3600 + 0.5, help="ระยะเวลาขับจำลอง (ชั่วโมง)")
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result = simulate(args.hours, args.fps, args.seed)
+    elapsed = time.perf_counter() - start
+
+    print(f"Simulated {args.hours:g} h ({result['frames']} frames) in {elapsed:.1f}s "
+          f"({args.hours * 3600 / max(elapsed, 1e-9):.0f}x real time)")
+    for name, count in sorted(result["events"].items()):
+        print(f"  {name}: {count}")
+    if result["overtime_at"] is not None:
+        print(f"Overtime at {result['overtime_at']:.1f}s")
+    for start, end in result["rests"]:
+        print(f"  rest {start:.1f}s -> " + (f"resumed {end:.1f}s" if end is not None else "(still resting)"))
+    print(f"Final score: {result['score']:.2f}")
+    print(f"Digest: {result['digest']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import sys
+import os
+import argparse
+import csv
+import itertools
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+# Setup paths
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import SWEEP_WORKERS
+from src.replay import MODE_CALIBRATING, MODE_RUNNING, MODE_STATIC
+from logic.priority import DEFAULT_PARAMS, RuleEngine, summarize
+
+# ผลลัพธ์ replay ของแต่ละ worker process (โหลดครั้งเดียวตอน worker เริ่ม)
+_recordings = []
+
+def load_recording(path):
+    """
+    อ่านไฟล์ .npz จาก src/replay.py -> arguments ของ RuleEngine.evaluate()
+    ใช้ค่าที่ Smooth แล้วและค่า Calibration ที่บันทึกไว้ (ไม่ต้องรัน MediaPipe ใหม่)
+    """
+    data = np.load(path)
+    mode = data["mode"]
+    t = data["t"]
+    running = (mode == MODE_RUNNING) | (mode == MODE_STATIC)
+
+    # เวลาขับเริ่มที่เฟรมที่ Calibrate เสร็จ (เฟรม CALIBRATING สุดท้ายก่อนเข้า RUNNING)
+    drive_start = 0.0
+    if running.any():
+        first = int(np.argmax(running))
+        calibrating = np.flatnonzero(mode[:first] == MODE_CALIBRATING)
+        drive_start = t[calibrating[-1]] if len(calibrating) else t[first]
+
+    return {
+        "t": t, "ear": data["ear"].astype(np.float64), "mar": data["mar"].astype(np.float64),
+        "pitch": data["pitch"].astype(np.float64), "yaw": data["yaw"].astype(np.float64),
+        "iris": data["iris"], "calibration": tuple(data["calibration"]), "running": running,
+        "static": data["static"], "drive_start": drive_start, "t0": t[0] if len(t) else 0.0,
+    }
+
+def _init_worker(paths):
+    global _recordings
+    _recordings = [load_recording(path) for path in paths]
+
+def evaluate(params, recordings=None):
+    """ประเมินชุดค่า 1 ชุดกับทุกไฟล์ return: สรุปรวม (จำนวนเหตุการณ์, เวลาแจ้งเตือน, คะแนน)"""
+    engine = RuleEngine(params)
+    total = {"sleep": 0, "distract": 0, "yawn": 0, "alert_time": 0.0, "drive_time": 0.0, "max_score": 0.0}
+    for rec in (recordings if recordings is not None else _recordings):
+        summary = summarize(engine.evaluate(**rec), rec["t"])
+        for key in ("sleep", "distract", "yawn", "alert_time", "drive_time"):
+            total[key] += summary[key]
+        total["max_score"] = max(total["max_score"], summary["max_score"])
+    return params, total
+
+def _parse_value(text):
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+def parse_grid(specs):
+    """["time_to_sleep=1,1.5,2", "yaw_hard=30,35"] -> list ของ dict ทุกชุดค่าที่เป็นไปได้"""
+    names, values = [], []
+    for spec in specs:
+        name, _, text = spec.partition("=")
+        if name not in DEFAULT_PARAMS or not text:
+            raise SystemExit(f"Bad --param '{spec}' (names: {', '.join(DEFAULT_PARAMS)})")
+        names.append(name)
+        values.append([_parse_value(v) for v in text.split(",")])
+    return [dict(zip(names, combo)) for combo in itertools.product(*values)]
+
+def main():
+    parser = argparse.ArgumentParser(description="SafeGaze threshold sweep (คำนวณกฎใหม่จากผล replay .npz)")
+    parser.add_argument("recordings", nargs="+", help="ไฟล์ .npz จาก src/replay.py")
+    parser.add_argument("-p", "--param", action="append", default=[],
+                        help="ชื่อ=ค่า1,ค่า2,... (ใส่ได้หลายครั้ง ทุกชุดผสมกัน) เช่น time_to_sleep=1,1.5,2")
+    parser.add_argument("-j", "--workers", type=int, default=SWEEP_WORKERS,
+                        help="จำนวน process (0 = เท่าจำนวน CPU)")
+    parser.add_argument("--csv", default=None, help="บันทึกผลเป็นไฟล์ CSV")
+    args = parser.parse_args()
+
+    grid = parse_grid(args.param) or [{}]
+    names = list(grid[0])
+    workers = args.workers or os.cpu_count()
+    workers = max(1, min(workers, len(grid)))
+
+    print(f"Sweeping {len(grid)} setting(s) over {len(args.recordings)} recording(s) with {workers} worker(s)...")
+    start = time.time()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(args.recordings,)) as pool:
+        results = list(pool.map(evaluate, grid, chunksize=max(1, len(grid) // (workers * 4))))
+    elapsed = time.time() - start
+
+    header = names + ["sleep", "distract", "yawn", "alert_%", "max_score"]
+    rows = []
+    for params, total in results:
+        alert = 100.0 * total["alert_time"] / max(total["drive_time"], 1e-6)
+        rows.append([params[name] for name in names] +
+                    [total["sleep"], total["distract"], total["yawn"], round(alert, 2), round(total["max_score"], 1)])
+
+    print("  ".join(f"{h:>16}" for h in header))
+    for row in rows:
+        print("  ".join(f"{v:>16}" for v in row))
+    print(f"Finished {len(grid)} setting(s) in {elapsed:.1f}s")
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+        print(f"Saved {args.csv}")
+
+if __name__ == "__main__":
+    main()
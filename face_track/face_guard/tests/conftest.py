@@ -0,0 +1,6 @@
+# tests/conftest.py
+import os
+import sys
+
+# รัน pytest จากโฟลเดอร์ face_guard (import src.*, logic.*, bench.* แบบเดียวกับ entry script)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
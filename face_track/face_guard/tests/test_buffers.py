@@ -0,0 +1,109 @@
+# tests/test_buffers.py
+import threading
+import numpy as np
+import pytest
+from pipeline.buffers import BufferPool
+from pipeline.camera import Camera
+
+def test_released_buffer_is_reused():
+    pool = BufferPool((4, 6, 3), np.uint8, 1)
+    a = pool.acquire()
+    a.release()
+    b = pool.acquire()
+    assert b is a and b.array is a.array
+    assert pool.allocated == 1
+
+def test_retained_buffer_is_not_handed_out_until_last_release():
+    pool = BufferPool((4, 6, 3), np.uint8, 2)
+    a = pool.acquire()
+    a.retain()   # เช่น Display ถือไว้
+    a.release()  # main loop เลิกใช้
+    assert pool.in_use() == 1
+    b = pool.acquire()
+    assert b is not a
+    a.release()
+    assert pool.in_use() == 1
+    assert pool.acquire() is a
+    assert pool.allocated == 2
+
+def test_empty_pool_allocates_and_counts():
+    pool = BufferPool((2, 2), np.float32)
+    buffers = [pool.acquire() for _ in range(3)]
+    assert pool.allocated == 3 and pool.in_use() == 3
+    assert buffers[0].array.shape == (2, 2) and buffers[0].array.dtype == np.float32
+    for buffer in buffers:
+        buffer.release()
+    assert pool.in_use() == 0
+    assert any(pool.acquire() is b for b in buffers)
+
+def test_release_more_than_retained_is_an_error():
+    pool = BufferPool((2, 2), np.uint8, 1)
+    buffer = pool.acquire()
+    buffer.release()
+    with pytest.raises(AssertionError):
+        buffer.release()
+
+def test_matches_shape_and_dtype():
+    pool = BufferPool((4, 6, 3), np.uint8)
+    assert pool.matches(np.zeros((4, 6, 3), np.uint8))
+    assert not pool.matches(np.zeros((4, 6, 3), np.float32))
+    assert not pool.matches(np.zeros((6, 4, 3), np.uint8))
+
+def test_concurrent_retain_release_keeps_counts_consistent():
+    pool = BufferPool((2, 2), np.uint8, 4)
+    def worker():
+        for _ in range(2000):
+            buffer = pool.acquire()
+            buffer.retain()
+            buffer.release()
+            buffer.release()
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+    assert pool.in_use() == 0
+    assert pool.allocated <= 8
+    assert len(pool._free) == pool.allocated
+
+class _StreamCapture:
+    """กล้องปลอมที่อ่านได้เรื่อยๆ (ภาพค่า = ลำดับเฟรม)"""
+    def __init__(self, count):
+        self.count = count
+        self.reads = 0
+
+    def set(self, prop, value):
+        return True
+
+    def read(self, out=None):
+        self.reads += 1
+        if self.reads > self.count:
+            return False, None
+        return True, np.full((24, 32, 3), self.reads % 256, dtype=np.uint8)
+
+    def release(self):
+        pass
+
+def test_camera_with_a_retaining_consumer_stops_allocating():
+    camera = Camera.__new__(Camera)
+    camera.source, camera.cap, camera.threaded = "fake", _StreamCapture(3000), True
+    camera._interval, camera.dropped, camera.buffer, camera._raw = 0.0, 0, None, None
+    camera._start_capture_thread(3)
+
+    held = []  # จำลอง Display ที่ถือเฟรมไว้ 1 เฟรมก่อนปล่อย
+    frames = 0
+    while True:
+        success, frame, _, _ = camera.get_frame()
+        if not success: break
+        frames += 1
+        held.append(camera.buffer.retain())
+        if len(held) > 1:
+            held.pop(0).release()
+        # เฟรมที่ได้ต้องไม่ถูกกล้องเขียนทับระหว่างใช้
+        assert frame.min() == frame.max()
+    for buffer in held:
+        buffer.release()
+    camera.release()
+
+    assert frames > 0
+    # กล้องเขียน 1 + ล่าสุด 1 + main loop 1 + consumer 1
+    assert camera.pool.allocated <= 4
+    assert camera.pool.in_use() <= 1  # เหลือเฉพาะเฟรมที่ main loop ถืออยู่
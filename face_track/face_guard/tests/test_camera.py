@@ -0,0 +1,70 @@
+# tests/test_camera.py
+import threading
+import numpy as np
+import pytest
+from pipeline.camera import Camera
+
+class FakeCapture:
+    """กล้องปลอม: ภาพแรกอ่านได้ทันที ภาพถัดไปรอ gate (หรือโยน error ถ้าตั้ง error ไว้)"""
+    def __init__(self, shapes=((48, 64, 3),), error=None):
+        self.shapes = list(shapes)
+        self.error = error
+        self.gate = threading.Event()
+        self.reads = 0
+        self.released = False
+
+    def set(self, prop, value):
+        return True
+
+    def read(self, out=None):
+        assert not self.released, "read after release"
+        self.reads += 1
+        if self.reads > 1:
+            self.gate.wait()
+            if self.error is not None: raise self.error
+        if not self.shapes:
+            return False, None
+        shape = self.shapes.pop(0)
+        return True, np.full(shape, self.reads, dtype=np.uint8)
+
+    def release(self):
+        self.released = True
+
+def _camera(cap):
+    camera = Camera.__new__(Camera)
+    camera.source, camera.cap, camera.threaded = "fake", cap, True
+    camera._interval, camera.dropped, camera.buffer, camera._raw = 0.0, 0, None, None
+    camera._start_capture_thread(3)
+    return camera
+
+def test_release_waits_for_blocked_read_before_closing_capture():
+    cap = FakeCapture()
+    camera = _camera(cap)
+    camera.get_frame()
+    camera._thread.join(timeout=0.05)  # thread ค้างอยู่ใน read() ครั้งที่ 2
+
+    camera.release()
+    assert not cap.released
+    cap.gate.set()
+    camera._thread.join(timeout=2.0)
+    assert cap.released
+
+# exception ยังหลุดออกจาก thread ตามปกติ (ไม่กลืน error) แค่ get_frame() ต้องไม่ค้าง
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_capture_error_does_not_hang_get_frame():
+    cap = FakeCapture(error=RuntimeError("device lost"))
+    camera = _camera(cap)
+    assert camera.get_frame()[0]
+    cap.gate.set()
+    assert camera.get_frame()[0] is False
+    camera.release()
+    assert cap.released
+
+def test_resolution_change_gets_a_matching_buffer():
+    cap = FakeCapture(shapes=((48, 64, 3), (96, 128, 3)))
+    camera = _camera(cap)
+    camera.get_frame()
+    cap.gate.set()
+    success, frame, _, _ = camera.get_frame()
+    assert success and frame.shape == (96, 128, 3) and (frame == 2).all()
+    camera.release()
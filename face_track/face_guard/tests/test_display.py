@@ -0,0 +1,121 @@
+# tests/test_display.py
+import threading
+import time
+import numpy as np
+import pytest
+import ui.display
+from pipeline.buffers import BufferPool
+from ui.display import Display
+
+class _FakeGui:
+    """แทน cv2.imshow / waitKey / destroyWindow (ไม่ต้องมีหน้าต่างจริง)"""
+    def __init__(self):
+        self.shown = []
+        self.keys = []
+        self.gate = threading.Event()
+        self.gate.set()
+        self.destroyed = False
+
+    def imshow(self, name, image):
+        self.gate.wait()
+        self.shown.append(image.copy())
+
+    def waitKey(self, delay):
+        return self.keys.pop(0) if self.keys else -1
+
+    def destroyWindow(self, name):
+        self.destroyed = True
+
+@pytest.fixture
+def gui(monkeypatch):
+    fake = _FakeGui()
+    for name in ("imshow", "waitKey", "destroyWindow"):
+        monkeypatch.setattr(ui.display.cv2, name, getattr(fake, name))
+    return fake
+
+def _wait(cond, timeout=2.0):
+    end = time.monotonic() + timeout
+    while not cond():
+        if time.monotonic() > end:
+            raise AssertionError("timed out")
+        time.sleep(0.005)
+
+def _frame(value):
+    return np.full((4, 6, 3), value, np.uint8)
+
+def test_show_copies_frames_without_buffer(gui):
+    display = Display(threaded=True, max_fps=0)
+    frame = _frame(1)
+    gui.gate.clear()
+    display.show(frame)
+    frame[:] = 99  # loop หลักเขียนเฟรมถัดไปทับได้ทันที
+    gui.gate.set()
+    _wait(lambda: display.shown == 1)
+    display.close()
+    assert (gui.shown[0] == 1).all()
+    assert gui.destroyed
+
+def test_newest_frame_wins_while_display_is_busy(gui):
+    display = Display(threaded=True, max_fps=0)
+    pool = BufferPool((4, 6, 3), np.uint8)
+    gui.gate.clear()
+    display.show(_frame(0))
+    _wait(lambda: display._pending is None)  # thread รับเฟรมแรกไปแล้ว ติดอยู่ใน imshow
+
+    buffers = []
+    for value in range(1, 6):
+        buffer = pool.acquire()
+        buffer.array[:] = value
+        display.show(buffer.array, buffer)
+        buffer.release()  # loop หลักเลิกใช้ Display ยังถือไว้
+        buffers.append(buffer)
+    assert display.skipped == 4
+    assert pool.in_use() == 1  # เหลือแค่เฟรมล่าสุดที่รอแสดง
+
+    gui.gate.set()
+    _wait(lambda: display.shown == 2)
+    display.close()
+    assert [int(image[0, 0, 0]) for image in gui.shown] == [0, 5]
+    assert pool.in_use() == 0
+
+def test_keys_are_forwarded_from_the_display_thread(gui):
+    gui.keys = [-1, ord("q") | 0x100, 0xFF, ord("r")]
+    display = Display(threaded=True, max_fps=0)
+    _wait(lambda: display.keys.qsize() == 2)
+    assert display.get_key() == ord("q")
+    assert display.get_key() == ord("r")
+    assert display.get_key() == -1
+    display.close()
+
+def test_close_releases_pending_frame(gui):
+    display = Display(threaded=True, max_fps=0)
+    pool = BufferPool((4, 6, 3), np.uint8)
+    gui.gate.clear()
+    display.show(_frame(0))
+    _wait(lambda: display._pending is None)
+    buffer = pool.acquire()
+    display.show(buffer.array, buffer)
+    buffer.release()
+    gui.gate.set()
+    display.close()
+    assert pool.in_use() == 0
+
+def test_unthreaded_shows_immediately(gui):
+    gui.keys = [ord("c")]
+    display = Display(threaded=False)
+    display.show(_frame(7))
+    assert display.shown == 1 and (gui.shown[0] == 7).all()
+    assert display.get_key() == ord("c")
+    display.close()
+    assert gui.destroyed
+
+def test_max_fps_limits_shown_frames(gui):
+    display = Display(threaded=True, max_fps=20)
+    start = time.monotonic()
+    while time.monotonic() - start < 0.5:
+        display.show(_frame(1))
+        time.sleep(0.002)
+    display.close()
+    # ~10 เฟรมใน 0.5 วินาที ที่เหลือถูกเฟรมใหม่ทับ
+    assert display.shown <= 14
+    assert display.skipped > display.shown
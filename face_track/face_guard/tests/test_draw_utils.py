@@ -0,0 +1,66 @@
+# tests/test_draw_utils.py
+import numpy as np
+from mediapipe.python.solutions import drawing_styles, drawing_utils, face_mesh
+from bench.fixtures import make_landmarks, make_results
+from ui.draw_utils import draw_face_mesh
+
+W, H = 640, 480
+
+def _points():
+    pts = make_landmarks(W, H, face_size=240)
+    # ปัดให้อยู่กลาง pixel: mp_drawing แปลงพิกัด normalized กลับเป็น pixel ด้วยการปัดลง
+    pts[:, :2] = np.floor(pts[:, :2]) + 0.5
+    return pts
+
+def _mp_draw(points, layers):
+    # วาดแบบเดิมด้วย mp_drawing.draw_landmarks ไว้เทียบ
+    image = np.zeros((H, W, 3), np.uint8)
+    face = make_results(points, W, H).multi_face_landmarks[0]
+    for connections, style in layers:
+        drawing_utils.draw_landmarks(image, face, connections, None, style)
+    return image
+
+_CONTOURS = (face_mesh.FACEMESH_CONTOURS, drawing_styles.get_default_face_mesh_contours_style())
+_IRISES = (face_mesh.FACEMESH_IRISES, drawing_styles.get_default_face_mesh_iris_connections_style())
+_TESSELATION = (face_mesh.FACEMESH_TESSELATION, drawing_styles.get_default_face_mesh_tesselation_style())
+
+def _drawn(image):
+    return image.any(axis=2)
+
+def test_full_mesh_covers_same_pixels_as_mp_drawing():
+    pts = _points()
+    image = np.zeros((H, W, 3), np.uint8)
+    draw_face_mesh(image, pts, "full")
+    expected = _mp_draw(pts, [_TESSELATION, _CONTOURS, _IRISES])
+    # รวมกลุ่มตามสีทำให้ลำดับเส้นที่ทับกันต่างไป สีตรงจุดตัดอาจต่าง แต่ pixel ที่วาดต้องตรงกัน
+    assert np.array_equal(_drawn(image), _drawn(expected))
+
+def test_low_detail_skips_tesselation():
+    pts = _points()
+    low = np.zeros((H, W, 3), np.uint8)
+    full = low.copy()
+    draw_face_mesh(low, pts, "low")
+    draw_face_mesh(full, pts, "full")
+    assert np.array_equal(_drawn(low), _drawn(_mp_draw(pts, [_CONTOURS, _IRISES])))
+    assert _drawn(low).sum() < _drawn(full).sum()
+    assert not (_drawn(low) & ~_drawn(full)).any()
+
+def test_drawn_colors_come_from_mesh_styles():
+    pts = _points()
+    image = np.zeros((H, W, 3), np.uint8)
+    draw_face_mesh(image, pts, "full")
+    colors = {tuple(c) for c in np.unique(image[_drawn(image)], axis=0)}
+    expected = {tuple(c) for c in np.unique(_mp_draw(pts, [_TESSELATION, _CONTOURS, _IRISES]).reshape(-1, 3), axis=0)}
+    assert colors <= expected
+
+def test_468_points_drop_iris_lines():
+    pts = _points()[:468]
+    image = np.zeros((H, W, 3), np.uint8)
+    draw_face_mesh(image, pts, "low")
+    # จุดตาดำ (468+) ไม่มี ต้องไม่ error และวาดเฉพาะกรอบตา/คิ้ว/ปาก
+    assert np.array_equal(_drawn(image), _drawn(_mp_draw(pts, [_CONTOURS])))
+
+def test_none_points_draw_nothing():
+    image = np.zeros((H, W, 3), np.uint8)
+    draw_face_mesh(image, None, "full")
+    assert not image.any()
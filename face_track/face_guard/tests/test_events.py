@@ -0,0 +1,98 @@
+# tests/test_events.py
+import json
+import threading
+from logic.events import EventLogger, EventTracker
+
+def _read(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+def test_close_writes_everything_queued(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    logger = EventLogger(path, flush_interval=60.0)
+    for i in range(100):
+        logger.log({"i": i})
+    assert logger.close()
+    assert [e["i"] for e in _read(path)] == list(range(100))
+
+def test_close_timeout_leaves_the_file_to_the_writer(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    logger = EventLogger(path, flush_interval=60.0)
+    gate = threading.Event()
+    write = logger._write
+    def slow_write(batch):
+        gate.wait()  # ดิสก์ช้า: thread ยังเขียนอยู่ตอน close() หมดเวลา
+        write(batch)
+    logger._write = slow_write
+    for i in range(10):
+        logger.log({"i": i})
+
+    assert not logger.close(timeout=0.05)
+    assert not logger._file.closed
+    gate.set()
+    logger._thread.join(timeout=2.0)
+    assert logger._file.closed
+    assert [e["i"] for e in _read(path)] == list(range(10))
+
+def test_rotation_moves_full_file_to_backup(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    logger = EventLogger(path, max_bytes=200, backups=2, flush_interval=60.0)
+    for i in range(30):
+        logger.log({"i": i, "pad": "x" * 20})
+    assert logger.close()
+    assert [e["i"] for e in _read(path + ".1")] == list(range(30))
+    assert _read(path) == []
+
+def test_full_queue_drops_and_counts(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    logger = EventLogger(path, flush_interval=60.0, queue_size=5)
+    for i in range(8):
+        logger.log({"i": i})
+    assert logger.dropped == 3
+    assert logger.close()
+    assert [e["i"] for e in _read(path)] == list(range(5))
+
+class _ListLogger:
+    def __init__(self):
+        self.events = []
+
+    def log(self, event):
+        self.events.append(event)
+
+def test_tracker_emits_start_and_end_with_duration():
+    logger = _ListLogger()
+    tracker = EventTracker(logger, source="cam0")
+    calls = []
+    def snapshot():
+        calls.append(1)
+        return {"ear": 0.2}
+
+    tracker.update({"trig_yawn": False, "is_sleep_locked": False}, snapshot, now=1.0)
+    tracker.update({"trig_yawn": True, "is_sleep_locked": False}, snapshot, now=2.0)
+    tracker.update({"trig_yawn": True, "is_sleep_locked": False}, snapshot, now=3.0)
+    tracker.update({"trig_yawn": False, "is_sleep_locked": False}, snapshot, now=4.5)
+
+    assert [(e["event"], e["phase"], e["t"]) for e in logger.events] == [("yawn", "start", 2.0), ("yawn", "end", 4.5)]
+    assert logger.events[1]["duration"] == 2.5
+    assert logger.events[0]["source"] == "cam0"
+    assert logger.events[0]["features"] == {"ear": 0.2}
+    # snapshot เรียกเฉพาะเฟรมที่มีเหตุการณ์
+    assert len(calls) == 2
+
+def test_tracker_keeps_state_for_missing_keys_and_end_all():
+    logger = _ListLogger()
+    tracker = EventTracker(logger)
+    snapshot = lambda: {}
+
+    tracker.update({"is_static": True, "trig_distract": True}, snapshot, now=0.0)
+    # ตอนนิ่ง monitor ไม่ส่ง trig_distract มา: ถือว่ายังเกิดอยู่
+    tracker.update({"is_static": True}, snapshot, now=1.0)
+    assert set(tracker.active) == {"static", "distraction"}
+
+    tracker.end_all(snapshot, now=3.0)
+    ends = {e["event"]: e["duration"] for e in logger.events if e["phase"] == "end"}
+    assert ends == {"static": 3.0, "distraction": 3.0}
+    assert tracker.active == {}
+    count = len(logger.events)
+    tracker.end_all(snapshot, now=4.0)
+    assert len(logger.events) == count
@@ -0,0 +1,106 @@
+# tests/test_fatigue.py
+import math
+import numpy as np
+import pytest
+from logic.fatigue import FatigueMetrics, MIN_COVERAGE
+
+WINDOWS = (2.0, 10.0, 60.0)
+MAX_GAP = 0.5
+
+def _clip(seed, n=4000):
+    rng = np.random.default_rng(seed)
+    dt = rng.uniform(0.01, 0.05, n)
+    dt[rng.random(n) < 0.003] = 3.0  # หน้าหายนานๆ (เกิน max_gap)
+    t = np.cumsum(dt)
+    # ตาเปิดเป็นช่วงๆ สลับปิดสั้น (กระพริบ) และปิดนาน (หลับใน)
+    closed = np.zeros(n, dtype=bool)
+    i = 0
+    while i < n:
+        i += int(rng.integers(5, 120))
+        closed[i:i + int(rng.choice([2, 4, 8, 90]))] = True
+        i += 90
+    return t, closed
+
+def _brute(t, closed, now_idx, seconds):
+    """คำนวณใหม่ทั้งหมดจากประวัติ (ไว้เทียบกับแบบ O(1) ต่อเฟรม)"""
+    t, closed = t[:now_idx + 1], closed[:now_idx + 1]
+    now = t[-1]
+    limit = now - seconds
+    dt = np.clip(np.diff(t, prepend=t[0]), 0.0, MAX_GAP)
+    inside = t >= limit
+    total = dt[inside].sum()
+    closed_time = dt[inside & closed].sum()
+
+    onsets = np.flatnonzero(closed & ~np.r_[False, closed[:-1]])
+    starts = t[onsets]
+    ends = []
+    for i in onsets:
+        j = i
+        while j < len(closed) and closed[j]:
+            j += 1
+        ends.append(t[j] if j < len(closed) else math.nan)
+    ends = np.array(ends)
+    intervals = np.r_[math.nan, np.diff(starts)]
+    in_window = starts >= limit
+    durations = (ends - starts)[in_window]
+    durations = durations[~np.isnan(durations)]
+    gaps = intervals[in_window]
+    gaps = gaps[~np.isnan(gaps)]
+    return {
+        "perclos": closed_time / max(total, seconds * MIN_COVERAGE),
+        "blinks": int(in_window.sum()),
+        "blink_rate": in_window.sum() * 60.0 / seconds,
+        "blink_mean": durations.mean() if len(durations) else 0.0,
+        "blink_max": durations.max() if len(durations) else 0.0,
+        "interval_mean": gaps.mean() if len(gaps) else 0.0,
+        "interval_std": gaps.std() if len(gaps) else 0.0,
+    }
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_matches_brute_force_every_frame(seed):
+    t, closed = _clip(seed)
+    metrics = FatigueMetrics(WINDOWS, max_gap=MAX_GAP)
+    for i in range(len(t)):
+        metrics.update(closed[i], float(t[i]))
+        if i % 7 and i < len(t) - 1:
+            continue
+        for seconds in WINDOWS:
+            expected = _brute(t, closed, i, seconds)
+            got = metrics.stats(seconds)
+            assert got["blinks"] == expected["blinks"], (i, seconds)
+            for key, value in expected.items():
+                assert got[key] == pytest.approx(value, rel=1e-6, abs=1e-6), (i, seconds, key)
+    assert metrics.total_blinks == int((closed & ~np.r_[False, closed[:-1]]).sum())
+
+def test_ring_grows_and_keeps_old_values():
+    # หน้าต่างยาวที่ 100 fps: ring ต้องขยายหลายครั้งโดยไม่เสียค่าที่ยังอยู่ในหน้าต่าง
+    metrics = FatigueMetrics((30.0,), max_gap=MAX_GAP)
+    t = np.arange(5000) / 100.0
+    closed = (np.arange(5000) % 50) < 5
+    for ti, ci in zip(t, closed):
+        metrics.update(ci, float(ti))
+    assert metrics._frames.capacity >= 3000
+    expected = _brute(t, closed, len(t) - 1, 30.0)
+    assert metrics.perclos(30.0) == pytest.approx(expected["perclos"])
+    assert metrics.blink_count(30.0) == expected["blinks"]
+
+def test_long_closure_starting_outside_the_window():
+    # ตาปิดนานกว่าหน้าต่าง: จุดเริ่มหลุดไปก่อนลืมตา ไม่นับระยะเวลาครั้งนั้น
+    metrics = FatigueMetrics((2.0,), max_gap=MAX_GAP)
+    t = np.arange(51) * 0.1
+    closed = (t >= 1.0) & (t < 5.0)
+    for ti, ci in zip(t, closed):
+        metrics.update(ci, float(ti))
+    stats = metrics.stats(2.0)
+    assert stats["blinks"] == 0
+    assert stats["blink_max"] == 0.0 and stats["blink_mean"] == 0.0
+    assert stats["perclos"] == pytest.approx(_brute(t, closed, len(t) - 1, 2.0)["perclos"])
+    assert stats["perclos"] > 0.9
+
+def test_perclos_uses_min_coverage_at_start():
+    metrics = FatigueMetrics((10.0,), max_gap=MAX_GAP)
+    metrics.update(True, 0.0)
+    metrics.update(True, 0.5)
+    metrics.update(True, 1.0)
+    # ข้อมูลแค่ 1 วินาที: หารด้วยครึ่งหน้าต่าง (5 วินาที) ไม่ใช่ 1 วินาที
+    assert metrics.perclos(10.0) == pytest.approx(1.0 / (10.0 * MIN_COVERAGE))
@@ -0,0 +1,37 @@
+# tests/test_features.py
+from types import SimpleNamespace
+import numpy as np
+import pytest
+from bench.fixtures import make_landmarks, jitter
+from detectors.attention import calculate_head_pose
+from detectors.eye import calculate_ear, get_iris_position
+from detectors.features import compute_features
+from detectors.mouth import calculate_mar
+from pipeline.mp_face import landmarks_to_array
+
+@pytest.mark.parametrize("seed", range(5))
+def test_compute_features_matches_individual_detectors(seed):
+    points = jitter(make_landmarks(), np.random.default_rng(seed), sigma=2.0)
+    feats = compute_features(points, 1280, 720)
+
+    assert feats["ear"] == pytest.approx(calculate_ear(points))
+    assert feats["mar"] == pytest.approx(calculate_mar(points))
+    assert feats["iris"] == get_iris_position(points)
+    pitch, yaw, roll = calculate_head_pose(points, 1280, 720)
+    assert (feats["pitch"], feats["yaw"], feats["roll"]) == pytest.approx((pitch, yaw, roll))
+
+def test_direct_values_skip_geometry():
+    points = make_landmarks()
+    feats = compute_features(points, 1280, 720, direct={"ear": 0.9, "mar": 0.1, "rotation": np.eye(3)})
+    assert (feats["ear"], feats["mar"]) == (0.9, 0.1)
+    assert (feats["pitch"], feats["yaw"], feats["roll"]) == pytest.approx((0.0, 0.0, 0.0), abs=1e-6)
+
+def test_landmarks_to_array_scales_into_the_shared_buffer():
+    landmarks = [SimpleNamespace(x=0.5, y=0.25, z=-0.1), SimpleNamespace(x=1.0, y=1.0, z=0.0)]
+    out = np.zeros((2, 3), dtype=np.float32)
+    result = landmarks_to_array(landmarks, 640, 480, out)
+    assert result is out  # เขียนทับ array เดิม ไม่จองใหม่
+    assert np.allclose(out, [[320.0, 120.0, -64.0], [640.0, 480.0, 0.0]])
+
+    resized = landmarks_to_array(landmarks[:1], 640, 480, out)
+    assert resized is not out and resized.shape == (1, 3)
@@ -0,0 +1,37 @@
+# tests/test_head_pose.py
+import cv2
+import numpy as np
+import pytest
+from detectors.attention import FACE_3D, FACE_FLIP, POSE_IDX, HeadPoseEstimator, camera_matrix, rotation_to_euler
+from pipeline.mp_face import transform_to_rotation
+
+def _rot_x(degrees):
+    return cv2.Rodrigues(np.array([np.radians(degrees), 0.0, 0.0]))[0]
+
+def test_frontal_transform_matrix_gives_zero_angles():
+    matrix = np.eye(4)
+    matrix[:3, 3] = (0.0, 0.0, -50.0)  # หน้าอยู่หน้ากล้อง (แกน OpenGL มองไปทาง -z)
+    assert np.allclose(rotation_to_euler(transform_to_rotation(matrix)), 0.0, atol=1e-6)
+
+@pytest.mark.parametrize("nod", [-3.0, -1.0, 1.0, 3.0])
+def test_small_nods_do_not_wrap(nod):
+    matrix = np.eye(4)
+    matrix[:3, :3] = _rot_x(nod)  # หมุนรอบแกน x เป็นมุมเดียวกันทั้งแกน OpenGL และ OpenCV
+    pitch, yaw, roll = rotation_to_euler(transform_to_rotation(matrix))
+    assert pitch == pytest.approx(nod)
+    assert yaw == pytest.approx(0.0, abs=1e-6) and roll == pytest.approx(0.0, abs=1e-6)
+
+@pytest.mark.parametrize("nod", [-3.0, 0.0, 3.0])
+def test_solvepnp_matches_transform_convention(nod):
+    # ฉายโมเดลหน้าที่หันเข้ากล้อง (ก้ม/เงย nod องศา) แล้วหามุมกลับด้วย solvePnP
+    width, height = 1280, 720
+    rmat = _rot_x(nod) @ FACE_FLIP
+    cam = camera_matrix(width, height)
+    projected = (cam @ (rmat @ FACE_3D.T + np.array([[0.0], [0.0], [2000.0]]))).T
+    image_points = projected[:, :2] / projected[:, 2:]
+
+    points = np.zeros((478, 3), dtype=np.float32)
+    points[POSE_IDX, :2] = image_points
+    pitch, yaw, roll = HeadPoseEstimator(warm_start=False).estimate(points, width, height)
+    assert pitch == pytest.approx(nod, abs=1e-3)
+    assert abs(yaw) < 1e-3 and abs(roll) < 1e-3
@@ -0,0 +1,31 @@
+# tests/test_live_stream.py
+import os
+import time
+import numpy as np
+import pytest
+from pipeline.mp_face import FaceLandmarkerDetector
+from src.config import FACE_MODEL_PATH
+
+pytestmark = pytest.mark.skipif(not os.path.exists(FACE_MODEL_PATH), reason="no FaceLandmarker model")
+
+def test_live_stream_returns_each_result_once():
+    detector = FaceLandmarkerDetector(live=True)
+    frame = np.zeros((120, 160, 3), dtype=np.uint8)
+    stamps, seen = [], []
+    try:
+        for idx in range(40):
+            results = detector.process(frame, (idx, idx / 30))
+            stamp = detector.get_stamp(results)
+            if stamp is None:
+                assert results is None
+            else:
+                stamps.append(stamp)
+                seen.append(results)
+            time.sleep(0.002 if idx % 4 else 0.03)  # ส่งเร็วกว่าที่ผลออก สลับกับรอให้ผลทัน
+    finally:
+        detector.close()
+
+    assert stamps, "no result arrived"
+    assert len({id(r) for r in seen}) == len(seen)  # ผลแต่ละชุดออกมาครั้งเดียว
+    indices = [idx for idx, _ in stamps]
+    assert indices == sorted(set(indices))  # ไม่ซ้ำ และเรียงตามเฟรมที่ส่ง
@@ -0,0 +1,95 @@
+# tests/test_metrics.py
+import urllib.request
+import numpy as np
+import pytest
+from pipeline.metrics import LatencyHistogram, FrameMetrics, MetricsServer, END_TO_END, STAGES
+
+def test_bucket_bounds_cover_every_value():
+    hist = LatencyHistogram()
+    values = list(range(0, 5000)) + np.unique(np.geomspace(5000, hist.max_value, 20000).astype(int)).tolist()
+    for value in values:
+        index = hist._index(value)
+        lower = hist._upper(index - 1) + 1 if index > 0 else 0
+        upper = hist._upper(index)
+        assert lower <= value <= upper, value
+        # ความกว้างช่องไม่เกิน 1/half ของค่า (ความละเอียดสัมพัทธ์คงที่)
+        assert upper - lower + 1 <= max(1, value / hist.half), value
+
+def test_buckets_are_contiguous():
+    hist = LatencyHistogram()
+    uppers = [hist._upper(i) for i in range(len(hist.counts))]
+    assert uppers[0] == 0
+    assert all(b > a for a, b in zip(uppers, uppers[1:]))
+    assert uppers[-1] >= hist.max_value
+    assert hist._index(hist.max_value) == len(hist.counts) - 1
+
+def test_percentiles_match_numpy_within_resolution():
+    rng = np.random.default_rng(0)
+    samples = rng.lognormal(np.log(0.02), 0.8, 20000)  # ~20 ms หางยาว
+    hist = LatencyHistogram()
+    for s in samples:
+        hist.record(float(s))
+    quantiles = (0.5, 0.9, 0.99, 0.999)
+    got = hist.percentiles(quantiles)
+    for q, value in zip(quantiles, got):
+        expected = np.quantile(samples, q, method="inverted_cdf")
+        # ตอบเป็นขอบบนของช่อง: ไม่ต่ำกว่าค่าจริง และเกินไม่เกินความกว้างช่อง
+        assert expected - 1e-6 <= value <= expected * (1 + 2 / hist.half) + 1e-6, q
+    assert hist.count == len(samples)
+    assert hist.total == pytest.approx(samples.sum())
+    assert hist.max == samples.max()
+    assert hist.percentiles((1.0,)) == [samples.max()]
+
+def test_empty_negative_and_overflow():
+    hist = LatencyHistogram(max_seconds=1.0)
+    assert hist.percentiles((0.5, 0.99)) == [0.0, 0.0]
+    hist.record(-0.001)  # นาฬิกาถอยหลัง: นับเป็น 0
+    hist.record(5.0)     # เกินช่วง: อยู่ช่องสุดท้าย
+    assert hist.counts[0] == 1 and hist.counts[-1] == 1
+    p50, p100 = hist.percentiles((0.5, 1.0))
+    # ค่าที่เกิน max_seconds ตอบได้แค่ขอบบนของช่องสุดท้าย (ค่าจริงอยู่ใน max)
+    assert p50 == 0.0 and 1.0 <= p100 <= 1.0 * (1 + 2 / hist.half)
+    assert hist.max == 5.0
+
+def test_frame_metrics_stages_and_prometheus():
+    metrics = FrameMetrics(hud_interval=0.0)
+    for i in range(10):
+        t = 100.0 + i
+        metrics.begin(t, now=t + 0.010)
+        metrics.mark("inference", now=t + 0.030)
+        metrics.mark("logic", now=t + 0.032)
+        metrics.done(now=t + 0.040)
+    metrics.skip("quality")
+    metrics.set_skipped("display", 3)
+    metrics.set_dropped(2)
+
+    expected = {"queue": 0.010, "inference": 0.020, "logic": 0.002, "render": 0.008, END_TO_END: 0.040}
+    for name, seconds in expected.items():
+        p50, = metrics.histograms[name].percentiles((0.5,))
+        assert p50 == pytest.approx(seconds, rel=2 / 32), name
+        assert metrics.histograms[name].count == 10
+    assert len(metrics.hud_lines(now=1.0)) == len(STAGES) + 1
+
+    text = metrics.render_prometheus()
+    assert "safegaze_frames_total 10\n" in text
+    assert "safegaze_frames_dropped_total 2\n" in text
+    assert 'safegaze_frames_skipped_total{reason="quality"} 1\n' in text
+    assert 'safegaze_frames_skipped_total{reason="display"} 3\n' in text
+    assert 'safegaze_frame_latency_seconds_count{stage="end_to_end"} 10\n' in text
+
+def test_headless_frame_has_no_render_stage():
+    metrics = FrameMetrics()
+    metrics.begin(0.0, now=0.01)
+    metrics.done(rendered=False, now=0.02)
+    assert metrics.histograms["render"].count == 0
+    assert metrics.histograms[END_TO_END].count == 1
+
+def test_metrics_server_serves_prometheus_text():
+    metrics = FrameMetrics()
+    server = MetricsServer(metrics, host="127.0.0.1", port=0)
+    try:
+        with urllib.request.urlopen(server.url, timeout=2.0) as response:
+            assert response.status == 200
+            assert response.read().decode() == metrics.render_prometheus()
+    finally:
+        server.close()
@@ -0,0 +1,77 @@
+# tests/test_overlay.py
+import cv2
+import numpy as np
+from bench.fixtures import make_frame
+from ui.overlay import HUD, Layer, render_text
+from ui.theme import FONT, C_REST_BG
+
+W, H = 640, 480
+
+# วาดแบบเดิม (ก่อนมี cache) ไว้เทียบ: ทับทั้งเฟรมด้วย addWeighted แล้ว putText ตรงๆ
+def _old_calibration(frame, progress):
+    overlay = frame.copy()
+    cv2.rectangle(overlay, (0, 0), (W, H), (0, 0, 0), -1)
+    cv2.addWeighted(overlay, 0.7, frame, 0.3, 0, frame)
+    cx, cy = W // 2, H // 2
+    cv2.putText(frame, "CALIBRATION", (cx - 140, cy - 80), FONT, 1.2, (0, 255, 255), 3)
+    cv2.putText(frame, "Look Straight & Stay Still", (cx - 180, cy - 30), FONT, 0.8, (255, 255, 255), 1)
+    start_x = cx - 200
+    cv2.rectangle(frame, (start_x, cy + 20), (start_x + 400, cy + 50), (100, 100, 100), -1)
+    cv2.rectangle(frame, (start_x, cy + 20), (start_x + int(400 * progress), cy + 50), (0, 255, 0), -1)
+
+def _old_rest(frame, rest_time):
+    overlay = frame.copy()
+    cv2.rectangle(overlay, (0, 0), (W, H), C_REST_BG, -1)
+    cv2.addWeighted(overlay, 0.9, frame, 0.1, 0, frame)
+    cx, cy = W // 2, H // 2
+    mins, secs = int(rest_time // 60), int(rest_time % 60)
+    cv2.putText(frame, "REST MODE", (cx - 150, cy - 60), FONT, 1.5, (255, 255, 255), 3)
+    cv2.putText(frame, f"{mins:02}:{secs:02}", (cx - 100, cy + 40), FONT, 3.0, (0, 255, 0), 5)
+    cv2.putText(frame, "Press 'r' to Resume", (cx - 120, cy + 100), FONT, 0.8, (0, 255, 255), 1)
+
+def _max_diff(a, b):
+    return int(np.abs(a.astype(np.int16) - b.astype(np.int16)).max())
+
+def test_calibration_screen_matches_direct_drawing():
+    frame = make_frame(W, H)
+    expected = frame.copy()
+    _old_calibration(expected, 0.4)
+    HUD(W, H).draw_calibration(frame, 0.4)
+    assert _max_diff(frame, expected) <= 2  # ต่างแค่การปัดเศษตรงขอบนุ่มของตัวอักษร
+
+def test_rest_screen_matches_direct_drawing():
+    hud = HUD(W, H)
+    for rest_time in (0.0, 125.0):  # ครั้งที่ 2 ใช้ชั้นจาก cache
+        frame = make_frame(W, H)
+        expected = frame.copy()
+        _old_rest(expected, rest_time)
+        hud.draw_rest_screen(frame, rest_time)
+        assert _max_diff(frame, expected) <= 2
+
+def test_cached_text_matches_put_text():
+    frame = make_frame(W, H)
+    expected = frame.copy()
+    cv2.putText(expected, "STATUS: TIRED", (200, 60), FONT, 1.0, (0, 255, 255), 2)
+    render_text("STATUS: TIRED", (200, 60), 1.0, (0, 255, 255), 2).draw(frame)
+    assert _max_diff(frame, expected) <= 2
+
+def test_layer_is_cropped_and_clipped_to_frame():
+    alpha = np.zeros((50, 50), dtype=np.uint8)
+    alpha[10:20, 30:40] = 255
+    bgr = np.zeros((50, 50, 3), dtype=np.uint8)
+    bgr[alpha > 0] = (1, 2, 3)
+    layer = Layer(bgr, alpha, x=-35, y=5)
+    assert (layer.x, layer.y, layer.bgr.shape[:2], layer.opaque) == (-5, 15, (10, 10), True)
+
+    frame = np.zeros((40, 40, 3), dtype=np.uint8)
+    layer.draw(frame)  # ครึ่งซ้ายหลุดขอบภาพ
+    assert (frame[15:25, 0:5] == (1, 2, 3)).all()
+    assert frame.sum() == 6 * 50
+
+def test_cache_is_bounded():
+    from ui import overlay
+    hud = HUD(W, H)
+    frame = make_frame(W, H)
+    for i in range(overlay.LAYER_CACHE_SIZE + 20):
+        hud.draw_info_panel(frame, i, 0, 0.0, "FRESH", (0, 255, 0))
+    assert len(hud._cache) <= overlay.LAYER_CACHE_SIZE
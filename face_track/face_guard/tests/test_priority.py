@@ -0,0 +1,102 @@
+# tests/test_priority.py
+import numpy as np
+import pytest
+from types import SimpleNamespace
+from logic.monitor import DriverMonitor
+from logic.priority import RuleEngine, PRIORITY_RULES, summarize
+
+CALIBRATION = (0.2, 0.5, 0.0, 0.0)  # thresh_ear, thresh_mar, base_yaw, base_pitch
+
+def _segments(rng, n, choices, mean_len=25):
+    """ค่าเป็นช่วงๆ (เหมือนพฤติกรรมจริง: หลับ/หาว/หัน ต่อเนื่องหลายเฟรม)"""
+    out = []
+    while len(out) < n:
+        out += [choices[rng.integers(len(choices))]] * int(rng.integers(1, 2 * mean_len))
+    return np.array(out[:n])
+
+def _clip(seed, n=3000):
+    rng = np.random.default_rng(seed)
+    # เวลาแต่ละเฟรมไม่สม่ำเสมอ บางช่วงเฟรมหาย (ช่องว่างยาว)
+    dt = rng.uniform(0.02, 0.06, n)
+    dt[rng.random(n) < 0.005] = 1.5
+    t = 100.0 + np.cumsum(dt)
+    ear = _segments(rng, n, [0.3, 0.3, 0.15, 0.12], 15) + rng.normal(0, 0.01, n)
+    mar = _segments(rng, n, [0.1, 0.1, 0.1, 0.7]) + rng.normal(0, 0.02, n)
+    pitch = _segments(rng, n, [0.0, 0.0, -15.0, 30.0]) + rng.normal(0, 1.0, n)
+    yaw = _segments(rng, n, [0.0, 0.0, 20.0, -20.0, 40.0]) + rng.normal(0, 1.0, n)
+    iris = _segments(rng, n, ["CENTER", "LEFT", "RIGHT"])
+    static = _segments(rng, n, [False, False, False, False, True], 40)
+    return t, ear, mar, pitch, yaw, iris, static
+
+class _Liveness:
+    """ผลความนิ่งตามที่บันทึกไว้ (เหมือนที่ evaluate() ใช้)"""
+    def __init__(self):
+        self.nose_history = []
+        self.static = False
+
+    def check_static(self, blink_count):
+        return self.static
+
+def _run_monitor(clip, params):
+    t, ear, mar, pitch, yaw, iris, static = clip
+    thresh_ear, thresh_mar, base_yaw, base_pitch = CALIBRATION
+    cal = SimpleNamespace(thresh_ear=thresh_ear, thresh_mar=thresh_mar, base_yaw=base_yaw, base_pitch=base_pitch)
+    liveness = _Liveness()
+    monitor = DriverMonitor(cal, liveness, now=t[0], rules=RuleEngine(params))
+    monitor.start(t[0])
+    statuses = []
+    for i in range(len(t)):
+        liveness.static = bool(static[i])
+        status = monitor.update(float(ear[i]), float(mar[i]), float(pitch[i]), float(yaw[i]), iris[i], now=float(t[i]))
+        # status["score"] ปัดเป็น int ในบางกรณี ใช้ค่าจริงใน ScoreManager (เหมือนที่ replay บันทึก)
+        status["raw_score"] = monitor.score_mgr.score
+        statuses.append(status)
+    return statuses
+
+@pytest.mark.parametrize("seed,params", [
+    (0, None),
+    (1, None),
+    (2, {"time_to_sleep": 0.5, "sleep_recovery_time": 0.7, "blink_window": 3.0, "blink_freq_threshold": 4}),
+    (3, {"perclos_window": 10.0, "perclos_threshold": 0.3, "max_drive_time": 60.0, "ear_scale": 1.2}),
+])
+def test_evaluate_matches_monitor_frame_by_frame(seed, params):
+    clip = _clip(seed)
+    t, ear, mar, pitch, yaw, iris, static = clip
+    statuses = _run_monitor(clip, params)
+    running = np.ones(len(t), dtype=bool)
+    result = RuleEngine(params).evaluate(t, ear, mar, pitch, yaw, iris, CALIBRATION, running, static,
+                                         drive_start=t[0], t0=t[0])
+
+    messages = [rule[1] for rule in PRIORITY_RULES]
+    for i, status in enumerate(statuses):
+        assert result["blink_rate"][i] == status["blink_rate"], i
+        assert result["perclos"][i] == pytest.approx(status["perclos"], abs=1e-9), i
+        assert result["is_high_perclos"][i] == status["is_high_perclos"], i
+        assert result["active"][i] == (not status["is_static"]), i
+        if status["is_static"]:
+            assert result["warning"][i] == -1
+            continue
+        for key in ("is_sleep_locked", "trig_sleep", "trig_yawn", "trig_distract", "is_overtime",
+                    "is_sleeping_raw", "is_yawning", "is_distracted"):
+            if key in status:
+                assert bool(result[key][i]) == bool(status[key]), (i, key)
+        for key in ("prog_sleep", "prog_yawn", "prog_distract"):
+            assert result[key][i] == pytest.approx(status[key], abs=1e-9), (i, key)
+        code = result["warning"][i]
+        assert (messages[code] if code >= 0 else "") == status["warning_msg"], i
+        assert result["score"][i] == pytest.approx(status["raw_score"], abs=1e-6), i
+
+def test_clip_exercises_every_warning():
+    # กันไม่ให้การเทียบข้างบนผ่านเพราะคลิปไม่มีเหตุการณ์เลย
+    t, ear, mar, pitch, yaw, iris, static = _clip(2)
+    params = {"time_to_sleep": 0.5, "sleep_recovery_time": 0.7, "max_drive_time": 30.0}
+    result = RuleEngine(params).evaluate(t, ear, mar, pitch, yaw, iris, CALIBRATION,
+                                         np.ones(len(t), dtype=bool), static)
+    assert set(np.unique(result["warning"]).tolist()) == {-1, 0, 1, 2, 3}
+    summary = summarize(result, t)
+    assert summary["sleep"] > 0 and summary["yawn"] > 0 and summary["distract"] > 0
+    assert 0 < summary["max_score"] <= 100
+
+def test_unknown_param_is_an_error():
+    with pytest.raises(ValueError):
+        RuleEngine({"time_to_slep": 1.0})
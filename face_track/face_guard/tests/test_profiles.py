@@ -0,0 +1,91 @@
+# tests/test_profiles.py
+from logic.calibration import Calibrator
+from logic.profiles import ProfileStore, feature_source
+from logic.session import DriverSession
+
+def _save(path, source):
+    store = ProfileStore(path, source)
+    calibrator = Calibrator()
+    calibrator.thresh_ear, calibrator.thresh_mar = 0.55, 0.4  # สเกล blendshape
+    calibrator.is_finished = True
+    store.put("somchai", calibrator, 0.0)
+    store.save()
+
+def test_profile_loads_with_the_same_feature_source(tmp_path):
+    path = str(tmp_path / "profiles.json")
+    source = feature_source("tasks", blendshapes=True, transform=True)
+    _save(path, source)
+    session = DriverSession(1280, 720, profiles=ProfileStore(path, source), driver="somchai", now=0.0)
+    assert session.mode == "RUNNING"
+    assert session.calibrator.thresh_ear == 0.55
+
+def test_profile_from_another_feature_source_forces_calibration(tmp_path):
+    path = str(tmp_path / "profiles.json")
+    _save(path, feature_source("tasks", blendshapes=True, transform=True))
+    for source in (feature_source("solutions"), feature_source("tasks", blendshapes=False, transform=True)):
+        session = DriverSession(1280, 720, profiles=ProfileStore(path, source), driver="somchai", now=0.0)
+        assert session.mode == "IDLE"
+
+def test_blendshape_flags_do_not_apply_to_solutions():
+    assert feature_source("solutions", True, True) == feature_source("solutions", False, False)
+
+def test_refine_stays_within_drift_of_reference():
+    calibrator = Calibrator()
+    calibrator.load({"thresh_ear": 0.18, "thresh_mar": 0.4, "base_yaw": 2.0, "base_pitch": -5.0})
+    # ตาค่อยๆ หรี่ (ง่วงสะสม) และหัวเอียงไปเรื่อยๆ เป็นเวลานาน
+    for _ in range(5000):
+        calibrator.refine(0.1, 0.9, 30.0, -40.0, alpha=0.01, max_drift=0.1, max_angle_drift=3.0)
+    assert calibrator.thresh_ear == 0.18 * 0.9
+    assert calibrator.thresh_mar == 0.4 * 1.1
+    assert calibrator.base_yaw == 2.0 - 3.0
+    assert calibrator.base_pitch == -5.0 + 3.0
+    # ขอบเขตอิงค่าตอน Calibrate ไม่ใช่ค่าที่ refine แล้ว
+    assert calibrator.reference["thresh_ear"] == 0.18
+
+def test_refine_follows_small_changes():
+    calibrator = Calibrator()
+    calibrator.load({"thresh_ear": 0.18, "thresh_mar": 0.4, "base_yaw": 0.0, "base_pitch": 0.0})
+    for _ in range(2000):
+        calibrator.refine(0.31, 0.12, 1.0, -1.0, alpha=0.01, max_drift=0.1, max_angle_drift=3.0)
+    assert abs(calibrator.thresh_ear - 0.31 * Calibrator.EAR_RATIO) < 1e-6
+    assert abs(calibrator.thresh_mar - (0.12 + Calibrator.MAR_MARGIN)) < 1e-6
+    assert (round(calibrator.base_yaw, 6), round(calibrator.base_pitch, 6)) == (-1.0, 1.0)
+
+def test_reference_survives_save_and_load(tmp_path):
+    path = str(tmp_path / "profiles.json")
+    source = feature_source("solutions")
+    store = ProfileStore(path, source)
+    calibrator = Calibrator()
+    calibrator.load({"thresh_ear": 0.18, "thresh_mar": 0.4, "base_yaw": 0.0, "base_pitch": 0.0})
+    calibrator.refine(0.1, 0.1, 0.0, 0.0, alpha=1.0, max_drift=0.1, max_angle_drift=3.0)
+    store.put("somchai", calibrator, 0.0)
+    store.save()
+
+    loaded = Calibrator()
+    loaded.load(ProfileStore(path, source).get("somchai"))
+    assert loaded.thresh_ear == calibrator.thresh_ear
+    assert loaded.reference["thresh_ear"] == 0.18
+
+def test_failed_save_keeps_the_old_file(tmp_path):
+    path = tmp_path / "profiles.json"
+    source = feature_source("solutions")
+    _save(str(path), source)
+    before = path.read_text(encoding="utf-8")
+
+    store = ProfileStore(str(path), source)
+    store.profiles["broken"] = {"value": object()}  # แปลงเป็น JSON ไม่ได้ -> เขียนไม่สำเร็จกลางทาง
+    try:
+        store.save()
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("save() should fail")
+    assert path.read_text(encoding="utf-8") == before
+    assert [p.name for p in tmp_path.iterdir()] == ["profiles.json"]
+
+def test_unreadable_file_is_ignored(tmp_path):
+    path = tmp_path / "profiles.json"
+    path.write_text("{not json", encoding="utf-8")
+    assert ProfileStore(str(path), feature_source("solutions")).profiles == {}
+    path.write_text("", encoding="utf-8")
+    assert ProfileStore(str(path), feature_source("solutions")).profiles == {}
@@ -0,0 +1,82 @@
+# tests/test_quality.py
+import cv2
+import numpy as np
+from bench.fixtures import make_frame, make_landmarks
+from detectors.quality import QualityGate, RUN, REUSE, UNRELIABLE
+
+W, H = 640, 480
+
+def _textured(seed=0):
+    # ภาพที่มีรายละเอียด (ความคมสูง) สว่างปานกลาง
+    return make_frame(W, H, seed)
+
+def _blurred(frame):
+    return cv2.GaussianBlur(frame, (0, 0), 6)
+
+def _points(face_size=240):
+    return make_landmarks(W, H, face_size=face_size)
+
+def test_light_checks():
+    gate = QualityGate()
+    assert gate.check_frame(_textured(), now=0.0) == RUN
+    assert gate.check_frame(np.full((H, W, 3), 5, np.uint8), now=0.1) == UNRELIABLE    # มืด
+    assert gate.check_frame(np.full((H, W, 3), 250, np.uint8), now=0.2) == UNRELIABLE  # สว่างเกิน
+    assert gate.check_frame(np.full((H, W, 3), 128, np.uint8), now=0.3) == UNRELIABLE  # ภาพแบน
+    assert gate.counts == {RUN: 1, REUSE: 0, UNRELIABLE: 3}
+
+def test_dark_face_region_in_a_bright_frame():
+    # ย้อนแสง: ทั้งภาพสว่างพอ แต่บริเวณหน้ามืด
+    frame = _textured()
+    pts = _points()
+    x0, y0 = pts[:, :2].min(axis=0).astype(int)
+    x1, y1 = pts[:, :2].max(axis=0).astype(int) + 1
+    frame[y0:y1, x0:x1] //= 16
+    gate = QualityGate()
+    assert gate.check_frame(frame, now=0.0) == RUN
+    assert gate.check_frame(frame, pts, now=0.1) == UNRELIABLE
+
+def test_motion_blur_reuses_recent_points_then_gives_up():
+    gate = QualityGate(max_reuse=0.5)
+    pts = _points()
+    for i in range(5):
+        assert gate.check_frame(_textured(i), pts, now=i * 0.03) == RUN
+        assert gate.check_face(pts, W, H, now=i * 0.03)
+    last_good = 4 * 0.03
+
+    blurred = _blurred(_textured(9))
+    assert gate.check_frame(blurred, pts, now=last_good + 0.1) == REUSE
+    assert gate.check_frame(blurred, pts, now=last_good + 0.4) == REUSE
+    # เบลอนานเกิน max_reuse: จุดเดิมเก่าเกินไปแล้ว
+    assert gate.check_frame(blurred, pts, now=last_good + 0.6) == UNRELIABLE
+
+def test_permanent_blur_adapts_back_to_run():
+    gate = QualityGate()
+    pts = _points()
+    for i in range(5):
+        gate.check_frame(_textured(i), pts, now=i * 0.03)
+        gate.check_face(pts, W, H, now=i * 0.03)
+    blurred = _blurred(_textured(9))
+    # กล้องเบลอถาวร (โฟกัสเปลี่ยน): ค่าปกติค่อยๆ ลดลงจนกลับมารันได้
+    decisions = [gate.check_frame(blurred, pts, now=1.0 + i / 30) for i in range(300)]
+    assert decisions[0] != RUN
+    assert decisions[-1] == RUN
+
+def test_without_face_box_sharpness_is_not_judged():
+    gate = QualityGate()
+    gate.check_frame(_textured(), _points(), now=0.0)
+    # ไม่รู้ตำแหน่งหน้า ดูแค่แสง: ภาพเบลอแต่สว่างพอยังรันได้
+    assert gate.check_frame(_blurred(_textured(1)), None, now=0.1) == RUN
+
+def test_check_face_size_and_inside():
+    gate = QualityGate(min_face=60, min_inside=0.8)
+    assert gate.check_face(None, W, H, now=0.0)
+    assert gate.check_face(_points(240), W, H, now=0.0)
+
+    assert not gate.check_face(_points(240) * np.float32([0.1, 0.1, 1]), W, H, now=0.1)  # หน้าเล็กเกิน
+    assert gate.decision == UNRELIABLE
+
+    off = _points(240)
+    off[:, 0] -= off[:, 0].min() + (off[:, 0].max() - off[:, 0].min()) * 0.5  # หลุดขอบซ้ายครึ่งหน้า
+    assert not gate.check_face(off, W, H, now=0.2)
+    off[:, 0] -= W  # หลุดทั้งหน้า
+    assert not gate.check_face(off, W, H, now=0.3)
@@ -0,0 +1,97 @@
+# tests/test_recording.py
+import numpy as np
+import pytest
+from bench.fixtures import make_landmarks, jitter
+from pipeline.recording import LandmarkWriter, LandmarkRecording, HEADER, DEFAULT_NUM_POINTS, landmark_scale
+
+W, H = 1280, 720
+
+def _write(path, frames, num_points=DEFAULT_NUM_POINTS):
+    writer = LandmarkWriter(path, W, H, num_points)
+    for idx, t, pts in frames:
+        writer.write(idx, t, pts)
+    writer.close()
+    return writer
+
+def _frames(n=20, seed=0):
+    rng = np.random.default_rng(seed)
+    pts = make_landmarks(W, H)
+    frames = []
+    for i in range(n):
+        pts = jitter(pts, rng, 2.0)
+        # เฟรมที่ 5, 12 ไม่เจอหน้า
+        frames.append((i * 2, 10.0 + i / 30, None if i in (5, 12) else pts.copy()))
+    return frames
+
+def test_round_trip_within_scale(tmp_path):
+    path = str(tmp_path / "clip.lmk")
+    frames = _frames()
+    writer = _write(path, frames)
+    rec = LandmarkRecording(path)
+    assert (rec.width, rec.height, rec.num_points) == (W, H, DEFAULT_NUM_POINTS)
+    assert rec.scale == writer.scale == landmark_scale(W, H)
+    assert len(rec) == len(frames)
+
+    for (idx, t, pts), (r_idx, r_t, r_pts) in zip(frames, rec.frames()):
+        assert (r_idx, r_t) == (idx, t)
+        if pts is None:
+            assert r_pts is None
+        else:
+            # ปัดเป็น int16 ที่ 1/scale pixel: คลาดได้ไม่เกินครึ่งช่อง
+            assert np.abs(r_pts - pts).max() <= 0.5 / rec.scale + 1e-4
+
+def test_points_off_screen_are_kept(tmp_path):
+    path = str(tmp_path / "clip.lmk")
+    pts = make_landmarks(W, H)
+    pts[0, :2] = (-400.0, H + 600.0)
+    _write(path, [(0, 0.0, pts)])
+    out = LandmarkRecording(path).points(0)
+    assert out[0, :2] == pytest.approx((-400.0, H + 600.0), abs=0.5 / landmark_scale(W, H))
+
+def test_fewer_points_are_zero_padded(tmp_path):
+    path = str(tmp_path / "clip.lmk")
+    pts = make_landmarks(W, H)[:468]
+    _write(path, [(0, 0.0, pts)], num_points=478)
+    out = LandmarkRecording(path).points(0)
+    assert out.shape == (478, 3)
+    assert np.allclose(out[:468], pts, atol=0.5 / landmark_scale(W, H) + 1e-4)
+    assert not out[468:].any()
+
+def test_time_range_selects_frames(tmp_path):
+    path = str(tmp_path / "clip.lmk")
+    _write(path, _frames())
+    rec = LandmarkRecording(path)
+    t = np.asarray(rec.t)
+    got = [ft for _, ft, _ in rec.frames(start=t[3], end=t[9])]
+    assert got == t[3:10].tolist()
+    assert rec.time_range(start=t[-1] + 1) == (len(rec), len(rec))
+
+def test_truncated_last_record_is_skipped(tmp_path):
+    path = str(tmp_path / "clip.lmk")
+    frames = _frames(5)
+    _write(path, frames)
+    # จำลองไฟล์ที่ยังเขียนไม่เสร็จ: record สุดท้ายขาดไปครึ่ง
+    with open(path, "rb") as f:
+        data = f.read()
+    record_size = (len(data) - HEADER.size) // len(frames)
+    with open(path, "wb") as f:
+        f.write(data[:-record_size // 2])
+    rec = LandmarkRecording(path)
+    assert len(rec) == len(frames) - 1
+    assert [idx for idx, _, _ in rec.frames()] == [f[0] for f in frames[:-1]]
+
+def test_empty_and_invalid_files(tmp_path):
+    path = str(tmp_path / "clip.lmk")
+    _write(path, [])
+    rec = LandmarkRecording(path)
+    assert len(rec) == 0
+    assert list(rec.frames()) == []
+
+    bad = tmp_path / "bad.lmk"
+    bad.write_bytes(b"RIFF" + bytes(60))
+    with pytest.raises(ValueError):
+        LandmarkRecording(str(bad))
+    short = tmp_path / "short.lmk"
+    short.write_bytes(b"SGLM")
+    with pytest.raises(ValueError):
+        LandmarkRecording(str(short))
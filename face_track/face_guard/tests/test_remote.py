@@ -0,0 +1,60 @@
+# tests/test_remote.py
+import numpy as np
+from pipeline.remote import RemoteDetector, RemoteResult
+
+def test_pipelined_result_carries_its_source_frame_stamp():
+    detector = RemoteDetector("solutions", pipelined=True)
+    try:
+        frame = np.zeros((120, 160, 3), dtype=np.uint8)
+        first = detector.process(frame, (0, 10.0))
+        assert detector.get_stamp(first) is None  # เฟรมแรกยังไม่มีผล (ไม่ใช่ "ไม่เจอหน้า")
+
+        for idx in range(1, 5):
+            results = detector.process(frame, (idx, 10.0 + idx / 30))
+            assert detector.get_stamp(results) == (idx - 1, 10.0 + (idx - 1) / 30)
+            assert detector.get_points(results, 160, 120) is None
+    finally:
+        detector.close()
+
+def test_synchronous_result_has_the_current_stamp():
+    detector = RemoteDetector("solutions", pipelined=False)
+    try:
+        frame = np.zeros((120, 160, 3), dtype=np.uint8)
+        for idx in range(3):
+            assert detector.get_stamp(detector.process(frame, (idx, float(idx)))) == (idx, float(idx))
+    finally:
+        detector.close()
+
+def test_frame_size_change_keeps_pending_results_and_stamps():
+    detector = RemoteDetector("solutions", pipelined=True)
+    try:
+        small = np.zeros((120, 160, 3), dtype=np.uint8)
+        large = np.zeros((240, 320, 3), dtype=np.uint8)
+        detector.process(small, (0, 0.0))
+        # ขนาดภาพเปลี่ยน: ผลที่ค้างอยู่ถูกทิ้งพร้อม shared memory เดิม เฟรมแรกหลังเปลี่ยนจึงไม่มีผล (เหมือนเริ่มใหม่)
+        # ผลต่อจากนั้นต้องเป็นของเฟรมขนาดใหม่ เรียงตามลำดับ
+        stamps = [detector.get_stamp(detector.process(large, (idx, float(idx)))) for idx in range(1, 8)]
+        assert stamps == [None] + [(idx, float(idx)) for idx in range(1, 7)]
+    finally:
+        detector.close()
+
+def test_get_points_copies_out_of_the_shared_slot():
+    detector = RemoteDetector("solutions", pipelined=False)
+    try:
+        frame = np.zeros((120, 160, 3), dtype=np.uint8)
+        results = detector.process(frame, (0, 0.0))
+        assert detector.get_points(results, 160, 120) is None  # ไม่มีหน้า
+
+        # จำลองผลที่ worker เขียนลงช่องนั้น
+        expected = np.random.default_rng(0).uniform(0, 160, (478, 3)).astype(np.float32)
+        detector._results[results.slot] = expected
+        found = RemoteResult(results.slot, 478, {}, results.stamp)
+        points = detector.get_points(found, 160, 120)
+        assert np.array_equal(points, expected)
+        detector._results[results.slot] = 0  # ช่องถูกใช้ซ้ำกับเฟรมต่อไป
+        assert np.array_equal(points, expected)
+
+        partial = RemoteResult(results.slot, 468, {}, results.stamp)
+        assert detector.get_points(partial, 160, 120).shape == (468, 3)
+    finally:
+        detector.close()
@@ -0,0 +1,15 @@
+# tests/test_replay.py
+import os
+import pytest
+from src.replay import output_names
+
+def test_same_file_name_in_different_folders_does_not_collide():
+    names = output_names(["trips/day1/cam.mp4", "trips/day2/cam.mp4"])
+    assert names == [os.path.join("day1", "cam"), os.path.join("day2", "cam")]
+
+def test_single_file_keeps_its_name():
+    assert output_names(["trips/day1/cam.mp4"]) == ["cam"]
+
+def test_collision_is_an_error():
+    with pytest.raises(ValueError):
+        output_names(["trips/cam.mp4", "trips/cam.lmk"])
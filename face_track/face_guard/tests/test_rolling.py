@@ -0,0 +1,49 @@
+# tests/test_rolling.py
+import numpy as np
+import pytest
+from logic.rolling import RollingStats
+
+def _check(stats, window):
+    window = np.asarray(window, dtype=np.float64)
+    assert len(stats) == len(window)
+    assert sorted(map(tuple, stats.values().tolist())) == sorted(map(tuple, window.tolist()))
+    assert stats.mean == pytest.approx(window.mean(axis=0).tolist(), abs=1e-9)
+    assert stats.variance() == pytest.approx(window.var(axis=0).tolist(), rel=1e-6, abs=1e-9)
+    assert stats.total_variance() == pytest.approx(window.var(axis=0).sum(), rel=1e-6, abs=1e-9)
+
+@pytest.mark.parametrize("capacity", [1, 2, 7, 30])
+def test_matches_np_var_on_every_push(capacity):
+    rng = np.random.default_rng(capacity)
+    stats = RollingStats(capacity)
+    values = rng.normal(0, 3, (capacity * 5 + 3, 2))
+    for i, value in enumerate(values):
+        stats.push(value)
+        _check(stats, values[max(0, i + 1 - capacity):i + 1])
+
+def test_large_offset_small_jitter_stays_accurate():
+    # พิกัด pixel ไกลจาก 0 แต่ขยับนิดเดียว (กรณีเช็คความนิ่ง): ความคลาดเคลื่อนต้องไม่สะสม
+    rng = np.random.default_rng(0)
+    capacity = 30
+    stats = RollingStats(capacity)
+    values = np.array([640.0, 360.0]) + rng.normal(0, 0.1, (5000, 2))
+    for value in values:
+        stats.push(value)
+    expected = values[-capacity:].var(axis=0)
+    assert stats.variance() == pytest.approx(expected.tolist(), rel=1e-6)
+
+def test_constant_values_have_zero_variance():
+    stats = RollingStats(10)
+    for _ in range(50):
+        stats.push((123.456, 78.9))
+    assert stats.variance() == pytest.approx([0.0, 0.0], abs=1e-12)
+
+def test_clear_and_dims():
+    stats = RollingStats(4, dims=3)
+    assert stats.variance() == [0.0, 0.0, 0.0]
+    for value in ((1, 2, 3), (4, 5, 6), (7, 8, 10)):
+        stats.push(value)
+    _check(stats, [(1, 2, 3), (4, 5, 6), (7, 8, 10)])
+    stats.clear()
+    assert len(stats) == 0
+    stats.push((1, 1, 1))
+    _check(stats, [(1, 1, 1)])
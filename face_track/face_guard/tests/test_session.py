@@ -0,0 +1,29 @@
+# tests/test_session.py
+import time
+from bench.fixtures import make_landmarks
+from logic.calibration import Calibrator
+from logic.clock import FrameClock
+from logic.profiles import ProfileStore
+from logic.session import DriverSession
+
+def _store_with_profile(tmp_path, driver):
+    store = ProfileStore(str(tmp_path / "profiles.json"))
+    calibrator = Calibrator()
+    calibrator.thresh_ear, calibrator.thresh_mar = 0.2, 0.5
+    calibrator.base_yaw = calibrator.base_pitch = 0.0
+    calibrator.is_finished = True
+    store.put(driver, calibrator, 0.0)
+    return store
+
+def test_saved_profile_counts_drive_time_from_start(tmp_path):
+    # เหมือน main: clock ตั้งเป็นเวลาจริงก่อนสร้าง session แล้วเฟรมแรกมาถึงทีหลังเล็กน้อย
+    start = time.time()
+    clock = FrameClock(start)
+    session = DriverSession(1280, 720, profiles=_store_with_profile(tmp_path, "somchai"),
+                            driver="somchai", clock=clock)
+    assert session.mode == "RUNNING"
+
+    first_frame = clock.set(start + 0.5)
+    session.update(make_landmarks(), now=first_frame)
+    assert 0.0 <= session.status["drive_duration"] < 1.0
+    assert not session.status["is_overtime"]
@@ -0,0 +1,21 @@
+# tests/test_simulate.py
+import pytest
+from src.config import MAX_DRIVE_TIME, REST_TIME_REQUIRED
+from src.simulate import simulate
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_simulated_driver_never_goes_static(seed):
+    result = simulate(0.2, 30.0, seed)
+    assert "static" not in result["events"]
+
+def test_same_seed_same_result():
+    assert simulate(0.05, 30.0, 3)["digest"] == simulate(0.05, 30.0, 3)["digest"]
+
+def test_overtime_rest_and_resume():
+    # fps ต่ำพอให้ขับเกิน MAX_DRIVE_TIME ได้เร็ว
+    fps = 2.0
+    result = simulate((MAX_DRIVE_TIME + REST_TIME_REQUIRED) / 3600 + 0.1, fps, 0)
+    assert result["overtime_at"] == pytest.approx(MAX_DRIVE_TIME, abs=1 / fps)
+    assert result["events"]["overtime"] == 1  # หลังพักแล้วนับเวลาขับใหม่ ไม่เตือนซ้ำ
+    (start, end), = result["rests"]
+    assert end - start == pytest.approx(REST_TIME_REQUIRED, abs=1 / fps)
@@ -0,0 +1,79 @@
+# tests/test_smoothing.py
+import math
+import numpy as np
+import pytest
+from detectors.smoothing import OneEuroBank
+
+class _OneEuro:
+    """One-Euro filter แบบค่าเดียว (ตามสูตรต้นฉบับของ Casiez et al.) ไว้เทียบ"""
+    def __init__(self, min_cutoff, beta, d_cutoff):
+        self.min_cutoff, self.beta, self.d_cutoff = min_cutoff, beta, d_cutoff
+        self.x = self.dx = self.t = None
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def __call__(self, x, t):
+        if self.t is None:
+            self.x, self.dx, self.t = x, 0.0, t
+            return x
+        dt = max(t - self.t, 1e-3)
+        self.t = t
+        dx = (x - self.x) / dt
+        self.dx += self._alpha(self.d_cutoff, dt) * (dx - self.dx)
+        cutoff = self.min_cutoff + self.beta * abs(self.dx)
+        self.x += self._alpha(cutoff, dt) * (x - self.x)
+        return self.x
+
+PARAMS = [(1.0, 0.0, 1.0), (0.5, 0.05, 1.0), (2.0, 1.5, 0.7), (0.05, 10.0, 2.0)]
+
+def test_matches_scalar_reference_per_channel():
+    rng = np.random.default_rng(0)
+    n = 500
+    t = np.cumsum(rng.uniform(0.01, 0.06, n))
+    t[100] = t[99]  # เวลาเดียวกันซ้ำ (dt = 0) ใช้ dt ขั้นต่ำ
+    # สัญญาณต่างกันแต่ละช่อง: นิ่ง+สั่น, ขั้นบันได (กระพริบตา), เอียงต่อเนื่อง
+    signals = np.stack([
+        5.0 + rng.normal(0, 0.5, n),
+        np.where((np.arange(n) // 40) % 2 == 0, 0.3, 0.12) + rng.normal(0, 0.01, n),
+        np.linspace(-30, 30, n) + rng.normal(0, 1.0, n),
+        np.sin(t * 3.0) * 200 + 640,
+    ], axis=1)
+
+    bank = OneEuroBank(len(PARAMS), *np.array(PARAMS).T)
+    refs = [_OneEuro(*p) for p in PARAMS]
+    for i in range(n):
+        out = bank.update(signals[i], float(t[i]))
+        expected = [ref(float(signals[i, c]), float(t[i])) for c, ref in enumerate(refs)]
+        assert out.tolist() == pytest.approx(expected, rel=1e-9, abs=1e-9), i
+
+def test_from_groups_and_shared_params():
+    bank = OneEuroBank.from_groups([(3, (1.0, 0.0, 1.0)), (2, (0.5, 0.05, 1.0))])
+    assert bank.size == 5
+    assert bank.min_cutoff.tolist() == [1.0, 1.0, 1.0, 0.5, 0.5]
+    assert bank.beta.tolist() == [0.0, 0.0, 0.0, 0.05, 0.05]
+
+    shared = OneEuroBank(4, 1.0, 0.1, 1.0)
+    assert shared.beta.tolist() == [0.1] * 4
+
+def test_first_update_and_reset_pass_values_through():
+    bank = OneEuroBank(2, 1.0, 0.0, 1.0)
+    x = np.array([1.0, 2.0])
+    out = bank.update(x, 0.0)
+    assert out.tolist() == [1.0, 2.0]
+    assert out is not x  # เก็บเป็น state ของตัวเอง
+    bank.update(np.array([3.0, 4.0]), 0.1)
+    bank.reset()
+    assert bank.update(np.array([9.0, 8.0]), 5.0).tolist() == [9.0, 8.0]
+
+def test_fast_motion_lags_less_with_beta():
+    # ขยับเร็ว: beta สูง cutoff สูงขึ้น ตามทันกว่า (ตอนนิ่งกรองเท่ากัน)
+    t = np.arange(60) / 30
+    x = np.where(t < 1.0, 0.0, 100.0)
+    slow, fast = OneEuroBank(1, 1.0, 0.0, 1.0), OneEuroBank(1, 1.0, 0.5, 1.0)
+    for ti, xi in zip(t, x):
+        a = slow.update(np.array([xi]), ti)[0]
+        b = fast.update(np.array([xi]), ti)[0]
+    assert 100.0 - b < 100.0 - a
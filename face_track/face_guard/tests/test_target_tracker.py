@@ -0,0 +1,54 @@
+# tests/test_target_tracker.py
+import numpy as np
+from pipeline.target_tracker import FaceROITracker
+
+class BrightBoxDetector:
+    """detector ปลอม: "หน้า" คือกรอบของ pixel สว่าง คืนมุมทั้ง 4 เป็นพิกัดปกติ (0-1) ของภาพที่ได้รับ"""
+    def __init__(self):
+        self.inputs = []
+
+    def process(self, image, stamp=None):
+        self.inputs.append(image.shape)
+        ys, xs = np.nonzero(image[:, :, 0] > 128)
+        if len(xs) == 0:
+            return None
+        h, w = image.shape[:2]
+        x0, x1, y0, y1 = xs.min() / w, (xs.max() + 1) / w, ys.min() / h, (ys.max() + 1) / h
+        return np.array([[x0, y0, 0], [x1, y0, 0], [x1, y1, 0], [x0, y1, 0]], dtype=np.float32)
+
+    def get_points(self, results, width, height):
+        return None if results is None else results * np.float32([width, height, 1])
+
+    def get_direct_features(self, results):
+        return {}
+
+def _frame(x0, y0, x1, y1):
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    frame[y0:y1, x0:x1] = 255
+    return frame
+
+def test_crop_points_map_back_to_frame_coordinates():
+    tracker = FaceROITracker(BrightBoxDetector, size=128)
+    corners = [[300, 200], [360, 200], [360, 280], [300, 280]]
+
+    tracker.process(_frame(300, 200, 360, 280))  # เฟรมแรกหาจากภาพเต็ม
+    assert tracker.region is None
+    points = tracker.get_points(None, 640, 480)
+    assert np.allclose(points[:, :2], corners)
+
+    results = tracker.process(_frame(304, 202, 364, 282))  # ขยับนิดหน่อย -> ใช้ crop
+    assert tracker.region is not None
+    assert tracker.roi_detector.inputs[-1] == (128, 128, 3)
+    side = tracker.region[2]
+    points = tracker.get_points(results, 640, 480)
+    # คลาดได้ไม่เกิน 1 pixel ของ crop ที่ย่อแล้ว
+    assert np.allclose(points[:, :2], np.add(corners, [4, 2]), atol=side / 128 + 1)
+    assert tracker.redetections == 1
+
+def test_lost_face_falls_back_to_full_frame():
+    tracker = FaceROITracker(BrightBoxDetector, size=128)
+    tracker.process(_frame(300, 200, 360, 280))
+    tracker.process(_frame(40, 40, 100, 120))  # หน้าย้ายออกนอกกรอบเดิม
+    assert tracker.region is None and tracker.redetections == 2
+    points = tracker.get_points(None, 640, 480)
+    assert np.allclose(points[:, :2], [[40, 40], [100, 40], [100, 120], [40, 120]])
@@ -0,0 +1,106 @@
+# ui/display.py
+import queue
+import threading
+import time
+import cv2
+import numpy as np
+from pipeline.buffers import BufferPool
+from src.config import WINDOW_NAME, DISPLAY_THREADED, DISPLAY_MAX_FPS
+
+class Display:
+    """
+    หน้าต่างแสดงผล + รับปุ่มกด แยกออกจาก loop ประมวลผล
+    threaded=True: imshow/waitKey อยู่ใน thread ของตัวเอง แสดงเฟรมล่าสุดที่ส่งมาไม่เกิน max_fps
+                   loop หลักไม่ต้องรอ waitKey (เดิมเสียอย่างน้อย 5 ms ทุกเฟรม) ปุ่มกดส่งกลับมาทาง queue
+    threaded=False: imshow/waitKey(1) ทันทีใน show() (บาง OS เช่น macOS ต้องเรียก GUI จาก main thread)
+    """
+    def __init__(self, window_name=WINDOW_NAME, threaded=DISPLAY_THREADED, max_fps=DISPLAY_MAX_FPS):
+        self.window_name = window_name
+        self.threaded = threaded
+        self._interval = 1.0 / max_fps if max_fps and max_fps > 0 else 0.0
+        self.keys = queue.Queue()
+        self.shown = 0    # จำนวนเฟรมที่แสดงจริง
+        self.skipped = 0  # เฟรมที่ถูกเฟรมใหม่ทับก่อนได้แสดง
+
+        self._pool = None     # buffer สำหรับ copy เฟรมที่ไม่ได้มาจาก BufferPool
+        self._pending = None  # FrameBuffer ล่าสุดที่ยังไม่ได้แสดง
+        self._running = True
+        self._cond = threading.Condition()
+        if threaded:
+            self._thread = threading.Thread(target=self._display_loop, name="Display", daemon=True)
+            self._thread.start()
+
+    def show(self, frame, buffer=None):
+        """
+        ส่งเฟรมที่วาดเสร็จแล้วไปแสดง
+        buffer: FrameBuffer ของ frame (เช่น Camera.buffer) -> retain() ไว้จนแสดงเสร็จ ไม่ต้อง copy
+                ถ้าไม่ส่งมาจะ copy ไว้ frame จึงใช้ต่อ/ถูกเขียนทับได้ทันที
+        """
+        if not self.threaded:
+            cv2.imshow(self.window_name, frame)
+            self._put_key(cv2.waitKey(1))
+            self.shown += 1
+            return
+
+        if buffer is not None:
+            buffer.retain()
+        else:
+            if self._pool is None or not self._pool.matches(frame):
+                self._pool = BufferPool(frame.shape, frame.dtype, 2)
+            buffer = self._pool.acquire()
+            np.copyto(buffer.array, frame)
+        with self._cond:
+            stale = self._pending
+            if stale is not None:
+                self.skipped += 1
+            self._pending = buffer
+            self._cond.notify_all()
+        if stale is not None:
+            stale.release()
+
+    def _put_key(self, key):
+        key &= 0xFF
+        if key != 0xFF:
+            self.keys.put(key)
+
+    def _display_loop(self):
+        next_time = time.monotonic()
+        while self._running:
+            with self._cond:
+                # ไม่มีเฟรมใหม่ก็ต้องเรียก waitKey เป็นระยะ (หน้าต่างค้าง / ไม่รับปุ่ม)
+                if self._pending is None:
+                    self._cond.wait(timeout=0.05)
+                buffer, self._pending = self._pending, None
+
+            if buffer is not None:
+                cv2.imshow(self.window_name, buffer.array)  # imshow copy ลงหน้าต่างเอง คืน buffer ได้ทันที
+                buffer.release()
+                self.shown += 1
+            self._put_key(cv2.waitKey(1))
+
+            if self._interval:
+                next_time = max(next_time + self._interval, time.monotonic() - self._interval)
+                delay = next_time - time.monotonic()
+                if delay > 0: time.sleep(delay)
+
+        with self._cond:
+            buffer, self._pending = self._pending, None
+        if buffer is not None:
+            buffer.release()
+        cv2.destroyWindow(self.window_name)
+
+    def get_key(self):
+        """ปุ่มที่กดค้างในคิว (ทีละปุ่ม) หรือ -1 ถ้าไม่มี"""
+        try:
+            return self.keys.get_nowait()
+        except queue.Empty:
+            return -1
+
+    def close(self):
+        if self.threaded:
+            self._running = False
+            with self._cond:
+                self._cond.notify_all()
+            self._thread.join(timeout=1.0)
+        else:
+            cv2.destroyWindow(self.window_name)
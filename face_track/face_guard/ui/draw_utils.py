@@ -1,38 +1,66 @@
 # ui/draw_utils.py
 import cv2
-import mediapipe as mp
-
-mp_drawing = mp.solutions.drawing_utils
-mp_drawing_styles = mp.solutions.drawing_styles
-mp_face_mesh = mp.solutions.face_mesh
-
-def draw_face_mesh(image, detection_results):
-    if detection_results.multi_face_landmarks:
-        for face_landmarks in detection_results.multi_face_landmarks:
-            
-            # วาดโครงหน้า (Tesselation)
-            mp_drawing.draw_landmarks(
-                image=image,
-                landmark_list=face_landmarks,
-                connections=mp_face_mesh.FACEMESH_TESSELATION,
-                landmark_drawing_spec=None,
-                connection_drawing_spec=mp_drawing_styles.get_default_face_mesh_tesselation_style()
-            )
-            
-            # วาดกรอบตาและคิ้ว (Contours)
-            mp_drawing.draw_landmarks(
-                image=image,
-                landmark_list=face_landmarks,
-                connections=mp_face_mesh.FACEMESH_CONTOURS,
-                landmark_drawing_spec=None,
-                connection_drawing_spec=mp_drawing_styles.get_default_face_mesh_contours_style()
-            )
-            
-            # วาดตาดำ (Irises)
-            mp_drawing.draw_landmarks(
-                image=image,
-                landmark_list=face_landmarks,
-                connections=mp_face_mesh.FACEMESH_IRISES,
-                landmark_drawing_spec=None,
-                connection_drawing_spec=mp_drawing_styles.get_default_face_mesh_iris_connections_style()
-            )
\ No newline at end of file
+import numpy as np
+from src.config import MESH_DETAIL
+
+def _style_groups(connections, style):
+    """แยกเส้นตามสี/ความหนา -> {(color, thickness): [(a, b), ...]}"""
+    groups = {}
+    for conn in connections:
+        spec = style[conn] if isinstance(style, dict) else style
+        groups.setdefault((spec.color, spec.thickness), []).append(conn)
+    return groups
+
+def _build_connections(detail):
+    """
+    รวมเส้นของ mesh เป็นกลุ่มละสี/ความหนา (สีเดียวกับ mp_drawing_styles ค่าเริ่มต้น)
+    detail: "full" = โครงหน้า + กรอบตา/คิ้ว/ปาก + ตาดำ, "low" = ไม่วาดโครงหน้า (Tesselation)
+    import mediapipe ตอนต้องวาดครั้งแรกเท่านั้น (Headless / ปิด mesh ไม่ต้องโหลด)
+    """
+    from mediapipe.python.solutions import drawing_styles as mp_drawing_styles
+    from mediapipe.python.solutions import face_mesh as mp_face_mesh
+
+    layers = [(mp_face_mesh.FACEMESH_CONTOURS, mp_drawing_styles.get_default_face_mesh_contours_style()),
+              (mp_face_mesh.FACEMESH_IRISES, mp_drawing_styles.get_default_face_mesh_iris_connections_style())]
+    if detail == "full":
+        layers.insert(0, (mp_face_mesh.FACEMESH_TESSELATION,
+                          mp_drawing_styles.get_default_face_mesh_tesselation_style()))
+
+    # ลำดับการวาดตาม layers (โครงหน้าอยู่ล่างสุด) กลุ่มที่สีซ้ำกันรวมเป็นกลุ่มเดียว
+    groups = {}
+    for connections, style in layers:
+        for key, conns in _style_groups(sorted(connections), style).items():
+            groups.setdefault(key, []).extend(conns)
+    return [(color, thickness, np.array(conns, dtype=np.intp))
+            for (color, thickness), conns in groups.items()]
+
+_connections = {}
+
+def _connections_for(detail, num_points):
+    """index ของเส้น (สร้างครั้งเดียว) ตัดเส้นตาดำออกถ้าโมเดลไม่มีจุด iris (468 จุด)"""
+    key = (detail, num_points)
+    if key not in _connections:
+        groups = []
+        for color, thickness, idx in _build_connections(detail):
+            idx = idx[(idx < num_points).all(axis=1)]
+            if len(idx):
+                groups.append((color, thickness, idx))
+        _connections[key] = groups
+    return _connections[key]
+
+def prepare_mesh(num_points, detail=MESH_DETAIL):
+    """สร้างเส้นไว้ล่วงหน้า (ตอนเริ่มโปรแกรม) ไม่ให้เฟรมแรกที่วาด mesh สะดุด"""
+    _connections_for(detail, num_points)
+
+def draw_face_mesh(image, points, detail=MESH_DETAIL):
+    """
+    วาด Face Mesh จาก array จุด (N, 3) พิกัด pixel (จาก get_points() หรือจุดที่ทำนาย)
+    ดึงปลายเส้นทั้งหมดด้วย NumPy ครั้งเดียว แล้ววาดด้วย cv2.polylines ครั้งละกลุ่มสี
+    """
+    if points is None:
+        return
+
+    pts = points[:, :2].astype(np.int32)
+    for color, thickness, idx in _connections_for(detail, len(points)):
+        # (K, 2, 2): เส้นละ 2 จุด
+        cv2.polylines(image, pts[idx], False, color, thickness)
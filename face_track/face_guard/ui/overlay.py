@@ -1,41 +1,144 @@
 # ui/overlay.py
+from collections import OrderedDict
+from functools import lru_cache
 import cv2
 import numpy as np
+from ui.theme import (FONT, C_GREEN, C_RED, C_YELLOW, C_WHITE, C_BG, C_BAR_BG, C_PROGRESS_BG,
+                      C_REST_BG, C_DEBUG, C_SUBTEXT, CALIBRATION_KEEP, REST_KEEP)
+
+# จำนวนภาพที่เก็บใน cache (ข้อความ + ชั้นพื้นหลัง) เกินแล้วทิ้งตัวที่ไม่ได้ใช้นานสุด
+LAYER_CACHE_SIZE = 256
+
+@lru_cache(maxsize=LAYER_CACHE_SIZE)
+def text_size(text, scale, thickness):
+    """cv2.getTextSize แบบจำผล (ข้อความเดิมถูกวัดซ้ำทุกเฟรม)"""
+    return cv2.getTextSize(text, FONT, scale, thickness)
+
+class Layer:
+    """
+    ภาพที่วาดไว้ล่วงหน้า (BGR + alpha) เก็บเฉพาะกรอบที่มีพิกเซล (alpha > 0)
+    BGR วาดบนพื้นดำจึงเป็นสีแบบ premultiplied (ขอบนุ่ม = สี * ความทึบ)
+    ตอนแปะ: frame = สี + frame * (255 - alpha) / 255 เฉพาะในกรอบนั้น
+    """
+    def __init__(self, bgr, alpha, x=0, y=0):
+        ys, xs = np.nonzero(alpha)
+        if len(ys) == 0:
+            ys = xs = np.zeros(1, dtype=np.intp)
+        y0, y1 = ys.min(), ys.max() + 1
+        x0, x1 = xs.min(), xs.max() + 1
+
+        self.x, self.y = x + int(x0), y + int(y0)
+        self.bgr = np.ascontiguousarray(bgr[y0:y1, x0:x1])
+        alpha = alpha[y0:y1, x0:x1]
+        self.opaque = bool(alpha.min() == 255)
+        self.inv_alpha = cv2.merge([255 - alpha] * 3)
+
+    @classmethod
+    def render(cls, shape, draw, x=0, y=0):
+        """
+        draw(canvas, paint) วาดด้วยสี paint(color) ถูกเรียก 2 รอบ: ลงภาพสีและลงภาพ alpha
+        (cv2 วาดขอบนุ่มลงภาพ 4 channel แล้วทับ alpha เดิม จึงแยกวาด)
+        """
+        bgr = np.zeros((*shape, 3), dtype=np.uint8)
+        alpha = np.zeros(shape, dtype=np.uint8)
+        draw(bgr, lambda color: color)
+        draw(alpha, lambda color: 255)
+        return cls(bgr, alpha, x, y)
+
+    def draw(self, frame):
+        h, w = self.bgr.shape[:2]
+        x0, y0 = max(self.x, 0), max(self.y, 0)
+        x1, y1 = min(self.x + w, frame.shape[1]), min(self.y + h, frame.shape[0])
+        if x0 >= x1 or y0 >= y1:
+            return
+
+        src = (slice(y0 - self.y, y1 - self.y), slice(x0 - self.x, x1 - self.x))
+        dst = frame[y0:y1, x0:x1]
+        if self.opaque:
+            dst[...] = self.bgr[src]
+        else:
+            cv2.multiply(dst, self.inv_alpha[src], dst=dst, scale=1 / 255)
+            cv2.add(dst, self.bgr[src], dst=dst)
+
+def render_text(text, org, scale, color, thickness):
+    """วาดข้อความลงภาพเล็กแค่พอดีตัวอักษร แล้วคืนเป็น Layer ที่ตำแหน่ง org"""
+    (tw, th), baseline = text_size(text, scale, thickness)
+    m = thickness + int(10 * scale) + 2  # เผื่อขอบเส้นหนาและตัวที่สูง/ต่ำกว่าปกติ เช่น ( )
+    def draw(canvas, paint):
+        cv2.putText(canvas, text, (m, m + th), FONT, scale, paint(color), thickness)
+    return Layer.render((th + baseline + 2 * m, tw + 2 * m), draw, org[0] - m, org[1] - th - m)
 
 class HUD:
+    """
+    วาด HUD โดยแยกส่วนคงที่ (แถบบน ข้อความบนจอทับ ข้อความเตือน) ออกจากส่วนที่เปลี่ยน (ตัวเลข หลอด)
+    - ส่วนคงที่วาดครั้งเดียวต่อความละเอียดเก็บเป็น Layer
+    - ข้อความที่ซ้ำบ่อย (คะแนน เวลา ชื่อสถานะ) เก็บภาพตัวอักษรไว้ใน cache
+    - จอทับ (Calibrate/พัก) ปรับสีในเฟรมเดิมตรงๆ ไม่ต้องคัดลอกทั้งเฟรม
+    """
     def __init__(self, width, height):
         self.W = width
         self.H = height
-        self.C_GREEN = (0, 255, 0)
-        self.C_RED = (0, 0, 255)
-        self.C_YELLOW = (0, 255, 255)
-        self.C_WHITE = (255, 255, 255)
-        self.C_BG = (0, 0, 0)
+        self.C_GREEN = C_GREEN
+        self.C_RED = C_RED
+        self.C_YELLOW = C_YELLOW
+        self.C_WHITE = C_WHITE
+        self.C_BG = C_BG
 
-    def draw_info_panel(self, frame, score, blink_count, drive_time, level_text, level_color):
+        self._cache = OrderedDict()
+        # จอพัก: frame * REST_KEEP + สีพื้น * (1 - REST_KEEP) ในคำสั่งเดียว
+        self._rest_matrix = np.hstack([np.eye(3) * REST_KEEP,
+                                       np.array(C_REST_BG, dtype=np.float64)[:, None] * (1 - REST_KEEP)])
+
+    def _cached(self, key, build):
+        layer = self._cache.get(key)
+        if layer is None:
+            layer = self._cache[key] = build()
+            if len(self._cache) > LAYER_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(key)
+        return layer
+
+    def _static(self, key, draw):
+        """ชั้นคงที่ขนาดเต็มจอ วาดครั้งเดียวด้วย draw(canvas, paint)"""
+        return self._cached(key, lambda: Layer.render((self.H, self.W), draw))
+
+    def _text(self, frame, text, org, scale, color, thickness):
+        # เส้นบาง (thickness 1) cv2 วาดเองเร็วกว่าแปะภาพจาก cache
+        if thickness <= 1:
+            cv2.putText(frame, text, org, FONT, scale, color, thickness)
+            return
+        key = ("text", text, org, scale, color, thickness)
+        self._cached(key, lambda: render_text(text, org, scale, color, thickness)).draw(frame)
+
+    def draw_info_panel(self, frame, score, blink_count, drive_time, level_text, level_color, perclos=None):
         """แถบข้อมูลด้านบน (Top Bar)"""
-        # แถบพื้นหลังสีดำด้านบน
-        cv2.rectangle(frame, (0, 0), (self.W, 80), self.C_BG, -1)
-        
+        def panel(canvas, c):
+            # แถบพื้นหลังสีดำด้านบน + หัวข้อ
+            cv2.rectangle(canvas, (0, 0), (self.W, 80), c(self.C_BG), -1)
+            cv2.putText(canvas, "FATIGUE SCORE", (30, 30), FONT, 0.6, c(self.C_WHITE), 1)
+        self._static(("panel",), panel).draw(frame)
+
         # 1. Fatigue Score (ซ้าย)
-        cv2.putText(frame, "FATIGUE SCORE", (30, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, self.C_WHITE, 1)
-        cv2.putText(frame, f"{score}", (30, 70), cv2.FONT_HERSHEY_SIMPLEX, 1.2, level_color, 3)
-        
+        self._text(frame, f"{score}", (30, 70), 1.2, level_color, 3)
+
         # 2. Status Level (กลางซ้าย)
-        cv2.putText(frame, f"STATUS: {level_text}", (200, 60), cv2.FONT_HERSHEY_SIMPLEX, 1.0, level_color, 2)
+        self._text(frame, f"STATUS: {level_text}", (200, 60), 1.0, level_color, 2)
 
         # 3. Drive Time (ขวา)
         hrs = int(drive_time // 3600)
         mins = int((drive_time % 3600) // 60)
         time_str = f"DRIVE: {hrs:02}h {mins:02}m"
-        
+
         # จัดตำแหน่งชิดขวา
-        time_size = cv2.getTextSize(time_str, cv2.FONT_HERSHEY_SIMPLEX, 0.8, 2)[0]
-        cv2.putText(frame, time_str, (self.W - time_size[0] - 30, 40), cv2.FONT_HERSHEY_SIMPLEX, 0.8, self.C_WHITE, 2)
-        
+        time_size = text_size(time_str, 0.8, 2)[0]
+        self._text(frame, time_str, (self.W - time_size[0] - 30, 40), 0.8, self.C_WHITE, 2)
+
         blink_str = f"BLINKS: {blink_count}"
-        blink_size = cv2.getTextSize(blink_str, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 1)[0]
-        cv2.putText(frame, blink_str, (self.W - blink_size[0] - 30, 70), cv2.FONT_HERSHEY_SIMPLEX, 0.6, self.C_WHITE, 1)
+        if perclos is not None:
+            blink_str += f"  PERCLOS: {perclos:.0%}"
+        blink_size = text_size(blink_str, 0.6, 1)[0]
+        self._text(frame, blink_str, (self.W - blink_size[0] - 30, 70), 0.6, self.C_WHITE, 1)
 
     def draw_bar(self, frame, label, value, max_val, index, color):
         """
@@ -45,84 +148,95 @@ class HUD:
         bar_w = 250
         bar_h = 20
         gap = 40
-        
+
         # คำนวณตำแหน่ง Y จากด้านล่างจอขึ้นมา
         start_y = self.H - 50 - (index * gap)
         x = 30
-        
+
         # ชื่อหลอด
-        cv2.putText(frame, label, (x, start_y - 8), cv2.FONT_HERSHEY_SIMPLEX, 0.6, self.C_WHITE, 1)
-        
+        self._text(frame, label, (x, start_y - 8), 0.6, self.C_WHITE, 1)
+
         # พื้นหลังหลอด
-        cv2.rectangle(frame, (x, start_y), (x + bar_w, start_y + bar_h), (80, 80, 80), -1)
-        
+        cv2.rectangle(frame, (x, start_y), (x + bar_w, start_y + bar_h), C_BAR_BG, -1)
+
         # เนื้อหลอด
         ratio = min(max(value / max_val, 0.0), 1.0)
         fill_w = int(bar_w * ratio)
         cv2.rectangle(frame, (x, start_y), (x + fill_w, start_y + bar_h), color, -1)
 
-    # ui/overlay.py (แก้เฉพาะฟังก์ชัน draw_debug)
-
-    def draw_debug(self, frame, ear, mar, pitch, yaw, fps, nose_var): # <--- รับค่า nose_var เพิ่ม
+    def draw_debug(self, frame, ear, mar, pitch, yaw, fps, nose_var, dropped=0):
+        # ค่าเปลี่ยนทุกเฟรม ไม่คุ้มเก็บ cache วาดตรงๆ
         x = 30
-        y = 150 
-        color = (200, 200, 200)
-        
+        y = 150
+        color = C_DEBUG
+
         lines = [
             f"FPS:   {int(fps)}",
             f"EAR:   {ear:.2f}",
             f"MAR:   {mar:.2f}",
             f"PITCH: {int(pitch)}",
             f"YAW:   {int(yaw)}",
-            f"VAR:   {nose_var:.2f}" # <--- โชว์ค่าความนิ่ง (ถ้าต่ำกว่า 15.0 = นิ่ง)
+            f"VAR:   {nose_var:.2f}", # ความนิ่ง (ถ้าต่ำกว่า 15.0 = นิ่ง)
+            f"DROP:  {dropped}" # เฟรมที่กล้องถ่ายมาแต่ประมวลผลไม่ทัน
         ]
-        
+
         for line in lines:
-            cv2.putText(frame, line, (x, y), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 1)
+            cv2.putText(frame, line, (x, y), FONT, 0.6, color, 1)
             y += 25
 
+    def draw_latency(self, frame, lines):
+        """p50 / p99 ของแต่ละขั้น (pipeline/metrics.py) ใต้ค่า Debug"""
+        x = 30
+        y = 340
+        cv2.putText(frame, "LATENCY p50 / p99", (x, y), FONT, 0.5, C_DEBUG, 1)
+        for line in lines:
+            y += 20
+            cv2.putText(frame, line, (x, y), FONT, 0.5, C_DEBUG, 1)
+
     def draw_calibration(self, frame, progress):
-        overlay = frame.copy()
-        cv2.rectangle(overlay, (0, 0), (self.W, self.H), (0, 0, 0), -1)
-        cv2.addWeighted(overlay, 0.7, frame, 0.3, 0, frame)
-        
+        # ทับสีดำ = ลดความสว่างลงในเฟรมเดิม
+        cv2.convertScaleAbs(frame, dst=frame, alpha=CALIBRATION_KEEP)
+
         cx, cy = self.W // 2, self.H // 2
-        
-        cv2.putText(frame, "CALIBRATION", (cx - 140, cy - 80), cv2.FONT_HERSHEY_SIMPLEX, 1.2, self.C_YELLOW, 3)
-        cv2.putText(frame, "Look Straight & Stay Still", (cx - 180, cy - 30), cv2.FONT_HERSHEY_SIMPLEX, 0.8, self.C_WHITE, 1)
-        
-        # Progress Bar
         bar_w = 400
         start_x = cx - (bar_w // 2)
-        cv2.rectangle(frame, (start_x, cy + 20), (start_x + bar_w, cy + 50), (100, 100, 100), -1)
+
+        def screen(canvas, c):
+            cv2.putText(canvas, "CALIBRATION", (cx - 140, cy - 80), FONT, 1.2, c(self.C_YELLOW), 3)
+            cv2.putText(canvas, "Look Straight & Stay Still", (cx - 180, cy - 30), FONT, 0.8, c(self.C_WHITE), 1)
+            cv2.rectangle(canvas, (start_x, cy + 20), (start_x + bar_w, cy + 50), c(C_PROGRESS_BG), -1)
+        self._static(("calibration",), screen).draw(frame)
+
+        # Progress Bar
         cv2.rectangle(frame, (start_x, cy + 20), (start_x + int(bar_w * progress), cy + 50), self.C_GREEN, -1)
 
     def draw_rest_screen(self, frame, rest_time):
-        overlay = frame.copy()
-        cv2.rectangle(overlay, (0, 0), (self.W, self.H), (20, 50, 20), -1)
-        cv2.addWeighted(overlay, 0.9, frame, 0.1, 0, frame)
-        
+        cv2.transform(frame, self._rest_matrix, dst=frame)
+
         cx, cy = self.W // 2, self.H // 2
         mins = int(rest_time // 60)
         secs = int(rest_time % 60)
-        
-        cv2.putText(frame, "REST MODE", (cx - 150, cy - 60), cv2.FONT_HERSHEY_SIMPLEX, 1.5, self.C_WHITE, 3)
-        cv2.putText(frame, f"{mins:02}:{secs:02}", (cx - 100, cy + 40), cv2.FONT_HERSHEY_SIMPLEX, 3.0, self.C_GREEN, 5)
-        cv2.putText(frame, "Press 'r' to Resume", (cx - 120, cy + 100), cv2.FONT_HERSHEY_SIMPLEX, 0.8, self.C_YELLOW, 1)
+
+        def screen(canvas, c):
+            cv2.putText(canvas, "REST MODE", (cx - 150, cy - 60), FONT, 1.5, c(self.C_WHITE), 3)
+            cv2.putText(canvas, "Press 'r' to Resume", (cx - 120, cy + 100), FONT, 0.8, c(self.C_YELLOW), 1)
+        self._static(("rest",), screen).draw(frame)
+
+        self._text(frame, f"{mins:02}:{secs:02}", (cx - 100, cy + 40), 3.0, self.C_GREEN, 5)
 
     def draw_warning(self, frame, text, subtext=""):
         cx, cy = self.W // 2, self.H // 2
-        
+
         # กล่องแดง
-        cv2.rectangle(frame, (cx - 300, cy - 100), (cx + 300, cy + 100), (0, 0, 255), -1)
-        cv2.rectangle(frame, (cx - 300, cy - 100), (cx + 300, cy + 100), (255, 255, 255), 4)
-        
-        # ตัวหนังสือ
-        text_size = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 2.0, 5)[0]
-        tx = cx - (text_size[0] // 2)
-        cv2.putText(frame, text, (tx, cy + 10), cv2.FONT_HERSHEY_SIMPLEX, 2.0, self.C_WHITE, 5)
-        
-        if subtext:
-            sub_size = cv2.getTextSize(subtext, cv2.FONT_HERSHEY_SIMPLEX, 1.0, 2)[0]
-            sx = cx - (sub_size[0] // 2)
-            cv2.putText(frame, subtext, (sx, cy + 70), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (255, 255, 0), 2)
\ No newline at end of file
+        cv2.rectangle(frame, (cx - 300, cy - 100), (cx + 300, cy + 100), self.C_RED, -1)
+        cv2.rectangle(frame, (cx - 300, cy - 100), (cx + 300, cy + 100), self.C_WHITE, 4)
+
+        # ตัวหนังสือ (ข้อความเตือนมีไม่กี่แบบ เก็บเป็นชั้นเดียวกันทั้งคู่)
+        def texts(canvas, c):
+            text_w = text_size(text, 2.0, 5)[0][0]
+            cv2.putText(canvas, text, (cx - (text_w // 2), cy + 10), FONT, 2.0, c(self.C_WHITE), 5)
+
+            if subtext:
+                sub_w = text_size(subtext, 1.0, 2)[0][0]
+                cv2.putText(canvas, subtext, (cx - (sub_w // 2), cy + 70), FONT, 1.0, c(C_SUBTEXT), 2)
+        self._static(("warning", text, subtext), texts).draw(frame)
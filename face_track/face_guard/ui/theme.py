@@ -0,0 +1,21 @@
+# ui/theme.py
+# ฟอนต์และสีของ HUD (BGR)
+import cv2
+
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+
+C_GREEN = (0, 255, 0)
+C_RED = (0, 0, 255)
+C_YELLOW = (0, 255, 255)
+C_WHITE = (255, 255, 255)
+C_BG = (0, 0, 0)
+
+C_BAR_BG = (80, 80, 80)         # พื้นหลังหลอด
+C_PROGRESS_BG = (100, 100, 100) # พื้นหลังหลอด Calibrate
+C_REST_BG = (20, 50, 20)        # สีจอพัก
+C_DEBUG = (200, 200, 200)
+C_SUBTEXT = (255, 255, 0)
+
+# สัดส่วนภาพเดิมที่ยังเห็นใต้จอทับ
+CALIBRATION_KEEP = 0.3
+REST_KEEP = 0.1